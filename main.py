@@ -1,37 +1,60 @@
-import json
-from typing import Any
-
-import boto3
-from aws_lambda_powertools import Logger
-from aws_lambda_powertools.utilities.typing import LambdaContext
-from mypy_boto3_apigateway.client import APIGatewayClient
-from pydantic import ValidationError
-
-from src.core.exceptions import GameError
-from src.data_access.exceptions import DataAccessException
-from src.data_access.game import GameDataAccess
-from src.data_access.lobby import LobbyDataAccess
-from src.data_access.user import UserDataAccess
-from src.enums.websocket import Action, PayloadType, RouteKey
-from src.schemas.websocket import (
+import time
+
+
+INIT_STARTED_AT = time.perf_counter()
+
+import json  # NOQA: E402
+from typing import Any  # NOQA: E402
+
+from aws_lambda_powertools import Logger  # NOQA: E402
+from aws_lambda_powertools.utilities.typing import LambdaContext  # NOQA: E402
+from pydantic import ValidationError  # NOQA: E402
+
+from src import bootstrap  # NOQA: E402
+from src.core.exceptions import GameError  # NOQA: E402
+from src.data_access.exceptions import DataAccessException  # NOQA: E402
+from src.enums.websocket import Action, PayloadType, RouteKey  # NOQA: E402
+from src.schemas.websocket import (  # NOQA: E402
     CreateLobbyPayload,
     GetGameDetailPayload,
     JoinLobbyPayload,
     LeaveLobbyPayload,
+    ListGamesPayload,
+    ListLobbiesPayload,
     MakeMovePayload,
+    MakeMovesPayload,
 )
-from src.services.exceptions import ServiceException
-from src.services.game import GameService
-from src.services.websocket import WebsocketHandler
-from src.settings import settings
-from src.utils import DateTimeJSONDecoder, get_response_from_pydantic_error
+from src.services.exceptions import InvalidMove, ServiceException  # NOQA: E402
+from src.utils import DateTimeJSONDecoder, get_response_from_pydantic_error  # NOQA: E402
 
 
 logger = Logger()
 
+bootstrap.warm_up()
+INIT_DURATION_MS = (time.perf_counter() - INIT_STARTED_AT) * 1000
+_is_cold_start = True
+
 
 @logger.inject_lambda_context(log_event=True)
 def main_handler(event: dict[str, Any], context: LambdaContext) -> dict[str, Any]:
+    global _is_cold_start
+
+    invoke_started_at = time.perf_counter()
+    try:
+        return handle_event(event=event)
+    finally:
+        logger.info(
+            "Invocation finished",
+            extra={
+                "cold_start": _is_cold_start,
+                "init_duration_ms": INIT_DURATION_MS if _is_cold_start else 0.0,
+                "invoke_duration_ms": (time.perf_counter() - invoke_started_at) * 1000,
+            },
+        )
+        _is_cold_start = False
+
+
+def handle_event(event: dict[str, Any]) -> dict[str, Any]:
     request_context = event.get("requestContext", {})
     user_id = request_context["authorizer"]["principalId"]
     domain = request_context.get("domainName")
@@ -39,23 +62,7 @@ def main_handler(event: dict[str, Any], context: LambdaContext) -> dict[str, Any
     connection_id = request_context.get("connectionId")
     route_key = request_context.get("routeKey")
 
-    api_gateway_client: APIGatewayClient = boto3.client(
-        "apigatewaymanagementapi", endpoint_url=f"https://{domain}/{stage}"
-    )
-    table_name = settings.dynamodb_games_table_name
-    user_data_access = UserDataAccess(table_name=table_name)
-    lobby_data_access = LobbyDataAccess(table_name=table_name)
-    game_data_access = GameDataAccess(table_name=table_name)
-
-    websocket_handler = WebsocketHandler(
-        user_data_access=user_data_access,
-        lobby_data_access=lobby_data_access,
-        game_data_access=game_data_access,
-        game_service=GameService(
-            game_data_access=game_data_access, lobby_data_access=lobby_data_access, user_data_access=user_data_access
-        ),
-        api_gateway_client=api_gateway_client,
-    )
+    websocket_handler = bootstrap.get_websocket_handler(endpoint_url=f"https://{domain}/{stage}")
 
     if route_key == RouteKey.CONNECT.value:
         websocket_handler.connect_user(user_id=user_id, connection_id=connection_id)
@@ -79,42 +86,40 @@ def main_handler(event: dict[str, Any], context: LambdaContext) -> dict[str, Any
 
     try:
         if action == Action.LIST_LOBBIES.value:
-            lobbies = lobby_data_access.get_many(pk="lobby")
+            payload = ListLobbiesPayload(**payload)
+            lobbies = websocket_handler.list_lobbies(payload=payload, user_id=user_id)
             websocket_handler.send_lobbies_list_to_connection(lobbies=lobbies, connection_id=connection_id)
 
         elif action == Action.CREATE_LOBBY.value:
             payload = CreateLobbyPayload(**payload)
             lobby = websocket_handler.create_lobby(payload=payload, user_id=user_id)
-
-            users = websocket_handler.user_data_access.get_many(pk="user")
-            websocket_handler.send_lobby_updated_to_users(users=users, lobby=lobby)
+            websocket_handler.send_lobby_updated_to_online_users(lobby=lobby)
 
         elif action == Action.JOIN_LOBBY.value:
             payload = JoinLobbyPayload(**payload)
             game_model = websocket_handler.join_lobby(payload=payload, user_id=user_id)
-            users = websocket_handler.user_data_access.get_many(pk="user")
 
             if game_model is not None:
-                websocket_handler.send_game_preview_updated_to_users(users=users, game=game_model)
-                websocket_handler.send_lobby_deleted_to_users(users=users, lobby_id=payload.lobby_id)
+                websocket_handler.send_game_preview_updated_to_online_users(game=game_model)
+                websocket_handler.send_lobby_deleted_to_online_users(lobby_id=payload.lobby_id)
             else:
                 lobby = websocket_handler.lobby_data_access.get(pk="lobby", sk=f"lobby#{payload.lobby_id}")
-                websocket_handler.send_lobby_updated_to_users(users=users, lobby=lobby)
+                websocket_handler.send_lobby_updated_to_online_users(lobby=lobby)
 
         elif action == Action.LEAVE_LOBBY.value:
             payload = LeaveLobbyPayload(**payload)
             deleted = websocket_handler.leave_lobby(payload=payload, user_id=user_id)
 
-            users = websocket_handler.user_data_access.get_many(pk="user")
             if deleted:
-                websocket_handler.send_lobby_deleted_to_users(users=users, lobby_id=payload.lobby_id)
+                websocket_handler.send_lobby_deleted_to_online_users(lobby_id=payload.lobby_id)
             else:
                 lobby = websocket_handler.lobby_data_access.get(pk="lobby", sk=f"lobby#{payload.lobby_id}")
-                websocket_handler.send_lobby_updated_to_users(users=users, lobby=lobby)
+                websocket_handler.send_lobby_updated_to_online_users(lobby=lobby)
 
         elif action == Action.LIST_GAMES.value:
-            games = websocket_handler.game_data_access.get_many(pk="game")
-            websocket_handler.send_games_preview_to_connection(games=games, connection_id=connection_id)
+            payload = ListGamesPayload(**payload)
+            previews = websocket_handler.list_games(payload=payload, user_id=user_id)
+            websocket_handler.send_games_preview_to_connection(previews=previews, connection_id=connection_id)
 
         elif action == Action.GET_GAME_DETAIL:
             payload = GetGameDetailPayload(**payload)
@@ -127,6 +132,25 @@ def main_handler(event: dict[str, Any], context: LambdaContext) -> dict[str, Any
 
             websocket_handler.send_game_detail_to_connection(game=game, user_id=user_id, connection_id=connection_id)
 
+        elif action == Action.MAKE_MOVES.value:
+            payload = MakeMovesPayload(**payload)
+            try:
+                game = websocket_handler.make_moves(payload=payload, user_id=user_id)
+            except InvalidMove as exc:
+                # moves preceding the invalid one are saved
+                if exc.game is not None:
+                    websocket_handler.send_game_detail_to_connection(
+                        game=exc.game, user_id=user_id, connection_id=connection_id
+                    )
+                websocket_handler.send_to_connection(
+                    body={"type": PayloadType.ERROR.value, "detail": str(exc), "moveIndex": exc.index},
+                    connection_id=connection_id,
+                )
+            else:
+                websocket_handler.send_game_detail_to_connection(
+                    game=game, user_id=user_id, connection_id=connection_id
+                )
+
         else:
             websocket_handler.send_to_connection(
                 body={"type": PayloadType.INVALID_PAYLOAD.value, "detail": f"No action named {action}"},
@@ -0,0 +1,18 @@
+#!/usr/bin/env sh
+
+set -u
+set -e
+
+# Runs are compared against a pinned baseline, median slower by more than 15% fails the run.
+# The baseline is saved as .benchmarks/<machine>/<number>_baseline.json by the first run, or by a run with
+# BENCHMARK_SAVE_BASELINE=1 (make benchmark-baseline), e.g. on the commit a branch starts from.
+# Timings depend on the machine, so the baseline is not committed - CI restores .benchmarks/ from its cache,
+# saved by a baseline run of the main branch, before running this script (see .github/workflows/main.yml).
+baseline="$(find .benchmarks -name '*_baseline.json' 2>/dev/null | sort | tail -n 1)"
+if [ "${BENCHMARK_SAVE_BASELINE:-0}" = "1" ] || [ -z "$baseline" ]; then
+  options="--benchmark-save=baseline"
+else
+  options="--benchmark-compare=$(basename "$baseline" .json) --benchmark-compare-fail=median:15%"
+fi
+
+pytest tests/benchmarks $options --benchmark-columns=min,mean,median,stddev,rounds "$@"
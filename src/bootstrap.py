@@ -0,0 +1,76 @@
+"""
+Objects expensive to build (boto3 session, API Gateway clients, data accesses and tables in table pool) are created
+once per Lambda container and reused by all warm invocations.
+"""
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import boto3
+from botocore.config import Config
+
+from src.data_access.connection import ConnectionDataAccess
+from src.data_access.game import GameDataAccess
+from src.data_access.lobby import LobbyDataAccess
+from src.data_access.pool import get_table, table_pool
+from src.data_access.user import UserDataAccess
+from src.services.game import GameService
+from src.services.websocket import WebsocketHandler
+from src.settings import settings
+
+
+if TYPE_CHECKING:
+    from mypy_boto3_apigateway.client import APIGatewayClient
+
+
+@lru_cache(maxsize=None)
+def get_session() -> boto3.Session:
+    return boto3.Session(
+        aws_access_key_id=settings.aws_access_key,
+        aws_secret_access_key=settings.aws_secret_key,
+        region_name=settings.region,
+    )
+
+
+@lru_cache(maxsize=32)
+def get_api_gateway_client(endpoint_url: str) -> "APIGatewayClient":
+    """Every websocket API domain and stage has its own endpoint, so clients are cached per endpoint."""
+    return get_session().client(
+        "apigatewaymanagementapi",
+        endpoint_url=endpoint_url,
+        # every concurrent broadcast post needs its own connection
+        config=Config(max_pool_connections=settings.broadcast_max_concurrency, tcp_keepalive=True),
+    )
+
+
+@lru_cache(maxsize=32)
+def get_websocket_handler(endpoint_url: str) -> WebsocketHandler:
+    table_name = settings.dynamodb_games_table_name
+    user_data_access = UserDataAccess(table_name=table_name)
+    lobby_data_access = LobbyDataAccess(table_name=table_name)
+    game_data_access = GameDataAccess(table_name=table_name)
+
+    return WebsocketHandler(
+        user_data_access=user_data_access,
+        lobby_data_access=lobby_data_access,
+        game_data_access=game_data_access,
+        connection_data_access=ConnectionDataAccess(table_name=table_name),
+        game_service=GameService(
+            game_data_access=game_data_access, lobby_data_access=lobby_data_access, user_data_access=user_data_access
+        ),
+        api_gateway_client=get_api_gateway_client(endpoint_url=endpoint_url),
+    )
+
+
+def warm_up() -> None:
+    """Called during Lambda init phase, which runs before the first request is received."""
+    get_table(table_name=settings.dynamodb_games_table_name)
+
+
+_CACHED_FUNCTIONS = (get_session, get_api_gateway_client, get_websocket_handler)
+
+
+def reset() -> None:
+    """Drops everything built so far, e.g. after settings were changed in tests."""
+    for cached_function in _CACHED_FUNCTIONS:
+        cached_function.cache_clear()
+    table_pool.clear()
@@ -3,6 +3,8 @@ from typing import Any, Optional, Type
 
 from pydantic import BaseModel
 
+from src.core.cards import Card
+from src.core.consts import USER
 from src.core.exceptions import InvalidPayloadType, InvalidUser
 from src.core.schemas import BaseSchema
 from src.core.state import GameState
@@ -35,6 +37,11 @@ class GameStep(BaseSchema, ABC):
     def dispatch_payload(self, payload: Payload) -> GameState:
         raise NotImplementedError
 
+    @abstractmethod
+    def legal_moves(self, user: USER) -> list[Card]:
+        """Cards that user can use in a payload accepted by validate_payload right now."""
+        raise NotImplementedError
+
     @property
     @abstractmethod
     def payload_class(self) -> Type[Payload]:
@@ -1,14 +1,69 @@
-from pydantic import BaseModel, Field
+from typing import Any
+
+from pydantic import BaseModel, Field, PrivateAttr
 
 from src.core.enums import CardSuit
 from src.core.exceptions import InvalidCardComparison
 
 
+SUIT_OFFSETS = {CardSuit.SPADE: 0, CardSuit.CLUB: 13, CardSuit.DIAMOND: 26, CardSuit.HEART: 39}
+
+
 class Card(BaseModel):
+    """
+    Immutable playing card. The 52 module-level cards are interned - validating a Card or its dict
+    (e.g. when loading a game from the table) returns the matching singleton instead of building a new model.
+    """
+
     suit: CardSuit
     value: int = Field(..., ge=2, le=14)
     score: int = 0
 
+    _ordinal: int = PrivateAttr()
+
+    class Config:
+        allow_mutation = False
+
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        self._ordinal = SUIT_OFFSETS[self.suit] + self.value - 2
+
+    @classmethod
+    def validate(cls, value: Any) -> "Card":
+        if isinstance(value, cls):
+            return value
+
+        if isinstance(value, dict):
+            try:
+                card = CARDS_BY_SUIT_AND_VALUE[(CardSuit(value["suit"]), int(value["value"]))]
+            except (KeyError, TypeError, ValueError):
+                return super().validate(value)
+
+            # score is given by suit and value, points are always counted with the score of the interned card
+            if "score" in value and value["score"] != card.score:
+                raise ValueError(f"Card {card} has score {card.score}, not {value['score']}")
+            return card
+
+        return super().validate(value)
+
+    def __eq__(self, card: Any) -> bool:
+        if self is card:
+            return True
+
+        if not isinstance(card, Card):
+            return NotImplemented
+
+        return self._ordinal == card._ordinal
+
+    def __hash__(self) -> int:
+        return self._ordinal
+
+    def __copy__(self) -> "Card":
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "Card":
+        return self
+
     def __lt__(self, card: "Card") -> bool:
         if self.suit != card.suit:
             raise InvalidCardComparison("Cannot compare card values with different suits.")
@@ -24,6 +79,11 @@ class Card(BaseModel):
     def __str__(self) -> str:
         return f"{self.suit}_{self.value}"
 
+    @property
+    def ordinal(self) -> int:
+        """Index of the card in ALL_CARDS, used as its bit position in deck masks."""
+        return self._ordinal
+
 
 SPADE_2 = Card(suit=CardSuit.SPADE, value=2)
 SPADE_3 = Card(suit=CardSuit.SPADE, value=3)
@@ -138,3 +198,9 @@ ALL_CARDS = [
 ]
 
 CARD_MAPPING = {f"{card.suit}_{card.value}": card for card in ALL_CARDS}
+CARDS_BY_SUIT_AND_VALUE = {(card.suit, card.value): card for card in ALL_CARDS}
+
+# lookup tables indexed by Card.ordinal
+CARD_SUITS = tuple(card.suit for card in ALL_CARDS)
+CARD_VALUES = tuple(card.value for card in ALL_CARDS)
+CARD_SCORES = tuple(card.score for card in ALL_CARDS)
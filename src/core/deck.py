@@ -0,0 +1,143 @@
+from typing import Any, Callable, Generator, Iterable, Optional, SupportsIndex
+
+from src.core.cards import ALL_CARDS, Card
+from src.core.enums import CardSuit
+
+
+SUIT_MASKS: dict[CardSuit, int] = {
+    suit: sum(1 << card.ordinal for card in ALL_CARDS if card.suit == suit) for suit in CardSuit
+}
+SCORE_MASKS: dict[int, int] = {
+    score: sum(1 << card.ordinal for card in ALL_CARDS if card.score == score)
+    for score in {card.score for card in ALL_CARDS}
+    if score
+}
+
+
+def count_cards(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def get_cards_mask(cards: Iterable[Card]) -> int:
+    if isinstance(cards, Deck):
+        return cards.mask
+
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.ordinal
+
+    return mask
+
+
+def get_mask_cards(mask: int) -> list[Card]:
+    return [card for card in ALL_CARDS if mask >> card.ordinal & 1]
+
+
+def get_mask_suits(mask: int) -> list[CardSuit]:
+    return [suit for suit, suit_mask in SUIT_MASKS.items() if mask & suit_mask]
+
+
+def get_mask_score(mask: int) -> int:
+    return sum(score * count_cards(mask & score_mask) for score, score_mask in SCORE_MASKS.items())
+
+
+class Deck(list):
+    """
+    List of cards indexed by a 52-bit mask, where bit n is set when ALL_CARDS[n] is in the deck.
+    Keeps the order and JSON shape of list[Card], while membership, suit and score checks are integer operations.
+    """
+
+    def __init__(self, cards: Iterable[Card] = ()) -> None:
+        super().__init__(cards)
+        # computed lazily, since BaseModel.dict() rebuilds decks out of card dicts
+        self._mask: Optional[int] = None
+
+    @classmethod
+    def __get_validators__(cls) -> Generator[Callable[[Any], "Deck"], None, None]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: Any) -> "Deck":
+        if not isinstance(value, (list, tuple, set)):
+            raise TypeError("Deck must be a list of cards")
+
+        return cls(Card.validate(card) for card in value)
+
+    @classmethod
+    def from_mask(cls, mask: int) -> "Deck":
+        deck = cls(get_mask_cards(mask))
+        deck._mask = mask
+        return deck
+
+    @property
+    def mask(self) -> int:
+        if self._mask is None:
+            self._mask = get_cards_mask(iter(self))
+        return self._mask
+
+    @property
+    def score(self) -> int:
+        return get_mask_score(self.mask)
+
+    def has_suit(self, suit: CardSuit) -> bool:
+        return bool(self.mask & SUIT_MASKS[suit])
+
+    def get_suit_mask(self, suit: CardSuit) -> int:
+        return self.mask & SUIT_MASKS[suit]
+
+    def copy(self) -> "Deck":
+        deck = Deck(self)
+        deck._mask = self._mask
+        return deck
+
+    def __copy__(self) -> "Deck":
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "Deck":
+        # cards are immutable singletons, so a shallow copy is a deep one
+        return self.copy()
+
+    def __contains__(self, card: Any) -> bool:
+        if isinstance(card, Card):
+            return bool(self.mask >> card.ordinal & 1)
+
+        return super().__contains__(card)
+
+    def append(self, card: Card) -> None:
+        super().append(card)
+        if self._mask is not None:
+            self._mask |= 1 << card.ordinal
+
+    def remove(self, card: Card) -> None:
+        super().remove(card)
+        if self._mask is not None:
+            self._mask &= ~(1 << card.ordinal)
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        super().extend(cards)
+        self._mask = None
+
+    def insert(self, index: SupportsIndex, card: Card) -> None:
+        super().insert(index, card)
+        self._mask = None
+
+    def pop(self, index: SupportsIndex = -1) -> Card:
+        card = super().pop(index)
+        self._mask = None
+        return card
+
+    def clear(self) -> None:
+        super().clear()
+        self._mask = 0
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._mask = None
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._mask = None
+
+    def __iadd__(self, cards: Iterable[Card]) -> "Deck":
+        self.extend(cards)
+        return self
@@ -1,4 +1,6 @@
-from src.core.cards import CARD_MAPPING
+from src.core.cards import CARD_MAPPING, Card
+from src.core.consts import USER
+from src.core.deck import SUIT_MASKS, get_cards_mask, get_mask_cards
 from src.core.enums import CardSuit
 from src.core.exceptions import InvalidPayloadBody
 from src.core.state import GameState
@@ -30,12 +32,29 @@ class RoundPayloadValidationMixin:
                 f"despite having at least one more suit on deck"
             )
 
-        if (suit := self.local_state.table_suit) is not None:
+        # games stored before the table suit was reset with the trick may still hold the suit of the previous one
+        if self.local_state.cards_on_table and (suit := self.local_state.table_suit) is not None:
             if card.suit != suit and check_if_user_has_suit(suit=suit, deck=self.game_state.decks[payload.user]):
                 raise InvalidPayloadBody(
                     f"Table suit is {suit}, user tries to place {card.suit}," f" despite having matching suit on deck"
                 )
 
+    def legal_moves(self, user: USER) -> list[Card]:
+        if (current_user := self.game_state.current_user) is not None and current_user != user:
+            return []
+
+        deck = self.game_state.decks[user]
+        cards_on_table = self.local_state.cards_on_table
+        legal_cards_mask = deck.mask & ~get_cards_mask(cards_on_table.values())
+
+        if not cards_on_table and not check_if_user_has_only_one_suit(deck=deck):
+            legal_cards_mask &= ~SUIT_MASKS[CardSuit.HEART]
+
+        if cards_on_table and deck.has_suit(suit := self.local_state.table_suit):
+            legal_cards_mask &= SUIT_MASKS[suit]
+
+        return get_mask_cards(legal_cards_mask)
+
 
 class RoundDispatchPayloadMixin:
     """
@@ -48,7 +67,7 @@ class RoundDispatchPayloadMixin:
             self.local_state.table_suit = card.suit
 
         self.local_state.cards_on_table[payload.user] = card
-        new_state = self.game_state.copy(deep=True)
+        new_state = self.game_state.with_card_removed(user=payload.user, card=card)
         if len(self.local_state.cards_on_table) == len(self.game_state.users):
             cards_on_table = self.local_state.cards_on_table
 
@@ -56,14 +75,16 @@ class RoundDispatchPayloadMixin:
                 (user for user, card in cards_on_table.items() if card.suit == self.local_state.table_suit),
                 key=lambda user: cards_on_table[user].value,
             )
-            new_state.scores[user_collecting_score] += count_points_for_cards(deck=cards_on_table.values())
+            new_state = new_state.with_points_added(
+                user=user_collecting_score, points=count_points_for_cards(deck=cards_on_table.values())
+            )
             new_state.current_user = user_collecting_score
             self.local_state.cards_on_table = {}
+            self.local_state.table_suit = None
         else:
             next_user = self.game_state.users[(self.game_state.users.index(payload.user) + 1) % len(new_state.users)]
             new_state.current_user = next_user
 
-        new_state.decks[payload.user].remove(card)
         self.game_state = new_state
 
         return self.game_state
@@ -4,15 +4,21 @@ from pydantic import BaseModel
 
 from src.core.cards import Card
 from src.core.consts import USER
+from src.core.deck import Deck
 from src.core.schemas import BaseSchema
 from src.core.utils import get_initial_decks, get_initial_scores
 
 
 class GameState(BaseSchema):
+    """
+    Game state is treated as immutable by game steps - moves produce new states via copy-on-write methods below,
+    which share every deck and score entry that the move did not touch.
+    """
+
     current_user: Optional[USER] = None
     users: list[USER]
     scores: dict[USER, int]
-    decks: dict[USER, list[Card]]
+    decks: dict[USER, Deck]
 
     @classmethod
     def get_initial_game_state(cls, users: list[USER]) -> "GameState":
@@ -29,3 +35,11 @@ class GameState(BaseSchema):
             scores=game_state.scores,
             decks=get_initial_decks(users=game_state.users),
         )
+
+    def with_card_removed(self, user: USER, card: Card) -> "GameState":
+        deck = self.decks[user].copy()
+        deck.remove(card)
+        return self.copy(update={"decks": {**self.decks, user: deck}})
+
+    def with_points_added(self, user: USER, points: int) -> "GameState":
+        return self.copy(update={"scores": {**self.scores, user: self.scores[user] + points}})
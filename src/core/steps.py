@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import Optional, Type
 
 from pydantic import Field
@@ -6,6 +5,7 @@ from pydantic import Field
 from src.core.abstract import GameStep
 from src.core.cards import CARD_MAPPING, Card
 from src.core.consts import USER
+from src.core.deck import Deck
 from src.core.exceptions import InvalidPayloadBody
 from src.core.mixins import RoundDispatchPayloadMixin, RoundPayloadValidationMixin
 from src.core.state import GameState
@@ -29,20 +29,18 @@ class FinishedStep(GameStep):
         if payload.user in self.local_state.users_ready:
             raise InvalidPayloadBody(f"User {payload.user} has already declared readiness.")
 
+    def legal_moves(self, user: USER) -> list[Card]:
+        return []
+
     def dispatch_payload(self, payload: FinishedPayload) -> GameState:
         self.local_state.users_ready.append(payload.user)
         if len(self.local_state.users_ready) == len(self.game_state.users):
-            new_state = self.game_state.copy(deep=True)
-            new_state = GameState.from_state(game_state=new_state)
-            self.game_state = new_state
+            self.game_state = GameState.from_state(game_state=self.game_state)
 
         return self.game_state
 
     def on_start(self) -> GameState:
-        new_state = self.game_state.copy(deep=True)
-        new_state.current_user = None
-
-        self.game_state = new_state
+        self.game_state = self.game_state.copy(update={"current_user": None})
         return self.game_state
 
     @property
@@ -112,7 +110,7 @@ class CardExchangeStep(GameStep):
 
     def validate_payload(self, payload: CardExchangePayload) -> None:
         super().validate_payload(payload=payload)
-        if payload.user in self.local_state:
+        if payload.user in self.local_state.cards_to_exchange:
             raise InvalidPayloadBody(f"User {payload.user} has already declared cards for exchange")
 
         for card_str in payload.cards:
@@ -120,18 +118,23 @@ class CardExchangeStep(GameStep):
             if card not in self.game_state.decks[payload.user]:
                 raise InvalidPayloadBody(f"User {payload.user} does not have card {card}")
 
+    def legal_moves(self, user: USER) -> list[Card]:
+        if user in self.local_state.cards_to_exchange:
+            return []
+
+        return list(self.game_state.decks[user])
+
     def dispatch_payload(self, payload: CardExchangePayload) -> GameState:
         self.local_state.cards_to_exchange[payload.user] = [CARD_MAPPING[card_str] for card_str in payload.cards]
         if len(self.local_state.cards_to_exchange) == len(self.game_state.users):
-            new_state = self.game_state.copy(deep=True)
-            new_state.decks = self._get_decks_with_cards_exchanged()
+            new_state = self.game_state.copy(update={"decks": self._get_decks_with_cards_exchanged()})
             self.local_state.cards_to_exchange = {}
             self.game_state = new_state
 
         return self.game_state
 
-    def _get_decks_with_cards_exchanged(self) -> dict[USER, list[Card]]:
-        new_decks = deepcopy(self.game_state.decks)
+    def _get_decks_with_cards_exchanged(self) -> dict[USER, Deck]:
+        new_decks = {user: deck.copy() for user, deck in self.game_state.decks.items()}
         users = self.game_state.users
 
         # if users: [1, 2, 3] then: {1: 2, 2: 3, 3:1}
@@ -139,8 +142,6 @@ class CardExchangeStep(GameStep):
 
         for user, cards_to_exchange in self.local_state.cards_to_exchange.items():
             for card in cards_to_exchange:
-                print(new_decks[user])
-                print(card, card.score)
                 new_decks[user].remove(card)
                 new_decks[from_to_mapping[user]].append(card)
 
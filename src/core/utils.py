@@ -4,11 +4,12 @@ from collections import defaultdict
 from src.core import cards
 from src.core.cards import Card
 from src.core.consts import USER
+from src.core.deck import SUIT_MASKS, Deck, get_cards_mask, get_mask_score
 from src.core.enums import CardSuit
 from src.core.exceptions import FirstUserNotFound, InvalidNumberOfUsers
 
 
-def get_initial_decks(users: list[USER]) -> dict[USER, list[cards.Card]]:
+def get_initial_decks(users: list[USER]) -> dict[USER, Deck]:
     if len(users) not in (3, 4):
         raise InvalidNumberOfUsers("Invalid number of players, should be 3 or 4.")
 
@@ -17,7 +18,7 @@ def get_initial_decks(users: list[USER]) -> dict[USER, list[cards.Card]]:
         all_cards.remove(cards.CLUB_2)
 
     random.shuffle(all_cards)
-    decks = defaultdict(list)
+    decks = defaultdict(Deck)
     for index, card in enumerate(all_cards):
         decks[users[index % len(users)]].append(card)
 
@@ -50,22 +51,16 @@ def get_first_user(decks: dict[USER, list[cards.Card]]) -> str:
 
 
 def check_if_user_has_suit(suit: CardSuit, deck: list[cards.Card]) -> bool:
-    for card in deck:
-        if suit == card.suit:
-            return True
-
-    return False
+    return bool(get_cards_mask(deck) & SUIT_MASKS[suit])
 
 
 def check_if_user_has_only_one_suit(deck: list[cards.Card]) -> bool:
-    suits = set()
-
-    for card in deck:
-        suits.add(card.suit.value)
-        if len(suits) > 1:
-            return False
-    return True
+    mask = get_cards_mask(deck)
+    return sum(1 for suit_mask in SUIT_MASKS.values() if mask & suit_mask) <= 1
 
 
 def count_points_for_cards(deck: list[cards.Card]) -> int:
-    return sum([card.score for card in deck])
+    if isinstance(deck, Deck):
+        return get_mask_score(deck.mask)
+
+    return sum(cards.CARD_SCORES[card.ordinal] for card in deck)
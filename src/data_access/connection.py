@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from src.data_access.dynamodb import DynamoDBDataAccess
+from src.schemas.connection import CONNECTION_PKS, ConnectionModel, get_connection_pk
+from src.schemas.user import UserModel
+
+
+class ConnectionDataAccess(DynamoDBDataAccess[str, str, ConnectionModel]):
+    _model = ConnectionModel
+    # shared by all instances, every shard is queried by its own thread
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    def get_connection_ids(self, page_size: int = 1000) -> list[str]:
+        """
+        Reads only keys of live connections, page by page. Shards are queried concurrently, so listing takes about
+        as long as reading the largest shard.
+        """
+        shards = self._get_executor().map(
+            lambda pk: [
+                item["SK"].split("#", 1)[-1] for item in self.iter_items(pk=pk, projection=["SK"], page_size=page_size)
+            ],
+            CONNECTION_PKS,
+        )
+        return [connection_id for shard in shards for connection_id in shard]
+
+    def delete_many(self, *, connection_ids: list[str]) -> None:
+        self.bulk_delete(
+            keys=[
+                {"pk": get_connection_pk(connection_id=connection_id), "sk": f"connection#{connection_id}"}
+                for connection_id in connection_ids
+            ]
+        )
+
+    def register_users_connections(self, *, users: Iterable[UserModel]) -> int:
+        """Registers connections of the users, returns their number. Connections already registered are rewritten."""
+        connections = [
+            ConnectionModel(connection_id=connection_id, user_id=user.email)
+            for user in users
+            for connection_id in user.connection_ids
+        ]
+        self.bulk_save(models=connections)
+        return len(connections)
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=len(CONNECTION_PKS), thread_name_prefix="connections")
+        return cls._executor
@@ -1,30 +1,57 @@
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Generic, Optional, Type, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Iterator, Optional, Type, TypeVar
 
-import boto3
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
-from mypy_boto3_dynamodb import DynamoDBServiceResource
 
-from src.data_access.exceptions import AlreadyExists, DoesNotExist
+from src.data_access.exceptions import AlreadyExists, DoesNotExist, TransactionCanceled, UnprocessedKeys
+from src.data_access.expressions import MAX_UPDATE_EXPRESSION_LENGTH, get_update_kwargs
+from src.data_access.pool import get_table
 from src.schemas.base import DynamoDBBaseModel
-from src.settings import settings
+
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
 
 
 PK = TypeVar("PK")
 SK = TypeVar("SK")
 Model = TypeVar("Model", bound=DynamoDBBaseModel)
 
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 8
+BATCH_GET_BASE_DELAY = 0.05  # seconds
+BATCH_GET_MAX_DELAY = 2.0
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, so throttled concurrent requests do not retry all at once."""
+    return random.uniform(0, min(BATCH_GET_MAX_DELAY, BATCH_GET_BASE_DELAY * 2**attempt))
+
+
+def get_projection_kwargs(projection: list[str]) -> dict[str, Any]:
+    """
+    Attribute names are replaced with placeholders, because names like "users" are DynamoDB reserved words,
+    nested attributes are given as dotted paths, e.g. "game.state.users".
+    """
+    placeholders: dict[str, str] = {}
+    paths = []
+    for path in projection:
+        segments = [placeholders.setdefault(segment, f"#p{len(placeholders)}") for segment in path.split(".")]
+        paths.append(".".join(segments))
+
+    return {
+        "ProjectionExpression": ", ".join(paths),
+        "ExpressionAttributeNames": {placeholder: segment for segment, placeholder in placeholders.items()},
+    }
+
 
 class DynamoDBDataAccess(Generic[PK, SK, Model], ABC):
-    def __init__(self, table_name: str) -> None:
-        dynamodb: DynamoDBServiceResource = boto3.resource(
-            "dynamodb",
-            region_name=settings.region,
-            aws_access_key_id=settings.aws_access_key,
-            aws_secret_access_key=settings.aws_secret_key,
-        )
-        self._table = dynamodb.Table(table_name)
+    def __init__(self, table_name: str, table: Optional["Table"] = None) -> None:
+        """Table can be passed explicitly, otherwise the one shared through table pool is used."""
+        self._table = table if table is not None else get_table(table_name=table_name)
 
     @property
     @abstractmethod
@@ -41,11 +68,107 @@ class DynamoDBDataAccess(Generic[PK, SK, Model], ABC):
         return None
 
     def get_many(self, pk: PK) -> list[Model]:
-        expression = Key("PK").eq(pk)
+        return list(self.iter_many(pk=pk))
 
-        items = self._table.query(KeyConditionExpression=expression)["Items"]
-        models = [self._model.from_item(item=item) for item in items]
-        return models
+    def iter_many(
+        self,
+        pk: PK,
+        *,
+        projection: Optional[list[str]] = None,
+        page_size: Optional[int] = None,
+        limit: Optional[int] = None,
+        scan_index_forward: bool = True,
+    ) -> Iterator[Model]:
+        """
+        Yields models from the partition sorted by SK, next page is queried only after previous one is consumed.
+        With projection, model's from_item has to handle items containing only projected attributes.
+        """
+        for item in self.iter_items(
+            pk=pk, projection=projection, page_size=page_size, limit=limit, scan_index_forward=scan_index_forward
+        ):
+            yield self._model.from_item(item=item)
+
+    def iter_items(
+        self,
+        pk: PK,
+        *,
+        projection: Optional[list[str]] = None,
+        page_size: Optional[int] = None,
+        limit: Optional[int] = None,
+        scan_index_forward: bool = True,
+        after_sk: Optional[SK] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Same as iter_many, but yields raw items. Limit caps total number of items, page_size - of one query.
+        With after_sk, only items with SK greater than it are read.
+        """
+        key_condition = Key("PK").eq(pk)
+        if after_sk is not None:
+            key_condition &= Key("SK").gt(after_sk)
+        query_kwargs: dict[str, Any] = {
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": scan_index_forward,
+        }
+        if projection is not None:
+            query_kwargs.update(get_projection_kwargs(projection=projection))
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_limit = page_size if remaining is None else min(page_size or remaining, remaining)
+            if page_limit is not None:
+                query_kwargs["Limit"] = page_limit
+
+            response = self._table.query(**query_kwargs)
+            items = response["Items"]
+            if remaining is not None:
+                remaining -= len(items)
+            yield from items
+
+            if "LastEvaluatedKey" not in response:
+                return
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def iter_items_by_keys(
+        self, *, keys: list[dict[str, str]], projection: Optional[list[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Keys are in the same format as DynamoDBBaseModel.key, items are read with BatchGetItem in chunks of
+        BATCH_GET_MAX_KEYS. Items which do not exist are skipped and order of yielded items is not guaranteed,
+        use get_many_by_keys to get models in order of keys.
+        """
+        table_name = self._table.name
+        unique_keys = list({(key["pk"], key["sk"]): key for key in keys}.values())  # duplicates are rejected
+        request_kwargs = get_projection_kwargs(projection=projection) if projection is not None else {}
+
+        for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+            chunk = unique_keys[start : start + BATCH_GET_MAX_KEYS]
+            request_items = {
+                table_name: {"Keys": [{"PK": key["pk"], "SK": key["sk"]} for key in chunk], **request_kwargs}
+            }
+            for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+                if attempt > 0:
+                    time.sleep(get_backoff_delay(attempt=attempt - 1))
+
+                response = self._table.meta.client.batch_get_item(RequestItems=request_items)
+                yield from response["Responses"].get(table_name, [])
+                # keys throttled or over response size limit come back as unprocessed and have to be requested again
+                if not (request_items := response.get("UnprocessedKeys")):
+                    break
+            else:
+                unprocessed_count = len(request_items[table_name]["Keys"])
+                raise UnprocessedKeys(
+                    f"{unprocessed_count} keys still unprocessed after {BATCH_GET_MAX_RETRIES} retries"
+                )
+
+    def get_many_by_keys(self, *, keys: list[dict[str, str]]) -> list[Model]:
+        """
+        Models in the same order as keys, for keys of items which do not exist nothing is returned.
+        All lookups are done in one BatchGetItem call per BATCH_GET_MAX_KEYS keys.
+        """
+        models = {
+            (item["PK"], item["SK"]): self._model.from_item(item=item) for item in self.iter_items_by_keys(keys=keys)
+        }
+        return [models[(key["pk"], key["sk"])] for key in keys if (key["pk"], key["sk"]) in models]
 
     def create(self, *, model: Model) -> Model:
         try:
@@ -63,11 +186,58 @@ class DynamoDBDataAccess(Generic[PK, SK, Model], ABC):
         """Same as create, but does not throw error if item exists, updates it instead."""
         self._table.put_item(Item=model.to_item())
 
+    def update(self, *, model: Model, original_item: dict[str, Any]) -> None:
+        """
+        Writes only attributes which differ from original_item, which is model.to_item() taken before the model was
+        changed, e.g. appended connection id instead of the whole user. Item has to exist.
+        """
+        try:
+            self._update(model=model, original_item=original_item, condition_expression="attribute_exists(SK)")
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise DoesNotExist(f"Item with PK={model.pk} and SK={model.sk} does not exist") from error
+            raise error
+
+    def _update(
+        self,
+        *,
+        model: Model,
+        original_item: dict[str, Any],
+        condition_expression: str,
+        names: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, Any]] = None,
+    ) -> None:
+        item = model.to_item()
+        if (update_kwargs := get_update_kwargs(original_item=original_item, item=item)) is None:
+            return
+
+        condition_kwargs: dict[str, Any] = {"ConditionExpression": condition_expression}
+        if names:
+            condition_kwargs["ExpressionAttributeNames"] = names
+        if values:
+            condition_kwargs["ExpressionAttributeValues"] = values
+
+        if len(update_kwargs["UpdateExpression"]) > MAX_UPDATE_EXPRESSION_LENGTH:
+            self._table.put_item(Item=item, **condition_kwargs)
+            return
+
+        # placeholders of update expression are prefixed with "u", so they do not clash with the condition ones
+        for kwarg in ("ExpressionAttributeNames", "ExpressionAttributeValues"):
+            if kwarg in condition_kwargs:
+                update_kwargs[kwarg] = {**update_kwargs.get(kwarg, {}), **condition_kwargs.pop(kwarg)}
+        self._table.update_item(Key={"PK": model.pk, "SK": model.sk}, **update_kwargs, **condition_kwargs)
+
     def bulk_save(self, *, models: list[Model]) -> None:
         with self._table.batch_writer() as batch:
             for model in models:
                 batch.put_item(Item=model.to_item())
 
+    def bulk_delete(self, *, keys: list[dict[str, str]]) -> None:
+        """Keys are in the same format as DynamoDBBaseModel.key"""
+        with self._table.batch_writer() as batch:
+            for key in keys:
+                batch.delete_item(Key={"PK": key["pk"], "SK": key["sk"]})
+
     def create_many(self, *, models: list[Model]) -> list[Model]:
         """TODO: Deprecated, to remove"""
         with self._table.batch_writer() as batch:
@@ -76,6 +246,87 @@ class DynamoDBDataAccess(Generic[PK, SK, Model], ABC):
 
         return models
 
+    def get_put_operation(
+        self,
+        *,
+        model: DynamoDBBaseModel,
+        condition_expression: Optional[str] = None,
+        names: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Put to be executed with transact_write, model can be of any type stored in the table."""
+        return {"Put": {"Item": model.to_item(), **self._get_operation_kwargs(condition_expression, names, values)}}
+
+    def get_update_operation(
+        self,
+        *,
+        model: DynamoDBBaseModel,
+        original_item: dict[str, Any],
+        condition_expression: str = "attribute_exists(SK)",
+        names: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """
+        Update to be executed with transact_write, writing only attributes which differ from original_item like update
+        does, so attributes changed concurrently by others are not overwritten. If nothing differs, only the condition
+        is checked.
+        """
+        key = {"PK": model.pk, "SK": model.sk}
+        operation_kwargs = self._get_operation_kwargs(condition_expression, names, values)
+        if (update_kwargs := get_update_kwargs(original_item=original_item, item=model.to_item())) is None:
+            return {"ConditionCheck": {"Key": key, **operation_kwargs}}
+
+        if len(update_kwargs["UpdateExpression"]) > MAX_UPDATE_EXPRESSION_LENGTH:
+            return self.get_put_operation(
+                model=model, condition_expression=condition_expression, names=names, values=values
+            )
+
+        # placeholders of update expression are prefixed with "u", so they do not clash with the condition ones
+        for kwarg in ("ExpressionAttributeNames", "ExpressionAttributeValues"):
+            if kwarg in operation_kwargs:
+                update_kwargs[kwarg] = {**update_kwargs.get(kwarg, {}), **operation_kwargs.pop(kwarg)}
+        return {"Update": {"Key": key, **update_kwargs, **operation_kwargs}}
+
+    def get_delete_operation(
+        self,
+        pk: PK,
+        sk: SK,
+        *,
+        condition_expression: Optional[str] = None,
+        names: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Delete of the item to be executed with transact_write."""
+        return {
+            "Delete": {"Key": {"PK": pk, "SK": sk}, **self._get_operation_kwargs(condition_expression, names, values)}
+        }
+
+    def _get_operation_kwargs(
+        self, condition_expression: Optional[str], names: Optional[dict[str, str]], values: Optional[dict[str, Any]]
+    ) -> dict[str, Any]:
+        # boto3 condition objects are not supported inside of TransactItems, so conditions are strings
+        kwargs: dict[str, Any] = {"TableName": self._table.name}
+        if condition_expression is not None:
+            kwargs["ConditionExpression"] = condition_expression
+        if names:
+            kwargs["ExpressionAttributeNames"] = names
+        if values:
+            kwargs["ExpressionAttributeValues"] = values
+        return kwargs
+
+    def transact_write(self, *, operations: list[dict[str, Any]]) -> None:
+        """
+        Executes operations of any data accesses sharing the table all at once, either every one of them succeeds
+        or none is applied. Raises TransactionCanceled with cancellation reason of each operation otherwise.
+        """
+        try:
+            self._table.meta.client.transact_write_items(TransactItems=operations)
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "TransactionCanceledException":
+                reasons = [reason["Code"] for reason in error.response.get("CancellationReasons", [])]
+                raise TransactionCanceled(f"Transaction canceled, reasons: {reasons}", reasons=reasons) from error
+            raise error
+
     def delete(self, pk: PK, sk: SK) -> None:
         key = {"PK": pk, "SK": sk}
 
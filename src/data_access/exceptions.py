@@ -8,3 +8,17 @@ class DoesNotExist(DataAccessException):
 
 class AlreadyExists(DataAccessException):
     pass
+
+
+class UnprocessedKeys(DataAccessException):
+    pass
+
+
+class VersionConflict(DataAccessException):
+    pass
+
+
+class TransactionCanceled(DataAccessException):
+    def __init__(self, message: str, reasons: list[str]) -> None:
+        super().__init__(message)
+        self.reasons = reasons
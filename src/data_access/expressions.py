@@ -0,0 +1,91 @@
+"""
+Update expressions computed from the difference between the item as it was read and as it is to be saved,
+so only changed attributes are sent to DynamoDB instead of the whole item.
+"""
+from typing import Any, Optional
+
+
+# DynamoDB rejects expressions longer than 4KB
+MAX_UPDATE_EXPRESSION_LENGTH = 4096
+
+
+class UpdateExpressionBuilder:
+    """
+    Maps are compared attribute by attribute, lists which were only appended to are extended with list_append,
+    sets which only gained or lost elements get ADD or DELETE, everything else is SET as a whole.
+    """
+
+    def __init__(self) -> None:
+        self.names: dict[str, str] = {}
+        self._placeholders: dict[str, str] = {}
+        self.values: dict[str, Any] = {}
+        self._actions: dict[str, list[str]] = {"SET": [], "REMOVE": [], "ADD": [], "DELETE": []}
+
+    def _get_path(self, path: list[str]) -> str:
+        segments = []
+        for name in path:
+            if name not in self._placeholders:
+                self._placeholders[name] = f"#u{len(self.names)}"
+                self.names[self._placeholders[name]] = name
+            segments.append(self._placeholders[name])
+
+        return ".".join(segments)
+
+    def _get_value(self, value: Any) -> str:
+        placeholder = f":u{len(self.values)}"
+        self.values[placeholder] = value
+        return placeholder
+
+    def add_diff(self, original: Any, new: Any, path: list[str]) -> None:
+        if original == new:
+            return
+
+        if isinstance(original, dict) and isinstance(new, dict):
+            self.add_item_diff(original_item=original, item=new, path=path)
+        elif isinstance(original, list) and isinstance(new, list) and new[: len(original)] == original:
+            document_path = self._get_path(path)
+            self._actions["SET"].append(
+                f"{document_path} = list_append({document_path}, {self._get_value(new[len(original) :])})"
+            )
+        elif isinstance(original, set) and isinstance(new, set) and new and (new >= original or new <= original):
+            action, elements = ("ADD", new - original) if new >= original else ("DELETE", original - new)
+            self._actions[action].append(f"{self._get_path(path)} {self._get_value(elements)}")
+        elif isinstance(new, set) and not new:  # empty sets cannot be stored
+            self._actions["REMOVE"].append(self._get_path(path))
+        else:
+            self._actions["SET"].append(f"{self._get_path(path)} = {self._get_value(new)}")
+
+    def add_item_diff(self, original_item: dict[str, Any], item: dict[str, Any], path: list[str]) -> None:
+        for name in original_item.keys() - item.keys():
+            self._actions["REMOVE"].append(self._get_path([*path, name]))
+
+        for name, value in item.items():
+            if name not in original_item:
+                self._actions["SET"].append(f"{self._get_path([*path, name])} = {self._get_value(value)}")
+            else:
+                self.add_diff(original=original_item[name], new=value, path=[*path, name])
+
+    def build(self) -> Optional[dict[str, Any]]:
+        """Returns kwargs of update_item, or None if nothing has changed."""
+        clauses = [
+            f"{action} {', '.join(expressions)}" for action, expressions in self._actions.items() if expressions
+        ]
+        if not clauses:
+            return None
+
+        update_kwargs = {"UpdateExpression": " ".join(clauses), "ExpressionAttributeNames": self.names}
+        if self.values:
+            update_kwargs["ExpressionAttributeValues"] = self.values
+        return update_kwargs
+
+
+def get_update_kwargs(
+    original_item: dict[str, Any], item: dict[str, Any], key_names: tuple[str, ...] = ("PK", "SK")
+) -> Optional[dict[str, Any]]:
+    builder = UpdateExpressionBuilder()
+    builder.add_item_diff(
+        original_item={name: value for name, value in original_item.items() if name not in key_names},
+        item={name: value for name, value in item.items() if name not in key_names},
+        path=[],
+    )
+    return builder.build()
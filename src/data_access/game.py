@@ -1,6 +1,220 @@
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from botocore.exceptions import ClientError
+
+from src.core.steps import FinishedStep
+from src.core.types import Payload
+from src.data_access.cache import LRUCache
 from src.data_access.dynamodb import DynamoDBDataAccess
-from src.schemas.game import GameModel
+from src.data_access.exceptions import TransactionCanceled, VersionConflict
+from src.enums.game import GameStatus
+from src.schemas.game import GameEventModel, GameModel
+from src.schemas.websocket import GamePreviewSchema
+from src.settings import settings
+
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+
+# game_step is projected only to filter previews by status
+PREVIEW_PROJECTION = [*GamePreviewSchema.ITEM_PROJECTION, "game_step"]
+
+
+def _has_status(item: dict[str, Any], status: Optional[GameStatus]) -> bool:
+    if status is None:
+        return True
+    return (item["game_step"] == FinishedStep.__name__) == (status == GameStatus.FINISHED)
 
 
 class GameDataAccess(DynamoDBDataAccess[str, str, GameModel]):
+    """
+    In event log mode, game item is only a snapshot and every move is appended as a small GameEventModel item.
+    Snapshot is saved every snapshot_interval moves and whenever the step changes, so dealing of cards, which is
+    random, happens only in moves followed by a snapshot and replaying moves after snapshot is deterministic.
+    Events are replayed in item mode too, so games moved before switching back from event log mode keep their moves.
+
+    Games saved with save_moves are kept in an in-process cache, so the next move or detail request handled by the same
+    container does not read the game again. Another container may have saved a newer version in the meantime - moves
+    are saved only on top of the version they were dispatched on, so saving moves dispatched on a stale game fails
+    with VersionConflict. A move which is valid only in the newer version is rejected by the stale game already, so
+    callers read the game again with use_cache set to False before reporting a move as invalid, see GameService.
+    Detail requests may see a game older by at most cache_ttl seconds.
+    """
+
     _model = GameModel
+
+    def __init__(
+        self,
+        table_name: str,
+        table: Optional["Table"] = None,
+        event_log: Optional[bool] = None,
+        snapshot_interval: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+    ) -> None:
+        super().__init__(table_name=table_name, table=table)
+        self.event_log = settings.game_storage == "event_log" if event_log is None else event_log
+        self.snapshot_interval = snapshot_interval or settings.game_snapshot_interval
+        self._cache: LRUCache[str, GameModel] = LRUCache(
+            max_size=settings.game_cache_size if cache_size is None else cache_size,
+            ttl=settings.game_cache_ttl if cache_ttl is None else cache_ttl,
+        )
+
+    def get_game(self, game_id: str, for_update: bool = False, use_cache: bool = True) -> Optional[GameModel]:
+        """
+        Moves appended to the event log after the snapshot are replayed on top of it.
+        Cached game is shared, so it must not be changed unless for_update is set, in which case it is taken
+        out of the cache until it is saved again. Without use_cache, the game is always read from the table.
+        """
+        game_model = None
+        if use_cache:
+            game_model = self._cache.pop(game_id) if for_update else self._cache.get(game_id)
+        elif for_update:
+            self._cache.invalidate(game_id)
+        if game_model is not None:
+            return game_model
+
+        game_model = self._get_game(game_id=game_id)
+        if game_model is not None and not for_update:
+            self._cache.set(game_id, game_model)
+        return game_model
+
+    def _get_game(self, game_id: str) -> Optional[GameModel]:
+        game_model = self.get(pk="game", sk=f"game#{game_id}")
+        if game_model is None:
+            return game_model
+
+        game = game_model.game
+        for item in self.iter_items(pk=f"game#{game_id}", after_sk=GameEventModel.get_sk(sequence=game_model.version)):
+            event = GameEventModel.from_item(item=item)
+            game.dispatch(payload=game.current_step.payload_class(**event.payload))
+            game_model.version = event.sequence
+            game_model._has_events = True
+
+        game_model.game_step = game.current_step.__class__.__name__
+        return game_model
+
+    def save_moves(
+        self,
+        *,
+        model: GameModel,
+        payloads: list[Payload],
+        original_item: Optional[dict[str, Any]],
+        step_changed: bool,
+    ) -> None:
+        """
+        Saves game after the payloads were dispatched, in order. Raises VersionConflict if another move was saved
+        after the game was read. In item mode, game is saved with save_versioned, so its version is incremented once.
+        Game with events saved in event log mode is snapshotted along with its moves instead, as the stored item is
+        older than the game and its version would not match.
+        """
+        if not self.event_log and not model._has_events:
+            self.save_versioned(model=model, original_item=original_item)
+        else:
+            self._save_events(model=model, payloads=payloads, step_changed=step_changed or not self.event_log)
+
+        self._cache.set(model.game_id, model)
+
+    def _save_events(self, *, model: GameModel, payloads: list[Payload], step_changed: bool) -> None:
+        read_version = model.version
+        events = [
+            GameEventModel(game_id=model.game_id, sequence=sequence, payload=payload.dict())
+            for sequence, payload in enumerate(payloads, start=read_version + 1)
+        ]
+        model.version = events[-1].sequence
+        # event of given sequence can be written only once, which guards against concurrent moves
+        event_condition = "attribute_not_exists(SK)"
+        # snapshot is taken after the last move, so no event is replayed across a step change
+        snapshot_due = step_changed or model.version // self.snapshot_interval > read_version // self.snapshot_interval
+        try:
+            if len(events) == 1 and not snapshot_due:
+                self._table.put_item(Item=events[0].to_item(), ConditionExpression=event_condition)
+            else:
+                operations = [
+                    self.get_put_operation(model=event, condition_expression=event_condition) for event in events
+                ]
+                if snapshot_due:
+                    operations.append(
+                        self.get_put_operation(
+                            model=model,
+                            condition_expression="attribute_not_exists(#version) OR #version < :version",
+                            names={"#version": "version"},
+                            values={":version": model.version},
+                        )
+                    )
+                self.transact_write(operations=operations)
+        except TransactionCanceled as error:
+            model.version = read_version
+            raise VersionConflict(
+                f"Game with id {model.game_id} was changed after version {read_version} was read"
+            ) from error
+        except ClientError as error:
+            model.version = read_version
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise VersionConflict(
+                    f"Game with id {model.game_id} was changed after version {read_version} was read"
+                ) from error
+            raise error
+
+        model._has_events = not snapshot_due
+
+    def save(self, *, model: GameModel) -> None:
+        self._cache.invalidate(model.game_id)
+        super().save(model=model)
+
+    def delete(self, pk: str, sk: str) -> None:
+        self._cache.invalidate(sk.split("#")[-1])
+        super().delete(pk=pk, sk=sk)
+
+    def save_versioned(self, *, model: GameModel, original_item: Optional[dict[str, Any]] = None) -> None:
+        """
+        Saves the game only if nobody else saved it since it was read and increments its version.
+        Raises VersionConflict otherwise, in which case the game has to be read again.
+        With original_item, only changed attributes are written, see DynamoDBDataAccess.update.
+        """
+        read_version = model.version
+        model.version += 1
+        # items saved before versioning was introduced have no version
+        condition_expression = "attribute_not_exists(#version) OR #version = :version"
+        names, values = {"#version": "version"}, {":version": read_version}
+        try:
+            if original_item is None:
+                self._table.put_item(
+                    Item=model.to_item(),
+                    ConditionExpression=condition_expression,
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values,
+                )
+            else:
+                self._update(
+                    model=model,
+                    original_item=original_item,
+                    condition_expression=f"attribute_exists(SK) AND ({condition_expression})",
+                    names=names,
+                    values=values,
+                )
+        except ClientError as error:
+            model.version = read_version
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise VersionConflict(
+                    f"Game with id {model.game_id} was changed after version {read_version} was read"
+                ) from error
+            raise error
+
+    def iter_previews(
+        self, page_size: Optional[int] = None, status: Optional[GameStatus] = None
+    ) -> Iterator[GamePreviewSchema]:
+        """Reads only attributes needed for game previews instead of whole games."""
+        for item in self.iter_items(pk="game", projection=PREVIEW_PROJECTION, page_size=page_size):
+            if _has_status(item=item, status=status):
+                yield GamePreviewSchema.from_item(item=item)
+
+    def iter_previews_by_ids(
+        self, game_ids: list[str], status: Optional[GameStatus] = None
+    ) -> Iterator[GamePreviewSchema]:
+        """Same as iter_previews, but reads only given games instead of the whole partition."""
+        keys = [{"pk": "game", "sk": f"game#{game_id}"} for game_id in game_ids]
+        for item in self.iter_items_by_keys(keys=keys, projection=PREVIEW_PROJECTION):
+            if _has_status(item=item, status=status):
+                yield GamePreviewSchema.from_item(item=item)
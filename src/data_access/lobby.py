@@ -1,6 +1,13 @@
+from typing import Iterator
+
 from src.data_access.dynamodb import DynamoDBDataAccess
 from src.schemas.lobby import LobbyModel
 
 
 class LobbyDataAccess(DynamoDBDataAccess[str, str, LobbyModel]):
     _model = LobbyModel
+
+    def iter_by_ids(self, lobby_ids: list[str]) -> Iterator[LobbyModel]:
+        keys = [{"pk": "lobby", "sk": f"lobby#{lobby_id}"} for lobby_id in lobby_ids]
+        for item in self.iter_items_by_keys(keys=keys):
+            yield self._model.from_item(item=item)
@@ -0,0 +1,949 @@
+"""
+In-process stand-in for a DynamoDB table, used for hermetic tests and load tests of services.
+Implements the subset of boto3 Table/client API used by data accesses, with the same error codes as DynamoDB.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from decimal import Decimal
+from threading import RLock
+from typing import Any, Callable, Iterator, Optional, Union
+
+from boto3.dynamodb.conditions import (
+    And,
+    AttributeBase,
+    AttributeExists,
+    AttributeNotExists,
+    AttributeType,
+    BeginsWith,
+    Between,
+    ConditionBase,
+    Contains,
+    Equals,
+    GreaterThan,
+    GreaterThanEquals,
+    In,
+    LessThan,
+    LessThanEquals,
+    Not,
+    NotEquals,
+    Or,
+    Size,
+)
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+
+Item = dict[str, Any]
+Condition = Union[ConditionBase, str, None]
+
+_MISSING = object()
+TRANSACT_WRITE_ACTIONS = ("Put", "Update", "Delete", "ConditionCheck")
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def serialize_item(item: Item) -> Item:
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+def deserialize_item(item: Item) -> Item:
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def to_stored_types(value: Any) -> Any:
+    """Cheaper equivalent of serializing and deserializing the value, e.g. numbers become Decimals."""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, bytes, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, dict):
+        return {key: to_stored_types(element) for key, element in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_stored_types(element) for element in value]
+    if isinstance(value, (set, frozenset)):
+        return {to_stored_types(element) for element in value}
+    # floats and other types are rejected, just like by serializer
+    return _deserializer.deserialize(_serializer.serialize(value))
+
+
+def get_client_error(code: str, message: str, operation: str, **extra: Any) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}, **extra}, operation)
+
+
+class ExpressionParser:
+    """
+    Parses condition expression strings, e.g. "attribute_not_exists(SK) AND #version = :version",
+    into boto3 condition objects, so both forms are evaluated by the same code.
+    """
+
+    _token_regex = re.compile(
+        r"\s*(?:(?P<number>\[\d+\])|(?P<comparator><>|<=|>=|=|<|>)|(?P<punctuation>[(),.])"
+        r"|(?P<value>:[A-Za-z0-9_]+)|(?P<name>#[A-Za-z0-9_]+)|(?P<identifier>[A-Za-z_][A-Za-z0-9_\-]*))"
+    )
+    _comparators: dict[str, Callable[[Any, Any], ConditionBase]] = {
+        "=": Equals,
+        "<>": NotEquals,
+        "<": LessThan,
+        "<=": LessThanEquals,
+        ">": GreaterThan,
+        ">=": GreaterThanEquals,
+    }
+    _functions = {
+        "attribute_exists": AttributeExists,
+        "attribute_not_exists": AttributeNotExists,
+        "attribute_type": AttributeType,
+        "begins_with": BeginsWith,
+        "contains": Contains,
+    }
+
+    def __init__(self, expression: str, names: Optional[dict[str, str]], values: Optional[Item]) -> None:
+        self._tokens = self._tokenize(expression=expression)
+        self._position = 0
+        self._names = names or {}
+        self._values = values or {}
+
+    @classmethod
+    def parse(
+        cls, expression: str, names: Optional[dict[str, str]] = None, values: Optional[Item] = None
+    ) -> ConditionBase:
+        parser = cls(expression=expression, names=names, values=values)
+        condition = parser._parse_or()
+        if parser._peek() is not None:
+            raise parser._error(f"unexpected token {parser._peek()}")
+
+        return condition
+
+    def _tokenize(self, expression: str) -> list[str]:
+        tokens, position = [], 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = self._token_regex.match(expression, position)
+            if match is None or match.end() == position:
+                raise get_client_error(
+                    "ValidationException", f"Invalid expression: {expression}", operation="ParseExpression"
+                )
+            tokens.append(match.group().strip())
+            position = match.end()
+
+        return tokens
+
+    def _error(self, message: str) -> ClientError:
+        return get_client_error("ValidationException", f"Invalid expression: {message}", operation="ParseExpression")
+
+    def _peek(self) -> Optional[str]:
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise self._error("unexpected end of expression")
+        self._position += 1
+        return token
+
+    def _expect(self, expected: str) -> None:
+        if (token := self._next()).upper() != expected:
+            raise self._error(f"expected {expected}, got {token}")
+
+    def _is_keyword(self, keyword: str) -> bool:
+        return (token := self._peek()) is not None and token.upper() == keyword
+
+    def _parse_or(self) -> ConditionBase:
+        condition = self._parse_and()
+        while self._is_keyword("OR"):
+            self._next()
+            condition = Or(condition, self._parse_and())
+        return condition
+
+    def _parse_and(self) -> ConditionBase:
+        condition = self._parse_not()
+        while self._is_keyword("AND"):
+            self._next()
+            condition = And(condition, self._parse_not())
+        return condition
+
+    def _parse_not(self) -> ConditionBase:
+        if self._is_keyword("NOT"):
+            self._next()
+            return Not(self._parse_not())
+        return self._parse_primary()
+
+    def _parse_primary(self) -> ConditionBase:
+        if self._peek() == "(":
+            self._next()
+            condition = self._parse_or()
+            self._expect(")")
+            return condition
+
+        if (token := self._peek()) in self._functions:
+            self._next()
+            self._expect("(")
+            arguments = [self._parse_operand()]
+            while self._peek() == ",":
+                self._next()
+                arguments.append(self._parse_operand())
+            self._expect(")")
+            return self._functions[token](*arguments)
+
+        left = self._parse_operand()
+        token = self._next()
+        if token in self._comparators:
+            return self._comparators[token](left, self._parse_operand())
+
+        if token.upper() == "BETWEEN":
+            low = self._parse_operand()
+            self._expect("AND")
+            return Between(left, low, self._parse_operand())
+
+        if token.upper() == "IN":
+            self._expect("(")
+            options = [self._parse_operand()]
+            while self._peek() == ",":
+                self._next()
+                options.append(self._parse_operand())
+            self._expect(")")
+            return In(left, options)
+
+        raise self._error(f"unexpected token {token}")
+
+    def _parse_operand(self) -> Any:
+        token = self._next()
+        if token.startswith(":"):
+            if token not in self._values:
+                raise self._error(f"missing value for {token}")
+            return self._values[token]
+
+        if token == "size" and self._peek() == "(":
+            self._next()
+            operand = self._parse_operand()
+            self._expect(")")
+            return Size(operand)
+
+        path = [self._get_name(token)]
+        while (token := self._peek()) is not None and (token == "." or token.startswith("[")):
+            self._next()
+            path.append(self._get_name(self._next()) if token == "." else token)
+
+        return AttributeBase(".".join(path).replace(".[", "["))
+
+    def _get_name(self, token: str) -> str:
+        if not token.startswith("#"):
+            return token
+        if token not in self._names:
+            raise self._error(f"missing name for {token}")
+        return self._names[token]
+
+
+def get_path_value(item: Item, path: str) -> Any:
+    value = item
+    for segment in re.findall(r"[^.\[\]]+|\[\d+\]", path):
+        if segment.startswith("["):
+            index = int(segment[1:-1])
+            if not isinstance(value, list) or index >= len(value):
+                return _MISSING
+            value = value[index]
+        elif isinstance(value, dict) and segment in value:
+            value = value[segment]
+        else:
+            return _MISSING
+
+    return value
+
+
+def _get_operand_value(operand: Any, item: Item) -> Any:
+    if isinstance(operand, Size):
+        value = _get_operand_value(operand.get_expression()["values"][0], item)
+        return _MISSING if value is _MISSING else Decimal(len(value))
+    if isinstance(operand, AttributeBase):
+        return get_path_value(item=item, path=operand.name)
+    if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+        return Decimal(str(operand))
+    return operand
+
+
+def _compare(left: Any, right: Any, operator: Callable[[Any, Any], bool]) -> bool:
+    if left is _MISSING or right is _MISSING:
+        return False
+    try:
+        return operator(left, right)
+    except TypeError:
+        return False
+
+
+_ATTRIBUTE_TYPES = {
+    "S": str,
+    "N": Decimal,
+    "BOOL": bool,
+    "M": dict,
+    "L": list,
+    "SS": set,
+    "NS": set,
+    "NULL": type(None),
+}
+
+
+def evaluate_condition(condition: ConditionBase, item: Item) -> bool:
+    """Evaluates boto3 condition object against deserialized item."""
+    expression = condition.get_expression()
+    operator, operands = expression["operator"], expression["values"]
+
+    if operator == "AND":
+        return all(evaluate_condition(operand, item) for operand in operands)
+    if operator == "OR":
+        return any(evaluate_condition(operand, item) for operand in operands)
+    if operator == "NOT":
+        return not evaluate_condition(operands[0], item)
+
+    values = [_get_operand_value(operand, item) for operand in operands]
+    if operator == "attribute_exists":
+        return values[0] is not _MISSING
+    if operator == "attribute_not_exists":
+        return values[0] is _MISSING
+    if operator == "attribute_type":
+        return values[0] is not _MISSING and isinstance(values[0], _ATTRIBUTE_TYPES[values[1]])
+    if operator == "begins_with":
+        return _compare(values[0], values[1], lambda left, right: left.startswith(right))
+    if operator == "contains":
+        return _compare(values[0], values[1], lambda left, right: right in left)
+    if operator == "BETWEEN":
+        return _compare(values[0], values[1], lambda left, low: low <= left) and _compare(
+            values[0], values[2], lambda left, high: left <= high
+        )
+    if operator == "IN":
+        return values[0] is not _MISSING and values[0] in [_get_operand_value(option, item) for option in values[1]]
+
+    comparators: dict[str, Callable[[Any, Any], bool]] = {
+        "=": lambda left, right: left == right,
+        "<>": lambda left, right: left != right,
+        "<": lambda left, right: left < right,
+        "<=": lambda left, right: left <= right,
+        ">": lambda left, right: left > right,
+        ">=": lambda left, right: left >= right,
+    }
+    return _compare(values[0], values[1], comparators[operator])
+
+
+def get_condition(
+    condition: Condition, names: Optional[dict[str, str]] = None, values: Optional[Item] = None
+) -> Optional[ConditionBase]:
+    if condition is None or isinstance(condition, ConditionBase):
+        return condition
+    return ExpressionParser.parse(expression=condition, names=names, values=values)
+
+
+def project_item(item: Item, projection: Optional[str], names: Optional[dict[str, str]] = None) -> Item:
+    if projection is None:
+        return item
+
+    projected = {}
+    for path in projection.split(","):
+        path = ".".join((names or {}).get(segment, segment) for segment in path.strip().split("."))
+        if (value := get_path_value(item=item, path=path)) is _MISSING:
+            continue
+
+        segments = path.split(".")
+        target = projected
+        for segment in segments[:-1]:
+            target = target.setdefault(segment, {})
+        target[segments[-1]] = value
+
+    return projected
+
+
+class UpdateExpressionParser(ExpressionParser):
+    """Parses and applies update expressions, e.g. "SET #ids = list_append(#ids, :ids) REMOVE #name"."""
+
+    _token_regex = re.compile(
+        r"\s*(?:(?P<number>\[\d+\])|(?P<operator>[=+\-(),.])"
+        r"|(?P<value>:[A-Za-z0-9_]+)|(?P<name>#[A-Za-z0-9_]+)|(?P<identifier>[A-Za-z_][A-Za-z0-9_\-]*))"
+    )
+    _clauses = ("SET", "REMOVE", "ADD", "DELETE")
+    _functions = {"list_append", "if_not_exists", "size"}
+
+    def get_names(self) -> set[str]:
+        """All attribute names used in the expression, top level attributes outside of them are left untouched."""
+        return {
+            self._get_name(token)
+            for token in self._tokens
+            if token.startswith("#")
+            or (token[0].isalpha() and token.upper() not in self._clauses and token not in self._functions)
+        }
+
+    def apply(self, item: Item) -> Item:
+        """Updates the item in place, all values are evaluated against the item before update, like in DynamoDB."""
+        actions = []
+        while self._peek() is not None:
+            if (clause := self._next().upper()) not in self._clauses:
+                raise self._error(f"unexpected token {clause}")
+            actions.append(self._parse_action(clause=clause, item=item))
+            while self._peek() == ",":
+                self._next()
+                actions.append(self._parse_action(clause=clause, item=item))
+
+        for clause, path, value in actions:
+            current = get_document_value(item=item, path=path)
+            if clause == "REMOVE":
+                value = _MISSING
+            elif clause == "ADD" and current is not _MISSING:
+                value = current + value if isinstance(value, Decimal) else current | value
+            elif clause == "DELETE":
+                # sets cannot be empty, so set without elements is removed
+                value = current - value if current is not _MISSING and current - value else _MISSING
+            self._set_document_value(item=item, path=path, value=value)
+
+        return item
+
+    def _parse_action(self, clause: str, item: Item) -> tuple[str, list[Union[str, int]], Any]:
+        path = self._parse_path()
+        if clause == "REMOVE":
+            return clause, path, None
+        if clause != "SET":
+            return clause, path, self._parse_operand()
+
+        self._expect("=")
+        if (value := self._parse_value(item=item)) is _MISSING:
+            raise self._error("the provided expression refers to an attribute that does not exist in the item")
+        return clause, path, value
+
+    def _parse_path(self) -> list[Union[str, int]]:
+        path: list[Union[str, int]] = [self._get_name(self._next())]
+        while (token := self._peek()) is not None and (token == "." or token.startswith("[")):
+            self._next()
+            path.append(self._get_name(self._next()) if token == "." else int(token[1:-1]))
+
+        return path
+
+    def _parse_value(self, item: Item) -> Any:
+        if (function := self._peek()) in ("list_append", "if_not_exists"):
+            self._next()
+            self._expect("(")
+            first = self._parse_value_operand(item=item)
+            self._expect(",")
+            second = self._parse_value_operand(item=item)
+            self._expect(")")
+            if function == "if_not_exists":
+                return second if first is _MISSING else first
+            return _MISSING if _MISSING in (first, second) else first + second
+
+        value = self._parse_value_operand(item=item)
+        if self._peek() in ("+", "-"):
+            sign = 1 if self._next() == "+" else -1
+            other = self._parse_value_operand(item=item)
+            return _MISSING if _MISSING in (value, other) else value + sign * other
+        return value
+
+    def _parse_value_operand(self, item: Item) -> Any:
+        if (token := self._peek()) is not None and token.startswith(":"):
+            return self._parse_operand()
+        return get_document_value(item=item, path=self._parse_path())
+
+    def _set_document_value(self, item: Item, path: list[Union[str, int]], value: Any) -> None:
+        """Sets value under the path, _MISSING value removes it."""
+        target = get_document_value(item=item, path=path[:-1])
+        last = path[-1]
+
+        if isinstance(target, dict) and isinstance(last, str):
+            if value is _MISSING:
+                target.pop(last, None)
+            else:
+                target[last] = value
+        elif isinstance(target, list) and isinstance(last, int):
+            if value is _MISSING:
+                if last < len(target):
+                    del target[last]
+            elif last < len(target):
+                target[last] = value
+            else:
+                target.append(value)
+        else:
+            raise self._error("the document path provided in the update expression is invalid for update")
+
+
+def get_document_value(item: Item, path: list[Union[str, int]]) -> Any:
+    """Unlike get_path_value, takes already resolved path segments, so names may contain dots, e.g. emails."""
+    value: Any = item
+    for segment in path:
+        if isinstance(segment, int):
+            if not isinstance(value, list) or segment >= len(value):
+                return _MISSING
+        elif not isinstance(value, dict) or segment not in value:
+            return _MISSING
+        value = value[segment]
+
+    return value
+
+
+class InMemoryBatchWriter:
+    def __init__(self, table: "InMemoryTable") -> None:
+        self._table = table
+
+    def put_item(self, Item: Item) -> None:  # NOQA: N803
+        self._table.put_item(Item=Item)
+
+    def delete_item(self, Key: Item) -> None:  # NOQA: N803
+        self._table.delete_item(Key=Key)
+
+
+class InMemoryTable:
+    """Table with PK hash key and SK range key, items are kept serialized just like DynamoDB keeps them."""
+
+    def __init__(self, table_name: str, client: "InMemoryDynamoDBClient") -> None:
+        self.table_name = self.name = table_name
+        self.hash_key, self.range_key = "PK", "SK"
+        self.meta = type("InMemoryTableMeta", (), {"client": client})()
+        self._partitions: dict[Any, dict[Any, Item]] = {}
+        # shared with the client, so single item writes cannot interleave with checks and writes of a transaction
+        self._lock = client._lock
+
+    def _get_key(self, key: Item, operation: str) -> tuple[Any, Any]:
+        if set(key) != {self.hash_key, self.range_key}:
+            raise get_client_error(
+                "ValidationException", "The provided key element does not match the schema", operation=operation
+            )
+        return key[self.hash_key], key[self.range_key]
+
+    def _get_item(self, hash_value: Any, range_value: Any) -> Optional[Item]:
+        item = self._partitions.get(hash_value, {}).get(range_value)
+        return None if item is None else deserialize_item(item)
+
+    def _check_condition(
+        self,
+        key: tuple[Any, Any],
+        condition: Condition,
+        names: Optional[dict[str, str]],
+        values: Optional[Item],
+        operation: str,
+    ) -> None:
+        if (condition := get_condition(condition=condition, names=names, values=values)) is None:
+            return
+
+        if not evaluate_condition(condition=condition, item=self._get_item(*key) or {}):
+            raise get_client_error(
+                "ConditionalCheckFailedException", "The conditional request failed", operation=operation
+            )
+
+    def _get_stored_item(self, key: tuple[Any, Any]) -> Optional[Item]:
+        return self._partitions.get(key[0], {}).get(key[1])
+
+    def _restore(self, key: tuple[Any, Any], stored_item: Optional[Item]) -> None:
+        """Puts back item returned by _get_stored_item, or removes the item if there was none."""
+        if stored_item is None:
+            self._delete(key=key)
+        else:
+            self._partitions.setdefault(key[0], {})[key[1]] = stored_item
+
+    def _put(self, item: Item) -> None:
+        hash_value, range_value = item[self.hash_key], item[self.range_key]
+        self._partitions.setdefault(hash_value, {})[range_value] = serialize_item(item)
+
+    def _delete(self, key: tuple[Any, Any]) -> None:
+        hash_value, range_value = key
+        partition = self._partitions.get(hash_value, {})
+        partition.pop(range_value, None)
+        if not partition:
+            self._partitions.pop(hash_value, None)
+
+    def get_item(
+        self,
+        Key: Item,  # NOQA: N803
+        ProjectionExpression: Optional[str] = None,  # NOQA: N803
+        ExpressionAttributeNames: Optional[dict[str, str]] = None,  # NOQA: N803
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        with self._lock:
+            item = self._get_item(*self._get_key(key=Key, operation="GetItem"))
+        if item is None:
+            return {}
+        return {"Item": project_item(item=item, projection=ProjectionExpression, names=ExpressionAttributeNames)}
+
+    def put_item(
+        self,
+        Item: Item,  # NOQA: N803
+        ConditionExpression: Condition = None,  # NOQA: N803
+        ExpressionAttributeNames: Optional[dict[str, str]] = None,  # NOQA: N803
+        ExpressionAttributeValues: Optional[Item] = None,  # NOQA: N803
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        key = self._get_key(
+            key={self.hash_key: Item.get(self.hash_key), self.range_key: Item.get(self.range_key)}, operation="PutItem"
+        )
+        with self._lock:
+            self._check_condition(
+                key=key,
+                condition=ConditionExpression,
+                names=ExpressionAttributeNames,
+                values=ExpressionAttributeValues,
+                operation="PutItem",
+            )
+            self._put(item=Item)
+        return {}
+
+    def delete_item(
+        self,
+        Key: Item,  # NOQA: N803
+        ConditionExpression: Condition = None,  # NOQA: N803
+        ExpressionAttributeNames: Optional[dict[str, str]] = None,  # NOQA: N803
+        ExpressionAttributeValues: Optional[Item] = None,  # NOQA: N803
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        key = self._get_key(key=Key, operation="DeleteItem")
+        with self._lock:
+            self._check_condition(
+                key=key,
+                condition=ConditionExpression,
+                names=ExpressionAttributeNames,
+                values=ExpressionAttributeValues,
+                operation="DeleteItem",
+            )
+            self._delete(key=key)
+        return {}
+
+    def update_item(
+        self,
+        Key: Item,  # NOQA: N803
+        UpdateExpression: str,  # NOQA: N803
+        ConditionExpression: Condition = None,  # NOQA: N803
+        ExpressionAttributeNames: Optional[dict[str, str]] = None,  # NOQA: N803
+        ExpressionAttributeValues: Optional[Item] = None,  # NOQA: N803
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Like in DynamoDB, item which does not exist is created from the key and updated attributes."""
+        key = self._get_key(key=Key, operation="UpdateItem")
+        parser = self._get_update_parser(
+            expression=UpdateExpression, names=ExpressionAttributeNames, values=ExpressionAttributeValues
+        )
+        with self._lock:
+            self._check_condition(
+                key=key,
+                condition=ConditionExpression,
+                names=ExpressionAttributeNames,
+                values=ExpressionAttributeValues,
+                operation="UpdateItem",
+            )
+            self._update(key=key, parser=parser, operation="UpdateItem")
+        return {}
+
+    @staticmethod
+    def _get_update_parser(
+        expression: str, names: Optional[dict[str, str]], values: Optional[Item]
+    ) -> UpdateExpressionParser:
+        # values are brought to types DynamoDB would store them as, e.g. int to Decimal
+        return UpdateExpressionParser(expression=expression, names=names, values=to_stored_types(values or {}))
+
+    def _update(self, key: tuple[Any, Any], parser: UpdateExpressionParser, operation: str) -> None:
+        """Has to be called with the lock held, after the condition was checked."""
+        names = parser.get_names()
+        key_item = {self.hash_key: key[0], self.range_key: key[1]}
+        # only attributes used by the expression are deserialized and serialized back
+        stored_item = self._get_stored_item(key=key) or serialize_item(key_item)
+        item = parser.apply(
+            item=deserialize_item(
+                {name: value for name, value in stored_item.items() if name in names or name in key_item}
+            )
+        )
+        if (item.get(self.hash_key), item.get(self.range_key)) != key:
+            raise get_client_error(
+                "ValidationException", "Cannot update attribute which is part of the key", operation=operation
+            )
+
+        updated_item = {name: value for name, value in stored_item.items() if name not in names}
+        updated_item.update(serialize_item({name: value for name, value in item.items() if name in names}))
+        self._partitions.setdefault(key[0], {})[key[1]] = updated_item
+
+    def query(
+        self,
+        KeyConditionExpression: Condition,  # NOQA: N803
+        FilterExpression: Condition = None,  # NOQA: N803
+        ProjectionExpression: Optional[str] = None,  # NOQA: N803
+        ExpressionAttributeNames: Optional[dict[str, str]] = None,  # NOQA: N803
+        ExpressionAttributeValues: Optional[Item] = None,  # NOQA: N803
+        ExclusiveStartKey: Optional[Item] = None,  # NOQA: N803
+        Limit: Optional[int] = None,  # NOQA: N803
+        ScanIndexForward: bool = True,  # NOQA: N803
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        key_condition = get_condition(
+            condition=KeyConditionExpression, names=ExpressionAttributeNames, values=ExpressionAttributeValues
+        )
+        hash_value = self._get_hash_value(condition=key_condition)
+        with self._lock:
+            partition = sorted(self._partitions.get(hash_value, {}).items(), reverse=not ScanIndexForward)
+
+        # key condition needs only key attributes, so items are not deserialized for it
+        entries = [
+            ((hash_value, range_value), item)
+            for range_value, item in partition
+            if evaluate_condition(
+                condition=key_condition, item={self.hash_key: hash_value, self.range_key: range_value}
+            )
+        ]
+        return self._get_page(
+            entries=entries,
+            filter_expression=get_condition(
+                condition=FilterExpression, names=ExpressionAttributeNames, values=ExpressionAttributeValues
+            ),
+            projection=ProjectionExpression,
+            names=ExpressionAttributeNames,
+            exclusive_start_key=ExclusiveStartKey,
+            limit=Limit,
+            scan_index_forward=ScanIndexForward,
+        )
+
+    def scan(
+        self,
+        FilterExpression: Condition = None,  # NOQA: N803
+        ProjectionExpression: Optional[str] = None,  # NOQA: N803
+        ExpressionAttributeNames: Optional[dict[str, str]] = None,  # NOQA: N803
+        ExpressionAttributeValues: Optional[Item] = None,  # NOQA: N803
+        ExclusiveStartKey: Optional[Item] = None,  # NOQA: N803
+        Limit: Optional[int] = None,  # NOQA: N803
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        with self._lock:
+            entries = [
+                ((hash_value, range_value), item)
+                for hash_value, partition in sorted(self._partitions.items())
+                for range_value, item in sorted(partition.items())
+            ]
+
+        return self._get_page(
+            entries=entries,
+            filter_expression=get_condition(
+                condition=FilterExpression, names=ExpressionAttributeNames, values=ExpressionAttributeValues
+            ),
+            projection=ProjectionExpression,
+            names=ExpressionAttributeNames,
+            exclusive_start_key=ExclusiveStartKey,
+            limit=Limit,
+        )
+
+    def _get_hash_value(self, condition: Optional[ConditionBase]) -> Any:
+        if condition is not None and (value := self._find_hash_value(condition=condition)) is not _MISSING:
+            return value
+
+        raise get_client_error("ValidationException", "Query condition missed key schema element", operation="Query")
+
+    def _find_hash_value(self, condition: ConditionBase) -> Any:
+        expression = condition.get_expression()
+        if expression["operator"] == "AND":
+            for operand in expression["values"]:
+                if (value := self._find_hash_value(condition=operand)) is not _MISSING:
+                    return value
+
+        elif expression["operator"] == "=":
+            attribute, value = expression["values"]
+            if isinstance(attribute, AttributeBase) and attribute.name == self.hash_key:
+                return value
+
+        return _MISSING
+
+    def _get_page(
+        self,
+        entries: list[tuple[tuple[Any, Any], Item]],
+        filter_expression: Optional[ConditionBase],
+        projection: Optional[str],
+        names: Optional[dict[str, str]],
+        exclusive_start_key: Optional[Item],
+        limit: Optional[int],
+        scan_index_forward: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Entries are (key, serialized item) pairs sorted by key, in descending order without scan_index_forward.
+        Only items which end up on the page are deserialized.
+        """
+        if exclusive_start_key is not None:
+            # the start key item might have been deleted in the meantime, so the page starts at the next key after it
+            start_key = (exclusive_start_key[self.hash_key], exclusive_start_key[self.range_key])
+            keys = [key for key, _ in entries]
+            if scan_index_forward:
+                start = bisect_right(keys, start_key)
+            else:
+                start = len(keys) - bisect_left(keys[::-1], start_key)
+            entries = entries[start:]
+
+        # without filter only projected top level attributes have to be deserialized
+        attributes = None
+        if projection is not None and filter_expression is None:
+            top_level_names = {path.strip().split(".")[0] for path in projection.split(",")}
+            attributes = {(names or {}).get(name, name) for name in top_level_names}
+
+        # like in DynamoDB, limit is applied before filtering
+        page = entries if limit is None else entries[:limit]
+        items = []
+        for _, serialized_item in page:
+            if attributes is not None:
+                serialized_item = {key: value for key, value in serialized_item.items() if key in attributes}
+            item = deserialize_item(serialized_item)
+            if filter_expression is None or evaluate_condition(condition=filter_expression, item=item):
+                items.append(project_item(item=item, projection=projection, names=names))
+
+        response: dict[str, Any] = {"Items": items, "Count": len(items), "ScannedCount": len(page)}
+        if limit is not None and len(entries) > limit:
+            hash_value, range_value = page[-1][0]
+            response["LastEvaluatedKey"] = {self.hash_key: hash_value, self.range_key: range_value}
+
+        return response
+
+    @contextmanager
+    def batch_writer(self, **kwargs: Any) -> Iterator[InMemoryBatchWriter]:
+        yield InMemoryBatchWriter(table=self)
+
+    def delete(self) -> None:
+        self.meta.client.delete_table(TableName=self.table_name)
+
+    def wait_until_exists(self) -> None:
+        pass
+
+    def wait_until_not_exists(self) -> None:
+        pass
+
+
+class InMemoryDynamoDBClient:
+    """
+    Counterpart of service resource's client. Just like it, the client takes and returns plain python values,
+    because boto3 registers (de)serialization of DynamoDB types on clients of service resources.
+    """
+
+    def __init__(self) -> None:
+        self.tables: dict[str, InMemoryTable] = {}
+        self._lock = RLock()
+
+    def get_table(self, table_name: str) -> InMemoryTable:
+        with self._lock:
+            if table_name not in self.tables:
+                self.tables[table_name] = InMemoryTable(table_name=table_name, client=self)
+            return self.tables[table_name]
+
+    def delete_table(self, TableName: str) -> None:  # NOQA: N803
+        with self._lock:
+            self.tables.pop(TableName, None)
+
+    def batch_get_item(self, RequestItems: dict[str, dict[str, Any]], **kwargs: Any) -> dict[str, Any]:  # NOQA: N803
+        if sum(len(request["Keys"]) for request in RequestItems.values()) > 100:
+            raise get_client_error(
+                "ValidationException", "Too many items requested for the BatchGetItem call", "BatchGetItem"
+            )
+
+        responses: dict[str, list[Item]] = {}
+        for table_name, request in RequestItems.items():
+            table = self.get_table(table_name=table_name)
+            keys = [table._get_key(key=key, operation="BatchGetItem") for key in request["Keys"]]
+            if len(set(keys)) != len(keys):
+                raise get_client_error(
+                    "ValidationException", "Provided list of item keys contains duplicates", "BatchGetItem"
+                )
+
+            with self._lock:
+                items = [item for key in keys if (item := table._get_item(*key)) is not None]
+            responses[table_name] = [
+                project_item(
+                    item=item,
+                    projection=request.get("ProjectionExpression"),
+                    names=request.get("ExpressionAttributeNames"),
+                )
+                for item in items
+            ]
+
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+    def transact_write_items(self, TransactItems: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:  # NOQA: N803
+        """
+        All conditions are checked first, items are written only if every one of them passes. Items written before
+        a write fails, e.g. an update of a key attribute, are put back.
+        """
+        if len(TransactItems) > 100:
+            raise get_client_error(
+                "ValidationException", "Member must have length less than or equal to 100", "TransactWriteItems"
+            )
+
+        operations = []
+        for transact_item in TransactItems:
+            (action, request), *_ = transact_item.items()
+            if action not in TRANSACT_WRITE_ACTIONS:
+                raise get_client_error(
+                    "ValidationException", f"Unsupported transaction action {action}", "TransactWriteItems"
+                )
+
+            table = self.get_table(table_name=request["TableName"])
+            item = request.get("Item")
+            key_item = item if item is not None else request["Key"]
+            key = table._get_key(
+                key={table.hash_key: key_item.get(table.hash_key), table.range_key: key_item.get(table.range_key)},
+                operation="TransactWriteItems",
+            )
+            condition = get_condition(
+                condition=request.get("ConditionExpression"),
+                names=request.get("ExpressionAttributeNames"),
+                values=request.get("ExpressionAttributeValues"),
+            )
+            # parsed before anything is written, so an invalid expression cancels the whole transaction
+            parser = (
+                table._get_update_parser(
+                    expression=request["UpdateExpression"],
+                    names=request.get("ExpressionAttributeNames"),
+                    values=request.get("ExpressionAttributeValues"),
+                )
+                if action == "Update"
+                else item
+            )
+            operations.append((action, table, key, parser, condition))
+
+        if len({(table.table_name, key) for _, table, key, _, _ in operations}) != len(operations):
+            raise get_client_error(
+                "ValidationException",
+                "Transaction request cannot include multiple operations on one item",
+                "TransactWriteItems",
+            )
+
+        with self._lock:
+            reasons = [
+                {"Code": "ConditionalCheckFailed", "Message": "The conditional request failed"}
+                if condition is not None
+                and not evaluate_condition(condition=condition, item=table._get_item(*key) or {})
+                else {"Code": "None"}
+                for _, table, key, _, condition in operations
+            ]
+            if any(reason["Code"] != "None" for reason in reasons):
+                codes = ", ".join(reason["Code"] for reason in reasons)
+                raise get_client_error(
+                    "TransactionCanceledException",
+                    f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                    "TransactWriteItems",
+                    CancellationReasons=reasons,
+                )
+
+            # stored items are replaced rather than changed in place, so they can be put back if a write fails
+            stored_items = [(table, key, table._get_stored_item(key=key)) for _, table, key, _, _ in operations]
+            try:
+                # ConditionCheck only takes part in the checks above
+                for action, table, key, item_or_parser, _ in operations:
+                    if action == "Put":
+                        table._put(item=item_or_parser)
+                    elif action == "Update":
+                        table._update(key=key, parser=item_or_parser, operation="TransactWriteItems")
+                    elif action == "Delete":
+                        table._delete(key=key)
+            except Exception:
+                for table, key, stored_item in stored_items:
+                    table._restore(key=key, stored_item=stored_item)
+                raise
+
+        return {}
+
+
+class InMemoryDynamoDB:
+    """Counterpart of boto3 DynamoDB service resource."""
+
+    def __init__(self) -> None:
+        self.meta = type("InMemoryDynamoDBMeta", (), {"client": InMemoryDynamoDBClient()})()
+
+    def Table(self, name: str) -> InMemoryTable:  # NOQA: N802
+        return self.meta.client.get_table(table_name=name)
+
+
+in_memory_dynamodb = InMemoryDynamoDB()
+
+
+def get_in_memory_table(table_name: str) -> InMemoryTable:
+    """Tables are shared process-wide, so all data accesses pointed at the same table name see the same items."""
+    return in_memory_dynamodb.Table(table_name)
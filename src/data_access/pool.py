@@ -0,0 +1,78 @@
+from threading import Lock
+from typing import TYPE_CHECKING
+
+import boto3
+from botocore.config import Config
+
+from src.settings import settings
+
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBServiceResource
+    from mypy_boto3_dynamodb.service_resource import Table
+
+
+class TablePool:
+    """
+    Shares DynamoDB resources between data accesses, so all of them reuse one HTTP connection pool.
+    Resources are keyed by region and credentials, tables additionally by name.
+    """
+
+    def __init__(self) -> None:
+        self._resources: dict[tuple[str, str, str], "DynamoDBServiceResource"] = {}
+        self._tables: dict[tuple[str, str, str, str], "Table"] = {}
+        self._lock = Lock()
+
+    def get_table(self, table_name: str, region: str, aws_access_key: str, aws_secret_key: str) -> "Table":
+        table_key = (region, aws_access_key, aws_secret_key, table_name)
+        if (table := self._tables.get(table_key)) is not None:
+            return table
+
+        with self._lock:
+            if table_key not in self._tables:
+                resource = self._get_resource(
+                    region=region, aws_access_key=aws_access_key, aws_secret_key=aws_secret_key
+                )
+                self._tables[table_key] = resource.Table(table_name)
+
+            return self._tables[table_key]
+
+    def _get_resource(self, region: str, aws_access_key: str, aws_secret_key: str) -> "DynamoDBServiceResource":
+        resource_key = (region, aws_access_key, aws_secret_key)
+        if resource_key not in self._resources:
+            # boto3.resource would use the default session, which is not safe to share between threads
+            session = boto3.session.Session(
+                aws_access_key_id=aws_access_key, aws_secret_access_key=aws_secret_key, region_name=region
+            )
+            self._resources[resource_key] = session.resource(
+                "dynamodb",
+                config=Config(
+                    max_pool_connections=settings.dynamodb_max_pool_connections,
+                    tcp_keepalive=settings.dynamodb_tcp_keepalive,
+                ),
+            )
+
+        return self._resources[resource_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resources.clear()
+            self._tables.clear()
+
+
+table_pool = TablePool()
+
+
+def get_table(table_name: str) -> "Table":
+    """Returns table for configured backend and credentials."""
+    if settings.dynamodb_backend == "memory":
+        from src.data_access.memory import get_in_memory_table
+
+        return get_in_memory_table(table_name=table_name)
+
+    return table_pool.get_table(
+        table_name=table_name,
+        region=settings.region,
+        aws_access_key=settings.aws_access_key,
+        aws_secret_key=settings.aws_secret_key,
+    )
@@ -1,6 +1,37 @@
+from typing import Any, Optional
+
 from src.data_access.dynamodb import DynamoDBDataAccess
 from src.schemas.user import UserModel
 
 
 class UserDataAccess(DynamoDBDataAccess[str, str, UserModel]):
     _model = UserModel
+
+    def get_many_by_emails(self, emails: list[str]) -> list[UserModel]:
+        return self.get_many_by_keys(keys=[{"pk": "user", "sk": f"user#{email}"} for email in emails])
+
+    def get_remove_connections_operation(
+        self, *, user: UserModel, connection_ids: set[str]
+    ) -> Optional[dict[str, Any]]:
+        """
+        Update removing given connections of the user by their positions in the list, executed with transact_write.
+        Each position is checked to still hold the connection, so the transaction is canceled if connections were
+        changed since the user was read. None if the user has none of the connections.
+        """
+        indexes = [index for index, connection_id in enumerate(user.connection_ids) if connection_id in connection_ids]
+        if not indexes:
+            return None
+
+        operation_kwargs = self._get_operation_kwargs(
+            condition_expression=" AND ".join(f"#connection_ids[{index}] = :c{index}" for index in indexes),
+            names={"#connection_ids": "connection_ids"},
+            values={f":c{index}": user.connection_ids[index] for index in indexes},
+        )
+        update_expression = "REMOVE " + ", ".join(f"#connection_ids[{index}]" for index in indexes)
+        return {
+            "Update": {
+                "Key": {"PK": user.pk, "SK": user.sk},
+                "UpdateExpression": update_expression,
+                **operation_kwargs,
+            }
+        }
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class GameStatus(str, Enum):
+    ACTIVE = "active"
+    FINISHED = "finished"
@@ -9,6 +9,7 @@ class Action(str, Enum):
     LIST_GAMES = "listGames"
     GET_GAME_DETAIL = "getGameDetail"
     MAKE_MOVE = "makeMove"
+    MAKE_MOVES = "makeMoves"
 
 
 class RouteKey(str, Enum):
@@ -0,0 +1,44 @@
+"""
+Registers connections of existing users in the connection registry, e.g.:
+python -m src.migrations.register_connections
+
+Connection registry is written on $connect, so connections opened before it was deployed are known only from
+UserModel.connection_ids. Run it once after the deployment, rerunning it is harmless.
+"""
+import argparse
+
+from src.data_access.connection import ConnectionDataAccess
+from src.data_access.user import UserDataAccess
+from src.settings import settings
+
+
+def register_connections(
+    user_data_access: UserDataAccess, connection_data_access: ConnectionDataAccess, page_size: int = 100
+) -> int:
+    """Users are read page by page and their connections are registered in batches of one page."""
+    count, users = 0, []
+    for user in user_data_access.iter_many(pk="user", page_size=page_size):
+        users.append(user)
+        if len(users) == page_size:
+            count += connection_data_access.register_users_connections(users=users)
+            users = []
+
+    return count + connection_data_access.register_users_connections(users=users)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Register connections of existing users in connection registry.")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    table_name = settings.dynamodb_games_table_name
+    count = register_connections(
+        user_data_access=UserDataAccess(table_name=table_name),
+        connection_data_access=ConnectionDataAccess(table_name=table_name),
+        page_size=args.page_size,
+    )
+    print(f"Registered {count} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Type, TypeVar
+
+from pydantic import BaseModel
 
 from src.core.schemas import BaseSchema
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def build_model(model_class: Type[ModelT], validate: bool, **values: Any) -> ModelT:
+    """
+    Items are written only by our own to_item, so models are built from them without validation, unless
+    DYNAMODB_VALIDATE_ITEMS is set. Values have to be converted to field types by the caller, e.g. Decimal to int.
+    """
+    if validate:
+        return model_class(**values)
+
+    # construct keeps every value passed, while validation ignores ones which are not fields
+    return model_class.construct(**{name: value for name, value in values.items() if name in model_class.__fields__})
+
+
 class DynamoDBBaseModel(BaseSchema, ABC):
     @classmethod
     @abstractmethod
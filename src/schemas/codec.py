@@ -0,0 +1,150 @@
+"""
+Compact binary encoding of games, used by GameModel.to_item when GAME_CODEC is set to "binary".
+
+The whole game is packed into a single Binary attribute - decks are 52-bit masks indexed by Card.ordinal,
+scores are unsigned shorts and users are referred to by their index in state.users. The first byte is the format
+version, so the layout can change later while items written in older formats are still readable.
+
+User ids are prefixed with unsigned short lengths. Counts of local state entries are single bytes, they cannot
+exceed number of users.
+"""
+import struct
+from typing import Any, Union
+
+from src.core.cards import ALL_CARDS
+from src.core.deck import Deck
+from src.core.enums import CardSuit
+from src.core.game import Game, GameSettings
+from src.core.schemas import BaseSchema
+from src.core.state import GameState
+from src.core.steps import CardExchangeStep, FinishedStep, FirstRoundStep, InProgressStep
+from src.core.types import CardExchangeState, FinishedState, RoundState
+from src.schemas.base import build_model
+
+
+FORMAT_VERSION = 1
+# marks missing current user and table suit
+NONE_INDEX = 0xFF
+
+# position in the tuples is the code stored in the binary, so new entries can only be appended
+STEPS = (CardExchangeStep, FirstRoundStep, InProgressStep, FinishedStep)
+SUITS = (CardSuit.SPADE, CardSuit.CLUB, CardSuit.DIAMOND, CardSuit.HEART)
+
+# format version, step, max score, timeout, number of users
+_HEADER = struct.Struct(">BBHHB")
+# length of encoded user id
+_USER_LENGTH = struct.Struct(">H")
+# score and deck mask of a single user
+_USER_STATE = struct.Struct(">HQ")
+# user index and mask of cards to exchange
+_EXCHANGE_ENTRY = struct.Struct(">BQ")
+
+
+def _encode_local_state(local_state: BaseSchema, user_indexes: dict[str, int]) -> bytes:
+    if isinstance(local_state, CardExchangeState):
+        entries = local_state.cards_to_exchange.items()
+        return bytes([len(entries)]) + b"".join(
+            _EXCHANGE_ENTRY.pack(user_indexes[user], Deck(cards).mask) for user, cards in entries
+        )
+
+    if isinstance(local_state, RoundState):
+        suit = NONE_INDEX if local_state.table_suit is None else SUITS.index(local_state.table_suit)
+        entries = local_state.cards_on_table.items()
+        # cards on table are kept in order in which they were played
+        return bytes(
+            [suit, len(entries), *(value for user, card in entries for value in (user_indexes[user], card.ordinal))]
+        )
+
+    if isinstance(local_state, FinishedState):
+        return bytes([len(local_state.users_ready), *(user_indexes[user] for user in local_state.users_ready)])
+
+    raise TypeError(f"Cannot encode local state of type {local_state.__class__.__name__}")
+
+
+def _decode_local_state(data: bytes, offset: int, step_class: type, users: list[str], validate: bool) -> BaseSchema:
+    if step_class is CardExchangeStep:
+        cards_to_exchange = {}
+        for index in range(data[offset]):
+            user_index, mask = _EXCHANGE_ENTRY.unpack_from(data, offset + 1 + index * _EXCHANGE_ENTRY.size)
+            cards_to_exchange[users[user_index]] = list(Deck.from_mask(mask))
+        return build_model(CardExchangeState, validate, cards_to_exchange=cards_to_exchange)
+
+    if step_class in (FirstRoundStep, InProgressStep):
+        suit_index, count = data[offset], data[offset + 1]
+        entries = data[offset + 2 : offset + 2 + 2 * count]
+        return build_model(
+            RoundState,
+            validate,
+            table_suit=None if suit_index == NONE_INDEX else SUITS[suit_index],
+            cards_on_table={users[entries[index]]: ALL_CARDS[entries[index + 1]] for index in range(0, 2 * count, 2)},
+        )
+
+    users_ready = [users[index] for index in data[offset + 1 : offset + 1 + data[offset]]]
+    return build_model(FinishedState, validate, users_ready=users_ready)
+
+
+def encode_game(game: Game) -> bytes:
+    """Game step shares its state with the game (see Game.dispatch), so the state is stored only once."""
+    state, step = game.state, game.current_step
+    user_indexes = {user: index for index, user in enumerate(state.users)}
+
+    chunks = [
+        _HEADER.pack(
+            FORMAT_VERSION, STEPS.index(type(step)), game.settings.max_score, game.settings.timeout, len(state.users)
+        )
+    ]
+    for user in state.users:
+        encoded_user = user.encode()
+        if len(encoded_user) > 0xFFFF:
+            raise ValueError("User id longer than 65535 bytes cannot be encoded")
+        chunks.append(_USER_LENGTH.pack(len(encoded_user)) + encoded_user)
+
+    chunks.append(bytes([NONE_INDEX if state.current_user is None else user_indexes[state.current_user]]))
+    chunks.extend(_USER_STATE.pack(state.scores[user], state.decks[user].mask) for user in state.users)
+    chunks.append(_encode_local_state(local_state=step.local_state, user_indexes=user_indexes))
+    return b"".join(chunks)
+
+
+def decode_game(value: Union[bytes, Any], validate: bool = True) -> Game:
+    """
+    Accepts bytes as well as boto3 Binary, which is returned when reading from the table.
+    Without validate, models are built with values decoded as they are, see build_model.
+    """
+    data = bytes(value)
+    if not data or data[0] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported game format version {data[:1].hex() or None}")
+
+    _, step_code, max_score, timeout, number_of_users = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    users = []
+    for _ in range(number_of_users):
+        (length,) = _USER_LENGTH.unpack_from(data, offset)
+        offset += _USER_LENGTH.size
+        users.append(data[offset : offset + length].decode())
+        offset += length
+
+    current_user_index = data[offset]
+    offset += 1
+    scores, decks = {}, {}
+    for user in users:
+        scores[user], mask = _USER_STATE.unpack_from(data, offset)
+        decks[user] = Deck.from_mask(mask)
+        offset += _USER_STATE.size
+
+    state = build_model(
+        GameState,
+        validate,
+        current_user=None if current_user_index == NONE_INDEX else users[current_user_index],
+        users=users,
+        scores=scores,
+        decks=decks,
+    )
+    step_class = STEPS[step_code]
+    local_state = _decode_local_state(data=data, offset=offset, step_class=step_class, users=users, validate=validate)
+    return build_model(
+        Game,
+        validate,
+        settings=build_model(GameSettings, validate, max_score=max_score, timeout=timeout),
+        state=state,
+        current_step=build_model(step_class, validate, game_state=state, local_state=local_state),
+    )
@@ -0,0 +1,50 @@
+import datetime as dt
+import zlib
+from functools import partial
+from typing import Any
+
+from pydantic import Field
+
+from src.schemas.base import DynamoDBBaseModel
+
+
+# connections are spread over partitions, so writes of connects and disconnects do not all hit a single one
+CONNECTION_SHARDS = 10
+CONNECTION_PKS = tuple(f"connection#{shard}" for shard in range(CONNECTION_SHARDS))
+
+
+def get_connection_pk(connection_id: str) -> str:
+    """crc32 instead of hash, which is randomized per process, so the shard is the same in every Lambda."""
+    return CONNECTION_PKS[zlib.crc32(connection_id.encode()) % CONNECTION_SHARDS]
+
+
+class ConnectionModel(DynamoDBBaseModel):
+    """Live websocket connection, exists between $connect and $disconnect of the connection."""
+
+    connection_id: str
+    user_id: str
+    connected_at: dt.datetime = Field(default_factory=partial(dt.datetime.now, tz=dt.timezone.utc))
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "ConnectionModel":
+        return cls(
+            connection_id=item["SK"].split("#", 1)[-1],
+            user_id=item["user_id"],
+            connected_at=dt.datetime.fromisoformat(item["connected_at"]),
+        )
+
+    def to_item(self) -> dict[str, Any]:
+        return {
+            "PK": self.pk,
+            "SK": self.sk,
+            "user_id": self.user_id,
+            "connected_at": self.connected_at.isoformat(),
+        }
+
+    @property
+    def pk(self) -> str:
+        return get_connection_pk(connection_id=self.connection_id)
+
+    @property
+    def sk(self) -> str:
+        return f"connection#{self.connection_id}"
@@ -1,16 +1,83 @@
 from decimal import Decimal
-from typing import Any, Optional
+from typing import Any, Optional, Type
 
-from src.core.game import Game
-from src.core.steps import STEP_MAPPING
+from pydantic import PrivateAttr
+
+from src.core.abstract import GameStep
+from src.core.cards import CARDS_BY_SUIT_AND_VALUE, Card
+from src.core.deck import Deck
+from src.core.enums import CardSuit
+from src.core.game import Game, GameSettings
+from src.core.schemas import BaseSchema
+from src.core.state import GameState
+from src.core.steps import STEP_MAPPING, CardExchangeStep, FinishedStep
+from src.core.types import CardExchangeState, FinishedState, RoundState
 from src.schemas.base import DynamoDBBaseModel
+from src.schemas.codec import decode_game, encode_game
+from src.settings import settings
+from src.settings.game import GameCodec
+
+
+def _load_card(card_item: dict[str, Any]) -> Card:
+    return CARDS_BY_SUIT_AND_VALUE[(CardSuit(card_item["suit"]), int(card_item["value"]))]
+
+
+def _load_local_state(local_state_item: dict[str, Any], step_class: Type[GameStep]) -> BaseSchema:
+    if step_class is CardExchangeStep:
+        cards_to_exchange = local_state_item["cards_to_exchange"]
+        return CardExchangeState.construct(
+            cards_to_exchange={user: [_load_card(card) for card in cards] for user, cards in cards_to_exchange.items()}
+        )
+
+    if step_class is FinishedStep:
+        return FinishedState.construct(users_ready=local_state_item["users_ready"])
+
+    table_suit = local_state_item["table_suit"]
+    return RoundState.construct(
+        cards_on_table={user: _load_card(card) for user, card in local_state_item["cards_on_table"].items()},
+        table_suit=None if table_suit is None else CardSuit(table_suit),
+    )
+
+
+def _load_game(game_item: dict[str, Any], step_class: Type[GameStep]) -> Game:
+    """
+    Builds game from map written by GameModel.to_item without validation. Game step shares its state with the
+    game (see Game.dispatch), so step's copy of the state is not loaded.
+    """
+    state_item = game_item["state"]
+    state = GameState.construct(
+        current_user=state_item["current_user"],
+        users=state_item["users"],
+        scores={user: int(score) for user, score in state_item["scores"].items()},
+        decks={user: Deck(_load_card(card) for card in deck) for user, deck in state_item["decks"].items()},
+    )
+    local_state = _load_local_state(local_state_item=game_item["current_step"]["local_state"], step_class=step_class)
+    settings_item = game_item["settings"]
+    return Game.construct(
+        settings=GameSettings.construct(
+            max_score=int(settings_item["max_score"]), timeout=int(settings_item["timeout"])
+        ),
+        state=state,
+        current_step=step_class.construct(game_state=state, local_state=local_state),
+    )
 
 
 class GameModel(DynamoDBBaseModel):
+    """
+    Game is stored either as nested maps or, with GAME_CODEC=binary, packed into game_data attribute
+    (see src.schemas.codec). Both formats are read, and items are migrated to the configured one when saved.
+    """
+
     game_id: str
     game: Game
     game_step: str
     finished_at: Optional[Decimal] = None  # datetime converted to seconds from epoch
+    version: int = 0  # incremented on every save, see GameDataAccess.save_versioned
+
+    # format of the item the game was read from
+    _item_codec: Optional[GameCodec] = PrivateAttr(default=None)
+    # set when moves saved in event log mode after the snapshot were replayed on the game
+    _has_events: bool = PrivateAttr(default=False)
 
     def __init__(self, **kwargs) -> None:
         game_step = kwargs["game"].current_step.__class__.__name__
@@ -18,21 +85,84 @@ class GameModel(DynamoDBBaseModel):
 
     @classmethod
     def from_item(cls, item: dict[str, Any]) -> "GameModel":
-        current_step_data = item["game"].pop("current_step")
-        step_instance = STEP_MAPPING[item["game_step"]](**current_step_data)
+        validate = settings.dynamodb_validate_items
+        if "game_data" in item:
+            game, item_codec = decode_game(item["game_data"], validate=validate), "binary"
+        elif validate:
+            current_step_data = item["game"].pop("current_step")
+            step_instance = STEP_MAPPING[item["game_step"]](**current_step_data)
+            game, item_codec = Game(**item["game"], current_step=step_instance), "map"
+        else:
+            game, item_codec = _load_game(game_item=item["game"], step_class=STEP_MAPPING[item["game_step"]]), "map"
+
+        game_id, version = item["SK"].split("#")[-1], int(item.get("version", 0))
+        if validate:
+            model = cls(game_id=game_id, game=game, finished_at=item["finished_at"], version=version)
+        else:
+            # __init__ which sets game_step is skipped
+            model = cls.construct(
+                game_id=game_id,
+                game=game,
+                game_step=item["game_step"],
+                finished_at=item["finished_at"],
+                version=version,
+            )
+        model._item_codec = item_codec
+        return model
+
+    def to_item(self, codec: Optional[GameCodec] = None) -> dict[str, Any]:
+        if (codec or settings.game_codec) == "map":
+            return {"PK": self.pk, "SK": self.sk, **self.dict(exclude={"game_id"})}
+
+        return {
+            "PK": self.pk,
+            "SK": self.sk,
+            "game_step": self.game_step,
+            "finished_at": self.finished_at,
+            "version": self.version,
+            "game_data": encode_game(self.game),
+            # kept outside of game_data for game previews
+            "users": self.game.state.users,
+        }
+
+    def to_stored_item(self) -> dict[str, Any]:
+        """Item in the format the game was read in, to be compared with item returned by to_item when updating."""
+        return self.to_item(codec=self._item_codec)
+
+    @property
+    def pk(self) -> str:
+        return f"game"
+
+    @property
+    def sk(self) -> str:
+        return f"game#{self.game_id}"
+
+
+class GameEventModel(DynamoDBBaseModel):
+    """Single move of a game, kept in game's own partition, so it does not show up in games listing."""
+
+    game_id: str
+    sequence: int  # version of the game after the move
+    payload: dict[str, Any]
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "GameEventModel":
         return cls(
-            game_id=item["SK"].split("#")[-1],
-            game=Game(**item["game"], current_step=step_instance),
-            finished_at=item["finished_at"],
+            game_id=item["PK"].split("#", 1)[-1], sequence=int(item["SK"].split("#")[-1]), payload=item["payload"]
         )
 
     def to_item(self) -> dict[str, Any]:
-        return {"PK": self.pk, "SK": self.sk, **self.dict(exclude={"game_id"})}
+        return {"PK": self.pk, "SK": self.sk, "payload": self.payload}
+
+    @classmethod
+    def get_sk(cls, sequence: int) -> str:
+        # zero padded, so events are sorted by sequence
+        return f"event#{sequence:010}"
 
     @property
     def pk(self) -> str:
-        return f"game"
+        return f"game#{self.game_id}"
 
     @property
     def sk(self) -> str:
-        return f"game#{self.game_id}"
+        return self.get_sk(sequence=self.sequence)
@@ -4,7 +4,8 @@ from typing import Any
 
 from pydantic import Field
 
-from src.schemas.base import DynamoDBBaseModel
+from src.schemas.base import DynamoDBBaseModel, build_model
+from src.settings import settings
 
 
 class LobbyModel(DynamoDBBaseModel):
@@ -15,11 +16,12 @@ class LobbyModel(DynamoDBBaseModel):
 
     @classmethod
     def from_item(cls, item: dict[str, Any]) -> "LobbyModel":
-        lobby_id = item["SK"].split("#")[-1]
-        return cls(
-            lobby_id=lobby_id,
+        return build_model(
+            cls,
+            settings.dynamodb_validate_items,
+            lobby_id=item["SK"].split("#")[-1],
             users=item["users"],
-            max_players=item["max_players"],
+            max_players=int(item["max_players"]),
             created_at=dt.datetime.fromisoformat(item["created_at"]),
         )
 
@@ -1,6 +1,7 @@
 from typing import Any
 
-from src.schemas.base import DynamoDBBaseModel
+from src.schemas.base import DynamoDBBaseModel, build_model
+from src.settings import settings
 
 
 class UserModel(DynamoDBBaseModel):
@@ -13,7 +14,7 @@ class UserModel(DynamoDBBaseModel):
     def from_item(cls, item: dict[str, Any]) -> "DynamoDBBaseModel":
         email = item.pop("SK").split("#")[-1]
         item.pop("PK")
-        return cls(email=email, **item)
+        return build_model(cls, settings.dynamodb_validate_items, email=email, **item)
 
     def to_item(self) -> dict[str, Any]:
         return {"PK": self.pk, "SK": self.sk, **self.dict(exclude={"email"})}
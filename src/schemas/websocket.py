@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional
 
 from pydantic import BaseModel, Field
 
@@ -7,10 +7,19 @@ from src.core.consts import USER
 from src.core.game import GameSettings
 from src.core.steps import STEP_MAPPING, CardExchangeStep
 from src.core.types import CardExchangeState
+from src.enums.game import GameStatus
 from src.schemas.base import BaseSchema
 from src.schemas.game import GameModel
 
 
+# in event log mode every move is a separate item written in one transaction, which takes at most 100 items
+MAX_MOVES_PER_REQUEST = 64
+
+
+class ListLobbiesPayload(BaseSchema):
+    only_mine: bool = False
+
+
 class CreateLobbyPayload(BaseSchema):
     max_players: int = Field(..., ge=3, le=4)
 
@@ -23,6 +32,11 @@ class JoinLobbyPayload(BaseSchema):
     lobby_id: str = Field(..., min_length=36, max_length=36)
 
 
+class ListGamesPayload(BaseSchema):
+    only_mine: bool = False
+    status: Optional[GameStatus] = None
+
+
 class GetGameDetailPayload(BaseSchema):
     game_id: str = Field(..., min_length=36, max_length=36)
 
@@ -32,14 +46,28 @@ class MakeMovePayload(BaseSchema):
     game_payload: dict[str, Any]
 
 
+class MakeMovesPayload(BaseSchema):
+    game_id: str = Field(..., min_length=36, max_length=36)
+    game_payloads: list[dict[str, Any]] = Field(..., min_items=1, max_items=MAX_MOVES_PER_REQUEST)
+
+
 class GamePreviewSchema(BaseSchema):
     game_id: str
     users: list[str]
 
+    # only attributes of game item needed to build preview, users are top level in binary encoded games
+    ITEM_PROJECTION: ClassVar[list[str]] = ["SK", "game.state.users", "users"]
+
     @classmethod
     def from_game(cls, game: GameModel) -> "GamePreviewSchema":
         return cls(game_id=game.game_id, users=game.game.state.users)
 
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "GamePreviewSchema":
+        """Builds preview from game item projected with ITEM_PROJECTION, without loading the whole game."""
+        users = item["users"] if "users" in item else item["game"]["state"]["users"]
+        return cls(game_id=item["SK"].split("#")[-1], users=users)
+
 
 class GameDetailState(BaseSchema):
     """Modified version of game state, hides other players' cards"""
@@ -60,6 +88,7 @@ class GameDetailSchema(BaseSchema):
     state: GameDetailState
     current_step: GameDetailStep
     step_name: str
+    legal_cards: list[Card] = Field(default_factory=list)
 
     @classmethod
     def from_game(cls, game: GameModel, user_id: str) -> "GameDetailSchema":
@@ -82,4 +111,5 @@ class GameDetailSchema(BaseSchema):
             state=obfuscated_state,
             current_step=obfuscated_step or game.game.current_step,
             step_name=game.game_step,
+            legal_cards=game.game.current_step.legal_moves(user=user_id),
         )
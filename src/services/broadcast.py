@@ -0,0 +1,96 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from botocore.exceptions import ClientError
+
+from src.utils import DateTimeJSONEncoder
+
+
+if TYPE_CHECKING:
+    from mypy_boto3_apigateway.client import APIGatewayClient
+
+
+class EncodedMessage:
+    """Message body rendered to bytes once, the same bytes are then posted to every recipient."""
+
+    __slots__ = ("body", "data")
+
+    # json.dumps builds new encoder on every call, this one is shared
+    _encoder = DateTimeJSONEncoder(separators=(",", ":"))
+
+    def __init__(self, body: dict[str, Any]) -> None:
+        self.body = body
+        self.data = self._encoder.encode(body).encode("utf-8")
+
+
+@dataclass
+class BroadcastResult:
+    sent: list[str] = field(default_factory=list)
+    failed: dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def gone_connection_ids(self) -> set[str]:
+        """Connections closed without $disconnect, API Gateway answers with 410 GoneException for them."""
+        return {
+            connection_id
+            for connection_id, error in self.failed.items()
+            if isinstance(error, ClientError) and error.response["Error"]["Code"] == "GoneException"
+        }
+
+
+class Broadcaster:
+    """
+    Posts messages to websocket connections concurrently, with at most max_concurrency requests in flight.
+    Failure of one connection does not stop others, all failures are collected in the result.
+    """
+
+    def __init__(self, api_gateway_client: "APIGatewayClient", max_concurrency: int) -> None:
+        self.api_gateway_client = api_gateway_client
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def broadcast(self, message: EncodedMessage, connection_ids: list[str]) -> BroadcastResult:
+        return self.send(messages=[(connection_id, message) for connection_id in connection_ids])
+
+    def send(self, messages: list[tuple[str, EncodedMessage]]) -> BroadcastResult:
+        """Messages are (connection_id, message) pairs, returns once every one of them is either sent or failed."""
+        if len(messages) <= 1 or self.max_concurrency == 1:
+            outcomes = [
+                self._post(connection_id=connection_id, data=message.data) for connection_id, message in messages
+            ]
+        else:
+            outcomes = list(
+                self._get_executor().map(
+                    lambda connection_message: self._post(
+                        connection_id=connection_message[0], data=connection_message[1].data
+                    ),
+                    messages,
+                )
+            )
+
+        result = BroadcastResult()
+        for (connection_id, _), error in zip(messages, outcomes):
+            if error is None:
+                result.sent.append(connection_id)
+            else:
+                result.failed[connection_id] = error
+
+        if result.failed:
+            logging.warning(f"Failed to send messages to connections: {', '.join(result.failed)}")
+
+        return result
+
+    def _post(self, connection_id: str, data: bytes) -> Optional[Exception]:
+        try:
+            self.api_gateway_client.post_to_connection(Data=data, ConnectionId=connection_id)
+        except Exception as error:  # NOQA: B902, anything raised by one post must not break the broadcast
+            return error
+
+        return None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="broadcast")
+        return self._executor
@@ -1,3 +1,10 @@
+from typing import TYPE_CHECKING, Optional
+
+
+if TYPE_CHECKING:
+    from src.schemas.game import GameModel
+
+
 class ServiceException(Exception):
     pass
 
@@ -8,3 +15,12 @@ class WebsocketHandlerException(ServiceException):
 
 class GameServiceException(ServiceException):
     pass
+
+
+class InvalidMove(GameServiceException):
+    """Raised by GameService.dispatch_game_actions, game is the one saved with moves preceding the invalid one."""
+
+    def __init__(self, message: str, index: int, game: Optional["GameModel"] = None) -> None:
+        super().__init__(message)
+        self.index = index
+        self.game = game
@@ -3,9 +3,13 @@ from decimal import Decimal
 from typing import Any, Optional
 from uuid import uuid4
 
+from pydantic import ValidationError
+
+from src.core.exceptions import GameError
 from src.core.game import Game
 from src.core.steps import FinishedStep
-from src.data_access.exceptions import DoesNotExist
+from src.core.types import Payload
+from src.data_access.exceptions import DoesNotExist, TransactionCanceled, VersionConflict
 from src.data_access.game import GameDataAccess
 from src.data_access.lobby import LobbyDataAccess
 from src.data_access.user import UserDataAccess
@@ -13,7 +17,11 @@ from src.schemas.game import GameModel
 from src.schemas.lobby import LobbyModel
 from src.schemas.user import UserModel
 from src.schemas.websocket import GetGameDetailPayload
-from src.services.exceptions import GameServiceException
+from src.services.exceptions import GameServiceException, InvalidMove
+
+
+# players often move at the same time, e.g. when exchanging cards, so conflicting saves are retried
+MAX_DISPATCH_ATTEMPTS = 5
 
 
 class GameService:
@@ -42,30 +50,70 @@ class GameService:
         if user.email in lobby.users:
             raise GameServiceException(f"User {user.email} is already in lobby {lobby.lobby_id}")
 
+        # users are updated, not saved, so their attributes changed since they were read, e.g. connections, are kept
+        original_user_item = user.to_item()
         if len(lobby.users) + 1 == lobby.max_players:  # lobby will be full, we can start the game
-            users = [self.user_data_access.get(pk=f"user", sk=f"user#{email}") for email in lobby.users]
+            users = self.user_data_access.get_many_by_emails(emails=lobby.users)
+            original_items = [user_.to_item() for user_ in users]
             game_id = str(uuid4())
             for user_ in users:
-                user_.lobbies_ids.remove(lobby_id)
+                if lobby_id in user_.lobbies_ids:  # might have been removed already by a concurrent join
+                    user_.lobbies_ids.remove(lobby_id)
 
             for user_ in users + [user]:
                 user_.games_ids.append(game_id)
 
-            self.user_data_access.bulk_save(models=users + [user])
-            self.lobby_data_access.delete(**lobby_key)
-
             game = GameModel(
                 game_id=game_id, game=Game.start_game(users=[user.email for user in users] + [user.email])
             )
-            self.game_data_access.save(model=game)
+            # lobby is deleted only if nobody joined or left it since it was read, so of concurrent joins
+            # to the last free place only one starts the game. Lobby ids are written as a whole list,
+            # so they have to be the same as when read
+            operations = [
+                *(
+                    self.user_data_access.get_update_operation(
+                        model=user_,
+                        original_item=original_item,
+                        condition_expression="#lobbies_ids = :lobbies_ids",
+                        names={"#lobbies_ids": "lobbies_ids"},
+                        values={":lobbies_ids": original_item["lobbies_ids"]},
+                    )
+                    for user_, original_item in zip(users, original_items)
+                ),
+                self.user_data_access.get_update_operation(model=user, original_item=original_user_item),
+                self.lobby_data_access.get_delete_operation(
+                    **lobby_key,
+                    condition_expression="size(#users) = :users_count",
+                    names={"#users": "users"},
+                    values={":users_count": len(lobby.users)},
+                ),
+                self.game_data_access.get_put_operation(model=game, condition_expression="attribute_not_exists(SK)"),
+            ]
+            try:
+                self.game_data_access.transact_write(operations=operations)
+            except TransactionCanceled as error:
+                raise GameServiceException(f"Lobby {lobby_id} has changed, try to join again") from error
 
             return game
 
+        original_lobby_item = lobby.to_item()
         lobby.users.append(user.email)
-        self.lobby_data_access.save(model=lobby)
-
         user.lobbies_ids.append(lobby.lobby_id)
-        self.user_data_access.save(model=user)
+        # the same condition as above, so concurrent joins cannot overwrite each other's seats
+        operations = [
+            self.lobby_data_access.get_update_operation(
+                model=lobby,
+                original_item=original_lobby_item,
+                condition_expression="size(#users) = :users_count",
+                names={"#users": "users"},
+                values={":users_count": len(original_lobby_item["users"])},
+            ),
+            self.user_data_access.get_update_operation(model=user, original_item=original_user_item),
+        ]
+        try:
+            self.lobby_data_access.transact_write(operations=operations)
+        except TransactionCanceled as error:
+            raise GameServiceException(f"Lobby {lobby_id} has changed, try to join again") from error
 
     def remove_user_from_lobby(self, lobby_id: str, user: UserModel) -> bool:
         lobby = self.lobby_data_access.get(pk="lobby", sk=f"lobby#{lobby_id}")
@@ -88,7 +136,7 @@ class GameService:
         return len(lobby.users) == 0
 
     def get_game_with_user(self, game_id: str, user_id: str) -> GameModel:
-        game = self.game_data_access.get(pk="game", sk=f"game#{game_id}")
+        game = self.game_data_access.get_game(game_id=game_id)
         if game is None:
             raise DoesNotExist(f"You do not participate in game with id {game_id}")
 
@@ -98,7 +146,91 @@ class GameService:
         return game
 
     def dispatch_game_action(self, game_id: str, user: UserModel, payload: dict[str, Any]) -> GameModel:
-        game_model = self.game_data_access.get(pk=f"game", sk=f"game#{game_id}")
+        """
+        Game is saved only if nobody else moved since it was read, otherwise the move is dispatched again
+        on freshly read game, so moves of players acting at the same time are never lost. Cached game is used
+        only in the first attempt, a move it rejects is checked again on the game read from the table.
+        """
+        for attempt in range(MAX_DISPATCH_ATTEMPTS):
+            try:
+                return self._dispatch_game_action(game_id=game_id, user=user, payload=payload, use_cache=attempt == 0)
+            except VersionConflict:
+                continue
+
+        raise GameServiceException(f"Game with id {game_id} is changed by other players too often, try again")
+
+    def dispatch_game_actions(self, game_id: str, user: UserModel, payloads: list[dict[str, Any]]) -> GameModel:
+        """
+        Dispatches moves in order on a game read and saved once. Stops at the first invalid move - moves before it
+        are saved and InvalidMove with its index is raised.
+        """
+        for attempt in range(MAX_DISPATCH_ATTEMPTS):
+            try:
+                return self._dispatch_game_actions(
+                    game_id=game_id, user=user, payloads=payloads, use_cache=attempt == 0
+                )
+            except VersionConflict:
+                continue
+
+        raise GameServiceException(f"Game with id {game_id} is changed by other players too often, try again")
+
+    def _dispatch_game_action(
+        self, game_id: str, user: UserModel, payload: dict[str, Any], use_cache: bool
+    ) -> GameModel:
+        game_model = self._get_game_to_move(game_id=game_id, user=user, use_cache=use_cache)
+        original_item, previous_step = self._get_original_item(game_model=game_model), game_model.game_step
+        try:
+            payload = self._dispatch(game_model=game_model, user=user, payload=payload)
+        except (ValidationError, GameError) as error:
+            self._raise_if_possibly_stale(game_id=game_id, use_cache=use_cache, error=error)
+            raise
+
+        self.game_data_access.save_moves(
+            model=game_model,
+            payloads=[payload],
+            original_item=original_item,
+            step_changed=game_model.game_step != previous_step,
+        )
+        return game_model
+
+    def _dispatch_game_actions(
+        self, game_id: str, user: UserModel, payloads: list[dict[str, Any]], use_cache: bool
+    ) -> GameModel:
+        game_model = self._get_game_to_move(game_id=game_id, user=user, use_cache=use_cache)
+        original_item, previous_step = self._get_original_item(game_model=game_model), game_model.game_step
+        dispatched_payloads = []
+        invalid_move: Optional[tuple[int, Exception]] = None
+        for index, payload in enumerate(payloads):
+            try:
+                if game_model.game_step == FinishedStep.__name__:
+                    raise GameServiceException(f"Game with id {game_id} is already finished")
+
+                dispatched_payloads.append(self._dispatch(game_model=game_model, user=user, payload=payload))
+            except (ValidationError, GameError, GameServiceException) as error:
+                invalid_move = index, error
+                break
+
+        if invalid_move is not None:
+            self._raise_if_possibly_stale(game_id=game_id, use_cache=use_cache, error=invalid_move[1])
+
+        if dispatched_payloads:
+            self.game_data_access.save_moves(
+                model=game_model,
+                payloads=dispatched_payloads,
+                original_item=original_item,
+                step_changed=game_model.game_step != previous_step,
+            )
+
+        if invalid_move is not None:
+            index, error = invalid_move
+            raise InvalidMove(
+                f"Move {index} is invalid: {error}", index=index, game=game_model if dispatched_payloads else None
+            ) from error
+
+        return game_model
+
+    def _get_game_to_move(self, game_id: str, user: UserModel, use_cache: bool) -> GameModel:
+        game_model = self.game_data_access.get_game(game_id=game_id, for_update=True, use_cache=use_cache)
         if game_model is None:
             raise DoesNotExist(f"Game with id {game_id} does not exist")
 
@@ -108,6 +240,27 @@ class GameService:
         if game_model.game_step == FinishedStep.__name__:
             raise GameServiceException(f"Game with id {game_id} is already finished")
 
+        return game_model
+
+    @staticmethod
+    def _raise_if_possibly_stale(game_id: str, use_cache: bool, error: Exception) -> None:
+        """
+        Game read with use_cache might be older than the one in the table, e.g. moved on by another container,
+        so rejected move is dispatched again on the game read from the table instead of being reported.
+        """
+        if use_cache:
+            raise VersionConflict(f"Cached game with id {game_id} might be stale") from error
+
+    def _get_original_item(self, game_model: GameModel) -> Optional[dict[str, Any]]:
+        # moves are appended to event log instead of diffing whole game in event log mode
+        return None if self.game_data_access.event_log else game_model.to_stored_item()
+
+    @staticmethod
+    def _dispatch(game_model: GameModel, user: UserModel, payload: dict[str, Any]) -> Payload:
+        # user is taken from the connection, client must not pass it
+        if not isinstance(payload, dict) or "user" in payload:
+            raise GameServiceException("Move has to be an object without user")
+
         payload = game_model.game.current_step.payload_class(**payload, user=user.email)
         game_model.game.dispatch(payload=payload)
         game_model.game_step = game_model.game.current_step.__class__.__name__
@@ -115,5 +268,4 @@ class GameService:
         if game_model.game_step == FinishedStep.__name__:
             game_model.finished_at = Decimal(dt.datetime.utcnow().timestamp())
 
-        self.game_data_access.save(model=game_model)
-        return game_model
+        return payload
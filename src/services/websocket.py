@@ -1,12 +1,12 @@
-import json
-from typing import Any, Optional
-
-from mypy_boto3_apigateway.client import APIGatewayClient
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
+from src.data_access.connection import ConnectionDataAccess
+from src.data_access.exceptions import DoesNotExist, TransactionCanceled
 from src.data_access.game import GameDataAccess
 from src.data_access.lobby import LobbyDataAccess
 from src.data_access.user import UserDataAccess
 from src.enums.websocket import PayloadType
+from src.schemas.connection import ConnectionModel, get_connection_pk
 from src.schemas.game import GameModel
 from src.schemas.lobby import LobbyModel
 from src.schemas.user import UserModel
@@ -17,10 +17,22 @@ from src.schemas.websocket import (
     GetGameDetailPayload,
     JoinLobbyPayload,
     LeaveLobbyPayload,
+    ListGamesPayload,
+    ListLobbiesPayload,
     MakeMovePayload,
+    MakeMovesPayload,
 )
+from src.services.broadcast import Broadcaster, BroadcastResult, EncodedMessage
 from src.services.game import GameService
-from src.utils import DateTimeJSONEncoder
+from src.settings import settings
+
+
+if TYPE_CHECKING:
+    from mypy_boto3_apigateway.client import APIGatewayClient
+
+
+# users are read again if their connections changed while dead ones were being removed
+MAX_REMOVE_CONNECTIONS_ATTEMPTS = 3
 
 
 class WebsocketHandler:
@@ -29,19 +41,63 @@ class WebsocketHandler:
         user_data_access: UserDataAccess,
         lobby_data_access: LobbyDataAccess,
         game_data_access: GameDataAccess,
+        connection_data_access: ConnectionDataAccess,
         game_service: GameService,
-        api_gateway_client: APIGatewayClient,
+        api_gateway_client: "APIGatewayClient",
+        broadcaster: Optional[Broadcaster] = None,
     ) -> None:
         self.user_data_access = user_data_access
         self.lobby_data_access = lobby_data_access
         self.game_data_access = game_data_access
+        self.connection_data_access = connection_data_access
         self.game_service = game_service
         self.api_gateway_client = api_gateway_client
+        self.broadcaster = broadcaster or Broadcaster(
+            api_gateway_client=api_gateway_client, max_concurrency=settings.broadcast_max_concurrency
+        )
 
     def send_to_connection(self, *, body: dict[str, Any], connection_id: str) -> None:
-        self.api_gateway_client.post_to_connection(
-            Data=json.dumps(body, cls=DateTimeJSONEncoder).encode("utf-8"), ConnectionId=connection_id
-        )
+        self.api_gateway_client.post_to_connection(Data=EncodedMessage(body=body).data, ConnectionId=connection_id)
+
+    def _broadcast(self, *, messages: list[tuple[str, EncodedMessage]], users: list[UserModel]) -> BroadcastResult:
+        result = self.broadcaster.send(messages=messages)
+        if gone_connection_ids := result.gone_connection_ids:
+            self._remove_connections(users=users, connection_ids=gone_connection_ids)
+
+        return result
+
+    def _remove_connections(self, *, users: list[UserModel], connection_ids: set[str]) -> None:
+        """
+        Drops dead connections from the connection registry and from all affected users in one transaction.
+        Only the dead ids are removed from users, if users changed since they were read, they are read again.
+        """
+        self.connection_data_access.delete_many(connection_ids=list(connection_ids))
+        users = list({user.email: user for user in users}.values())
+        for _ in range(MAX_REMOVE_CONNECTIONS_ATTEMPTS):
+            operations = [
+                operation
+                for user in users
+                if (
+                    operation := self.user_data_access.get_remove_connections_operation(
+                        user=user, connection_ids=connection_ids
+                    )
+                )
+                is not None
+            ]
+            if not operations:
+                return
+
+            try:
+                self.user_data_access.transact_write(operations=operations)
+            except TransactionCanceled:
+                users = self.user_data_access.get_many_by_emails(emails=[user.email for user in users])
+            else:
+                for user in users:
+                    user.connection_ids = [
+                        connection_id for connection_id in user.connection_ids if connection_id not in connection_ids
+                    ]
+                return
+        # connections left are removed when they are found dead by one of next broadcasts
 
     def send_to_users(
         self,
@@ -49,31 +105,53 @@ class WebsocketHandler:
         body: dict[str, Any],
         users: list[UserModel],
         excluded_connection: Optional[str] = None,
-    ) -> None:
-        for user in users:
-            for user_connection_id in user.connection_ids:
-                if user_connection_id == excluded_connection:
-                    continue
+    ) -> BroadcastResult:
+        message = EncodedMessage(body=body)
+        return self._broadcast(
+            messages=[
+                (connection_id, message)
+                for user in users
+                for connection_id in user.connection_ids
+                if connection_id != excluded_connection
+            ],
+            users=users,
+        )
 
-                self.api_gateway_client.post_to_connection(
-                    Data=json.dumps(body, cls=DateTimeJSONEncoder).encode("utf-8"),
-                    ConnectionId=user_connection_id,
-                )
+    def send_to_online_users(self, *, body: dict[str, Any]) -> BroadcastResult:
+        """Sends to every live connection from connection registry, gone ones are removed from registry."""
+        result = self.broadcaster.broadcast(
+            message=EncodedMessage(body=body), connection_ids=self.connection_data_access.get_connection_ids()
+        )
+        if gone_connection_ids := result.gone_connection_ids:
+            self.connection_data_access.delete_many(connection_ids=list(gone_connection_ids))
+
+        return result
 
     def connect_user(self, *, user_id: str, connection_id: str) -> None:
         user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
         if user is None:
-            user = UserModel(email=user_id)
-
-        user.connection_ids.append(connection_id)
-        self.user_data_access.save(model=user)
+            self.user_data_access.save(model=UserModel(email=user_id, connection_ids=[connection_id]))
+        else:
+            original_item = user.to_item()
+            user.connection_ids.append(connection_id)
+            self.user_data_access.update(model=user, original_item=original_item)
+        self.connection_data_access.save(model=ConnectionModel(connection_id=connection_id, user_id=user_id))
 
     def disconnect_user(self, *, user_id: str, connection_id: str) -> None:
         user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
-        user.connection_ids.remove(connection_id)
-        self.user_data_access.save(model=user)
+        if connection_id in user.connection_ids:  # might have been pruned by broadcast already
+            original_item = user.to_item()
+            user.connection_ids.remove(connection_id)
+            self.user_data_access.update(model=user, original_item=original_item)
+
+        try:
+            self.connection_data_access.delete(
+                pk=get_connection_pk(connection_id=connection_id), sk=f"connection#{connection_id}"
+            )
+        except DoesNotExist:  # already pruned by broadcast
+            pass
 
-    def send_lobbies_list_to_connection(self, *, lobbies: list[LobbyModel], connection_id: str) -> None:
+    def send_lobbies_list_to_connection(self, *, lobbies: Iterable[LobbyModel], connection_id: str) -> None:
         self.send_to_connection(
             body={
                 "type": PayloadType.LOBBIES_LIST.value,
@@ -82,47 +160,47 @@ class WebsocketHandler:
             connection_id=connection_id,
         )
 
-    def send_lobby_updated_to_users(self, *, users: list[UserModel], lobby: LobbyModel) -> None:
-        for user in users:
-            for connection_id in user.connection_ids:
-                self.send_to_connection(
-                    body={"type": PayloadType.LOBBY_UPDATED.value, "lobby": lobby.dict(by_alias=True)},
-                    connection_id=connection_id,
-                )
+    def send_lobby_updated_to_users(self, *, users: list[UserModel], lobby: LobbyModel) -> BroadcastResult:
+        return self.send_to_users(
+            body={"type": PayloadType.LOBBY_UPDATED.value, "lobby": lobby.dict(by_alias=True)}, users=users
+        )
 
-    def send_lobby_deleted_to_users(self, *, users: list[UserModel], lobby_id: str) -> None:
-        for user in users:
-            for connection_id in user.connection_ids:
-                self.send_to_connection(
-                    body={"type": PayloadType.LOBBY_DELETED.value, "lobbyId": lobby_id}, connection_id=connection_id
-                )
+    def send_lobby_deleted_to_users(self, *, users: list[UserModel], lobby_id: str) -> BroadcastResult:
+        return self.send_to_users(body={"type": PayloadType.LOBBY_DELETED.value, "lobbyId": lobby_id}, users=users)
 
-    def send_games_preview_to_connection(self, *, games: list[GameModel], connection_id: str) -> None:
+    def send_lobby_updated_to_online_users(self, *, lobby: LobbyModel) -> BroadcastResult:
+        return self.send_to_online_users(
+            body={"type": PayloadType.LOBBY_UPDATED.value, "lobby": lobby.dict(by_alias=True)}
+        )
+
+    def send_lobby_deleted_to_online_users(self, *, lobby_id: str) -> BroadcastResult:
+        return self.send_to_online_users(body={"type": PayloadType.LOBBY_DELETED.value, "lobbyId": lobby_id})
+
+    def send_games_preview_to_connection(self, *, previews: Iterable[GamePreviewSchema], connection_id: str) -> None:
         self.send_to_connection(
             body={
                 "type": PayloadType.GAMES_LIST.value,
-                "games": [GamePreviewSchema.from_game(game=game).dict(by_alias=True) for game in games],
+                "games": [preview.dict(by_alias=True) for preview in previews],
             },
             connection_id=connection_id,
         )
 
-    def send_game_preview_updated_to_users(self, *, users: list[UserModel], game: GameModel) -> None:
-        for user in users:
-            for connection_id in user.connection_ids:
-                self.send_to_connection(
-                    body={
-                        "type": PayloadType.GAME_UPDATED,
-                        "game": GamePreviewSchema.from_game(game=game).dict(by_alias=True),
-                    },
-                    connection_id=connection_id,
-                )
+    def send_game_preview_updated_to_users(self, *, users: list[UserModel], game: GameModel) -> BroadcastResult:
+        return self.send_to_users(
+            body={
+                "type": PayloadType.GAME_UPDATED,
+                "game": GamePreviewSchema.from_game(game=game).dict(by_alias=True),
+            },
+            users=users,
+        )
 
-    def send_game_preview_deleted_to_users(self, *, users: list[UserModel], game_id: str) -> None:
-        for user in users:
-            for connection_id in user.connection_ids:
-                self.send_to_connection(
-                    body={"type": PayloadType.GAME_UPDATED, "gameId": game_id}, connection_id=connection_id
-                )
+    def send_game_preview_updated_to_online_users(self, *, game: GameModel) -> BroadcastResult:
+        return self.send_to_online_users(
+            body={"type": PayloadType.GAME_UPDATED, "game": GamePreviewSchema.from_game(game=game).dict(by_alias=True)}
+        )
+
+    def send_game_preview_deleted_to_users(self, *, users: list[UserModel], game_id: str) -> BroadcastResult:
+        return self.send_to_users(body={"type": PayloadType.GAME_UPDATED, "gameId": game_id}, users=users)
 
     def send_game_detail_to_connection(self, *, game: GameModel, user_id: str, connection_id: str) -> None:
         self.send_to_connection(
@@ -133,29 +211,41 @@ class WebsocketHandler:
             connection_id=connection_id,
         )
 
-    def send_game_detail_updated_to_users(self, *, game: GameModel) -> None:
-        for user_id in game.game.state.users:
-            user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
-            for connection_id in user.connection_ids:
-                self.send_to_connection(
-                    body={
-                        "type": PayloadType.GAME_DETAIL_UPDATED.value,
-                        "game": GameDetailSchema.from_game(game=game, user_id=user_id).dict(by_alias=True),
-                    },
-                    connection_id=connection_id,
-                )
+    def send_game_detail_updated_to_users(self, *, game: GameModel) -> BroadcastResult:
+        messages = []
+        users = self.user_data_access.get_many_by_emails(emails=game.game.state.users)
+        for user in users:
+            # detail differs between users, but is encoded once for all connections of a user
+            message = EncodedMessage(
+                body={
+                    "type": PayloadType.GAME_DETAIL_UPDATED.value,
+                    "game": GameDetailSchema.from_game(game=game, user_id=user.email).dict(by_alias=True),
+                }
+            )
+            messages.extend((connection_id, message) for connection_id in user.connection_ids)
 
-    def send_game_detail_deleted_to_users(self, *, game: GameModel) -> None:
-        for user_id in game.game.state.users:
-            user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
-            for connection_id in user.connection_ids:
-                self.send_to_connection(
-                    body={
-                        "type": PayloadType.GAME_DETAIL_DELETED.value,
-                        "gameId": game.game_id,
-                    },
-                    connection_id=connection_id,
-                )
+        return self._broadcast(messages=messages, users=users)
+
+    def send_game_detail_deleted_to_users(self, *, game: GameModel) -> BroadcastResult:
+        users = self.user_data_access.get_many_by_emails(emails=game.game.state.users)
+        return self.send_to_users(
+            body={"type": PayloadType.GAME_DETAIL_DELETED.value, "gameId": game.game_id}, users=users
+        )
+
+    def list_lobbies(self, *, payload: ListLobbiesPayload, user_id: str) -> Iterable[LobbyModel]:
+        if not payload.only_mine:
+            return self.lobby_data_access.iter_many(pk="lobby")
+
+        user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
+        return self.lobby_data_access.iter_by_ids(lobby_ids=user.lobbies_ids)
+
+    def list_games(self, *, payload: ListGamesPayload, user_id: str) -> Iterable[GamePreviewSchema]:
+        """User's own games are read by ids kept on user, so they do not need a query over all games."""
+        if not payload.only_mine:
+            return self.game_data_access.iter_previews(status=payload.status)
+
+        user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
+        return self.game_data_access.iter_previews_by_ids(game_ids=user.games_ids, status=payload.status)
 
     def create_lobby(self, *, payload: CreateLobbyPayload, user_id: str) -> LobbyModel:
         user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
@@ -175,3 +265,9 @@ class WebsocketHandler:
     def make_move(self, *, payload: MakeMovePayload, user_id: str) -> GameModel:
         user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
         return self.game_service.dispatch_game_action(game_id=payload.game_id, payload=payload.game_payload, user=user)
+
+    def make_moves(self, *, payload: MakeMovesPayload, user_id: str) -> GameModel:
+        user = self.user_data_access.get(pk="user", sk=f"user#{user_id}")
+        return self.game_service.dispatch_game_actions(
+            game_id=payload.game_id, payloads=payload.game_payloads, user=user
+        )
@@ -1,7 +1,9 @@
 from src.settings.aws import AWSSettings
+from src.settings.game import GameStorageSettings
+from src.settings.websocket import WebsocketSettings
 
 
-class Settings(AWSSettings):
+class Settings(AWSSettings, WebsocketSettings, GameStorageSettings):
     pass
 
 
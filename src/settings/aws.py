@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseSettings, Field
 
 
@@ -6,3 +8,8 @@ class AWSSettings(BaseSettings):
     aws_secret_key: str = Field(..., env="AWS_SECRET_KEY")
     region: str = Field("eu-central-1", env="REGION")
     dynamodb_games_table_name: str = Field(..., env="DYNAMODB_GAMES_TABLE_NAME")
+    dynamodb_backend: Literal["aws", "memory"] = Field("aws", env="DYNAMODB_BACKEND")
+    dynamodb_max_pool_connections: int = Field(50, gt=0, env="DYNAMODB_MAX_POOL_CONNECTIONS")
+    dynamodb_tcp_keepalive: bool = Field(True, env="DYNAMODB_TCP_KEEPALIVE")
+    # validates items read from the table, which are otherwise trusted, useful for debugging
+    dynamodb_validate_items: bool = Field(False, env="DYNAMODB_VALIDATE_ITEMS")
@@ -0,0 +1,17 @@
+from typing import Literal
+
+from pydantic import BaseSettings, Field
+
+
+GameCodec = Literal["map", "binary"]
+
+
+class GameStorageSettings(BaseSettings):
+    # "item" keeps every game as a single item, "event_log" appends moves and saves full game only as a snapshot
+    game_storage: Literal["item", "event_log"] = Field("item", env="GAME_STORAGE")
+    game_snapshot_interval: int = Field(20, gt=0, env="GAME_SNAPSHOT_INTERVAL")
+    # "map" stores game as nested maps, "binary" packs it into a single attribute, see src.schemas.codec
+    game_codec: GameCodec = Field("map", env="GAME_CODEC")
+    # games kept in memory of a warm container, see GameDataAccess, size 0 disables the cache
+    game_cache_size: int = Field(128, ge=0, env="GAME_CACHE_SIZE")
+    game_cache_ttl: float = Field(5.0, ge=0, env="GAME_CACHE_TTL")
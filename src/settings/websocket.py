@@ -0,0 +1,5 @@
+from pydantic import BaseSettings, Field
+
+
+class WebsocketSettings(BaseSettings):
+    broadcast_max_concurrency: int = Field(16, gt=0, env="BROADCAST_MAX_CONCURRENCY")
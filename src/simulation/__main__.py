@@ -0,0 +1,36 @@
+"""
+Headless bulk game simulator, e.g.:
+python -m src.simulation --games 1000 --policies random greedy-low random --workers 4
+"""
+import argparse
+
+from src.simulation.policies import POLICY_MAPPING
+from src.simulation.runner import run_simulation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play full black widow games between bots and report throughput.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument(
+        "--policies", nargs="+", choices=list(POLICY_MAPPING), default=["random", "random", "greedy-low"]
+    )
+    parser.add_argument("--workers", type=int, default=None, help="process pool size, defaults to CPU count")
+    parser.add_argument("--max-score", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if len(args.policies) not in (3, 4):
+        parser.error("Game requires 3 or 4 players.")
+
+    report = run_simulation(
+        games=args.games,
+        policy_names=args.policies,
+        workers=args.workers,
+        max_score=args.max_score,
+        seed=args.seed,
+    )
+    print(report.json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Optional, Type
+
+from src.core.cards import Card
+from src.core.consts import USER
+
+
+class BotPolicy(ABC):
+    def __init__(self, seed: Optional[int] = None) -> None:
+        self.random = random.Random(seed)
+
+    @abstractmethod
+    def pick_cards_to_exchange(self, deck: list[Card]) -> list[Card]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def pick_card(self, legal_cards: list[Card], cards_on_table: dict[USER, Card]) -> Card:
+        raise NotImplementedError
+
+
+class RandomLegalPolicy(BotPolicy):
+    """Exchanges and plays random cards, as long as the move is legal."""
+
+    def pick_cards_to_exchange(self, deck: list[Card]) -> list[Card]:
+        return self.random.sample(deck, 3)
+
+    def pick_card(self, legal_cards: list[Card], cards_on_table: dict[USER, Card]) -> Card:
+        return self.random.choice(legal_cards)
+
+
+class GreedyLowCardPolicy(BotPolicy):
+    """Gets rid of its most expensive cards in exchange and always plays its lowest legal card."""
+
+    def pick_cards_to_exchange(self, deck: list[Card]) -> list[Card]:
+        return sorted(deck, key=lambda card: (card.score, card.value), reverse=True)[:3]
+
+    def pick_card(self, legal_cards: list[Card], cards_on_table: dict[USER, Card]) -> Card:
+        return min(legal_cards, key=lambda card: (card.value, card.score))
+
+
+POLICY_MAPPING: dict[str, Type[BotPolicy]] = {
+    "random": RandomLegalPolicy,
+    "greedy-low": GreedyLowCardPolicy,
+}
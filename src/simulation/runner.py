@@ -0,0 +1,126 @@
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+from pydantic import BaseModel
+
+from src.core.consts import USER
+from src.core.game import Game
+from src.core.steps import CardExchangeStep, FinishedStep
+from src.core.types import CardExchangePayload, FinishedPayload, Payload, RoundPayload
+from src.simulation.policies import POLICY_MAPPING, BotPolicy
+
+
+class GameResult(BaseModel):
+    scores: dict[USER, int]
+    moves: int
+    rounds: int
+    duration: float
+
+
+class SimulationReport(BaseModel):
+    games: int
+    moves: int
+    duration: float
+    games_per_second: float
+    moves_per_second: float
+    policies: list[str]
+    wins: dict[str, int]
+    score_distribution: dict[str, float]
+
+
+def get_next_payload(game: Game, policies: dict[USER, BotPolicy]) -> Payload:
+    step = game.current_step
+    if isinstance(step, CardExchangeStep):
+        user = next(user for user in game.state.users if user not in step.local_state.cards_to_exchange)
+        cards = policies[user].pick_cards_to_exchange(deck=step.legal_moves(user=user))
+        return CardExchangePayload(user=user, cards=[str(card) for card in cards])
+
+    if isinstance(step, FinishedStep):
+        user = next(user for user in game.state.users if user not in step.local_state.users_ready)
+        return FinishedPayload(user=user)
+
+    user = game.state.current_user
+    card = policies[user].pick_card(
+        legal_cards=step.legal_moves(user=user), cards_on_table=step.local_state.cards_on_table
+    )
+    return RoundPayload(user=user, card=str(card))
+
+
+def play_game(policies: list[BotPolicy], max_score: int = 100) -> GameResult:
+    users = [f"bot_{index}" for index in range(1, len(policies) + 1)]
+    policies_by_user = dict(zip(users, policies))
+
+    start = time.perf_counter()
+    game = Game.start_game(users=users, max_score=max_score)
+    moves = rounds = 0
+    while not game.is_finished:
+        step = game.current_step
+        game.dispatch(payload=get_next_payload(game=game, policies=policies_by_user))
+        moves += 1
+        if game.current_step is not step and isinstance(game.current_step, FinishedStep):
+            rounds += 1
+
+    return GameResult(scores=game.state.scores, moves=moves, rounds=rounds, duration=time.perf_counter() - start)
+
+
+def _play_seeded_game(seed: int, policy_names: list[str], max_score: int) -> GameResult:
+    # decks are shuffled with the global generator, seeding it keeps the whole game reproducible
+    random.seed(seed)
+    policies = [POLICY_MAPPING[name](seed=seed + index) for index, name in enumerate(policy_names)]
+    return play_game(policies=policies, max_score=max_score)
+
+
+def get_report(results: list[GameResult], policy_names: list[str], duration: float) -> SimulationReport:
+    moves = sum(result.moves for result in results)
+    scores = [score for result in results for score in result.scores.values()]
+
+    wins = {f"bot_{index}:{name}": 0 for index, name in enumerate(policy_names, start=1)}
+    for result in results:
+        winner = min(result.scores, key=result.scores.__getitem__)
+        wins[f"{winner}:{policy_names[int(winner.split('_')[-1]) - 1]}"] += 1
+
+    return SimulationReport(
+        games=len(results),
+        moves=moves,
+        duration=duration,
+        games_per_second=len(results) / duration,
+        moves_per_second=moves / duration,
+        policies=policy_names,
+        wins=wins,
+        score_distribution={
+            "min": min(scores),
+            "max": max(scores),
+            "mean": statistics.mean(scores),
+            "median": statistics.median(scores),
+            "stdev": statistics.pstdev(scores),
+            "rounds_mean": statistics.mean(result.rounds for result in results),
+        },
+    )
+
+
+def run_simulation(
+    games: int,
+    policy_names: list[str],
+    workers: Optional[int] = None,
+    max_score: int = 100,
+    seed: int = 0,
+) -> SimulationReport:
+    """
+    Plays given number of full games between bots, spread across a process pool.
+    With workers=1 games are played in the current process.
+    """
+    play = partial(_play_seeded_game, policy_names=policy_names, max_score=max_score)
+    seeds = range(seed, seed + games)
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play(game_seed) for game_seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(play, seeds, chunksize=max(1, games // 64)))
+
+    return get_report(results=results, policy_names=policy_names, duration=time.perf_counter() - start)
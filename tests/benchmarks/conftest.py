@@ -0,0 +1,52 @@
+import os
+from typing import Iterator, Type
+
+import pytest
+
+
+os.environ.setdefault("AWS_ACCESS_KEY", "benchmark")
+os.environ.setdefault("AWS_SECRET_KEY", "benchmark")
+os.environ.setdefault("DYNAMODB_GAMES_TABLE_NAME", "benchmark")
+os.environ.setdefault("DYNAMODB_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from src import bootstrap  # NOQA: E402
+from src.core.abstract import GameStep  # NOQA: E402
+from src.core.game import Game  # NOQA: E402
+from src.data_access.memory import InMemoryTable, get_in_memory_table  # NOQA: E402
+from src.settings import settings  # NOQA: E402
+from tests import helpers  # NOQA: E402
+from tests.helpers import FakeAPIGatewayClient  # NOQA: E402
+
+
+USERS = ["user_1", "user_2", "user_3", "user_4"]
+
+
+def get_game_at_step(step_class: Type[GameStep], seed: int = 0) -> Game:
+    return helpers.get_game_at_step(step_class=step_class, users=USERS, seed=seed)
+
+
+class FakeLambdaContext:
+    function_name = "benchmark"
+    memory_limit_in_mb = 128
+    invoked_function_arn = "arn:aws:lambda:eu-central-1:000000000000:function:benchmark"
+    aws_request_id = "benchmark"
+
+
+@pytest.fixture
+def in_memory_table(monkeypatch: pytest.MonkeyPatch) -> Iterator[InMemoryTable]:
+    monkeypatch.setattr(settings, "dynamodb_backend", "memory")
+    bootstrap.reset()
+    table = get_in_memory_table(table_name=settings.dynamodb_games_table_name)
+    yield table
+    table.delete()
+    bootstrap.reset()
+
+
+@pytest.fixture
+def fake_api_gateway_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeAPIGatewayClient]:
+    client = FakeAPIGatewayClient()
+    monkeypatch.setattr(bootstrap, "get_api_gateway_client", lambda endpoint_url: client)
+    bootstrap.reset()
+    yield client
+    bootstrap.reset()
@@ -0,0 +1,36 @@
+from uuid import uuid4
+
+import pytest
+
+from src.schemas.lobby import LobbyModel
+from src.schemas.user import UserModel
+from src.services.broadcast import Broadcaster
+from src.services.websocket import WebsocketHandler
+
+
+class NoopAPIGatewayClient:
+    def post_to_connection(self, Data: bytes, ConnectionId: str) -> None:
+        pass
+
+
+@pytest.mark.parametrize("users_count", [10, 1000])
+def test_send_lobby_updated_to_users(benchmark, users_count: int) -> None:
+    client = NoopAPIGatewayClient()
+    # data accesses and service are not touched by broadcasts
+    handler = WebsocketHandler(
+        user_data_access=None,
+        lobby_data_access=None,
+        game_data_access=None,
+        connection_data_access=None,
+        game_service=None,
+        api_gateway_client=client,
+        broadcaster=Broadcaster(api_gateway_client=client, max_concurrency=1),
+    )
+    users = [
+        UserModel(email=f"user_{index}", connection_ids=[str(uuid4()), str(uuid4())]) for index in range(users_count)
+    ]
+    lobby = LobbyModel(lobby_id=str(uuid4()), users=["user_0", "user_1"], max_players=4)
+
+    result = benchmark(handler.send_lobby_updated_to_users, users=users, lobby=lobby)
+
+    assert len(result.sent) == 2 * users_count
@@ -0,0 +1,74 @@
+import random
+from typing import Any, Type
+
+import pytest
+
+from src.core.abstract import GameStep
+from src.core.game import Game
+from src.core.steps import CardExchangeStep, FinishedStep, FirstRoundStep, InProgressStep
+from src.core.types import Payload
+from src.core.utils import get_initial_decks
+from src.simulation.policies import GreedyLowCardPolicy, RandomLegalPolicy
+from src.simulation.runner import get_next_payload, play_game
+from tests.benchmarks.conftest import USERS, get_game_at_step
+
+
+ROUNDS = 200
+
+
+def _get_step_and_payload_factory(step_class: Type[GameStep]) -> Any:
+    game = get_game_at_step(step_class=step_class)
+    policies = {user: RandomLegalPolicy(seed=index) for index, user in enumerate(USERS)}
+
+    def setup() -> tuple[tuple[GameStep, Payload], dict[str, Any]]:
+        game_copy = game.copy(deep=True)
+        payload = get_next_payload(game=game_copy, policies=policies)
+        return (game_copy.current_step, payload), {}
+
+    return setup
+
+
+def test_get_initial_decks(benchmark) -> None:
+    decks = benchmark(get_initial_decks, users=USERS)
+
+    assert sum(len(deck) for deck in decks.values()) == 52
+
+
+@pytest.mark.parametrize("step_class", [CardExchangeStep, FirstRoundStep, InProgressStep, FinishedStep])
+def test_step_validate_payload(benchmark, step_class: Type[GameStep]) -> None:
+    benchmark.pedantic(
+        lambda step, payload: step.validate_payload(payload=payload),
+        setup=_get_step_and_payload_factory(step_class=step_class),
+        rounds=ROUNDS,
+    )
+
+
+@pytest.mark.parametrize("step_class", [CardExchangeStep, FirstRoundStep, InProgressStep, FinishedStep])
+def test_step_dispatch_payload(benchmark, step_class: Type[GameStep]) -> None:
+    benchmark.pedantic(
+        lambda step, payload: step.dispatch_payload(payload=payload),
+        setup=_get_step_and_payload_factory(step_class=step_class),
+        rounds=ROUNDS,
+    )
+
+
+def test_full_game(benchmark) -> None:
+    def setup() -> tuple[tuple, dict[str, Any]]:
+        random.seed(0)
+        policies = [RandomLegalPolicy(seed=0), RandomLegalPolicy(seed=1), GreedyLowCardPolicy(seed=2)]
+        return (), {"policies": policies}
+
+    result = benchmark.pedantic(play_game, setup=setup, rounds=20)
+
+    assert max(result.scores.values()) >= 100
+
+
+def test_game_dispatch(benchmark) -> None:
+    game = get_game_at_step(step_class=InProgressStep)
+    policies = {user: RandomLegalPolicy(seed=index) for index, user in enumerate(USERS)}
+
+    def setup() -> tuple[tuple[Game, Payload], dict[str, Any]]:
+        game_copy = game.copy(deep=True)
+        return (game_copy, get_next_payload(game=game_copy, policies=policies)), {}
+
+    benchmark.pedantic(lambda game_, payload: game_.dispatch(payload=payload), setup=setup, rounds=ROUNDS)
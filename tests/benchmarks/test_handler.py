@@ -0,0 +1,102 @@
+import json
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from main import main_handler
+from src import bootstrap
+from src.core.steps import InProgressStep
+from src.data_access.game import GameDataAccess
+from src.data_access.memory import InMemoryTable
+from src.data_access.user import UserDataAccess
+from src.enums.websocket import Action
+from src.schemas.game import GameModel
+from src.schemas.user import UserModel
+from src.settings import settings
+from src.simulation.policies import RandomLegalPolicy
+from src.simulation.runner import get_next_payload
+from tests.benchmarks.conftest import USERS, FakeAPIGatewayClient, FakeLambdaContext, get_game_at_step
+
+
+ROUNDS = 100
+DOMAIN_NAME = "example.execute-api.eu-central-1.amazonaws.com"
+STAGE = "benchmark"
+ENDPOINT_URL = f"https://{DOMAIN_NAME}/{STAGE}"
+
+
+def _get_event(user_id: str, action: Action, payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "requestContext": {
+            "authorizer": {"principalId": user_id},
+            "domainName": DOMAIN_NAME,
+            "stage": STAGE,
+            "connectionId": f"connection_{user_id}",
+            "routeKey": "$default",
+        },
+        "body": json.dumps({"action": action.value, "payload": payload}),
+    }
+
+
+@pytest.fixture
+def game_model(in_memory_table: InMemoryTable) -> GameModel:
+    table_name = settings.dynamodb_games_table_name
+    game = GameModel(game_id=str(uuid4()), game=get_game_at_step(step_class=InProgressStep))
+
+    UserDataAccess(table_name=table_name).bulk_save(
+        models=[
+            UserModel(email=user, games_ids=[game.game_id], connection_ids=[f"connection_{user}"]) for user in USERS
+        ]
+    )
+    game_data_access = GameDataAccess(table_name=table_name)
+    game_data_access.save(model=game)
+    for _ in range(20):
+        game_data_access.save(model=GameModel(game_id=str(uuid4()), game=get_game_at_step(step_class=InProgressStep)))
+
+    return game
+
+
+def test_main_handler_list_games(
+    benchmark, game_model: GameModel, fake_api_gateway_client: FakeAPIGatewayClient
+) -> None:
+    event = _get_event(user_id="user_1", action=Action.LIST_GAMES, payload={})
+
+    response = benchmark(main_handler, event, FakeLambdaContext())
+
+    assert response == {"statusCode": 200}
+    assert len(fake_api_gateway_client.messages_sent["connection_user_1"][-1]["games"]) == 21
+
+
+def test_main_handler_get_game_detail(
+    benchmark, game_model: GameModel, fake_api_gateway_client: FakeAPIGatewayClient
+) -> None:
+    event = _get_event(user_id="user_1", action=Action.GET_GAME_DETAIL, payload={"gameId": game_model.game_id})
+
+    response = benchmark(main_handler, event, FakeLambdaContext())
+
+    assert response == {"statusCode": 200}
+    assert fake_api_gateway_client.messages_sent["connection_user_1"][-1]["game"]["gameId"] == game_model.game_id
+
+
+def test_main_handler_make_move(
+    benchmark, game_model: GameModel, fake_api_gateway_client: FakeAPIGatewayClient
+) -> None:
+    # saved through handler's own data access, which drops the game it cached after the previous round
+    game_data_access = bootstrap.get_websocket_handler(endpoint_url=ENDPOINT_URL).game_data_access
+    policies = {user: RandomLegalPolicy(seed=index) for index, user in enumerate(USERS)}
+    game_payload = get_next_payload(game=game_model.game, policies=policies)
+    event = _get_event(
+        user_id=game_payload.user,
+        action=Action.MAKE_MOVE,
+        payload={"gameId": game_model.game_id, "gamePayload": game_payload.dict(exclude={"user"})},
+    )
+
+    # every round has to start from the same position, otherwise the move would be invalid
+    def setup() -> tuple[tuple[dict[str, Any], FakeLambdaContext], dict[str, Any]]:
+        game_data_access.save(model=game_model)
+        return (event, FakeLambdaContext()), {}
+
+    response = benchmark.pedantic(main_handler, setup=setup, rounds=ROUNDS)
+
+    assert response == {"statusCode": 200}
+    assert "game" in fake_api_gateway_client.messages_sent[f"connection_{game_payload.user}"][-1]
@@ -0,0 +1,54 @@
+import copy
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.core.steps import CardExchangeStep, InProgressStep
+from src.schemas.game import GameModel
+from src.schemas.websocket import GameDetailSchema
+from tests.benchmarks.conftest import get_game_at_step
+
+
+@pytest.fixture
+def game_model() -> GameModel:
+    return GameModel(game_id=str(uuid4()), game=get_game_at_step(step_class=InProgressStep))
+
+
+@pytest.mark.parametrize("codec", ["map", "binary"])
+def test_game_model_to_item(benchmark, game_model: GameModel, codec: str) -> None:
+    item = benchmark(game_model.to_item, codec=codec)
+
+    assert item["SK"] == game_model.sk
+
+
+@pytest.mark.parametrize("codec", ["map", "binary"])
+def test_game_model_from_item(benchmark, game_model: GameModel, codec: str) -> None:
+    item = game_model.to_item(codec=codec)
+
+    # from_item pops keys out of the item, so every round gets its own copy
+    def setup() -> tuple[tuple, dict[str, Any]]:
+        return (), {"item": copy.deepcopy(item)}
+
+    loaded = benchmark.pedantic(GameModel.from_item, setup=setup, rounds=200)
+
+    # binary codec stores decks as masks, so they are loaded sorted
+    assert loaded.game.state.copy(update={"decks": {}}) == game_model.game.state.copy(update={"decks": {}})
+    assert {user: deck.mask for user, deck in loaded.game.state.decks.items()} == {
+        user: deck.mask for user, deck in game_model.game.state.decks.items()
+    }
+
+
+def test_game_model_round_trip(benchmark, game_model: GameModel) -> None:
+    loaded = benchmark(lambda: GameModel.from_item(item=game_model.to_item()))
+
+    assert loaded.game_step == game_model.game_step
+
+
+@pytest.mark.parametrize("step_class", [CardExchangeStep, InProgressStep])
+def test_game_detail_schema_from_game(benchmark, step_class) -> None:
+    game = GameModel(game_id=str(uuid4()), game=get_game_at_step(step_class=step_class))
+
+    detail = benchmark(GameDetailSchema.from_game, game=game, user_id="user_1")
+
+    assert detail.game_id == game.game_id
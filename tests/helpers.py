@@ -0,0 +1,42 @@
+import json
+import random
+from collections import defaultdict
+from typing import Type
+
+from botocore.exceptions import ClientError
+
+from src.core.abstract import GameStep
+from src.core.game import Game
+from src.simulation.policies import RandomLegalPolicy
+from src.simulation.runner import get_next_payload
+from src.utils import DateTimeJSONDecoder
+
+
+def get_game_at_step(
+    step_class: Type[GameStep], users: list[str], seed: int = 0, with_local_state: bool = False
+) -> Game:
+    """
+    Plays a seeded game between random bots until given step becomes current one. With with_local_state, game is
+    played until a move is made in the step too, so its local state is not empty.
+    """
+    random.seed(seed)
+    policies = {user: RandomLegalPolicy(seed=seed + index) for index, user in enumerate(users)}
+    game = Game.start_game(users=users)
+    while not isinstance(game.current_step, step_class) or (
+        with_local_state and not any(game.current_step.local_state.dict().values())
+    ):
+        game.dispatch(payload=get_next_payload(game=game, policies=policies))
+
+    return game
+
+
+class FakeAPIGatewayClient:
+    """Collects decoded messages by connection, connection ids starting with "gone" are reported as closed."""
+
+    def __init__(self) -> None:
+        self.messages_sent = defaultdict(list)
+
+    def post_to_connection(self, Data: bytes, ConnectionId: str) -> None:
+        if ConnectionId.startswith("gone"):
+            raise ClientError({"Error": {"Code": "GoneException"}}, "PostToConnection")
+        self.messages_sent[ConnectionId].append(json.loads(Data.decode("utf-8"), cls=DateTimeJSONDecoder))
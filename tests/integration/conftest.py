@@ -4,11 +4,19 @@ import boto3
 import pytest
 from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
 
+from src.data_access.memory import get_in_memory_table
 from src.settings import settings
 
 
 @pytest.fixture(scope="session")
 def dynamodb_test_table() -> Table:
+    """With DYNAMODB_BACKEND=memory tests run against in-process table, without AWS account."""
+    if settings.dynamodb_backend == "memory":
+        test_table = get_in_memory_table(table_name=settings.dynamodb_games_table_name)
+        yield test_table
+        test_table.delete()
+        return
+
     dynamodb: DynamoDBServiceResource = boto3.resource(
         "dynamodb",
         region_name=settings.region,
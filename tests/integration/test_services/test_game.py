@@ -4,15 +4,23 @@ import pytest
 from mypy_boto3_dynamodb.service_resource import Table
 from pydantic import ValidationError
 
-from src.core.game import Game
-from src.data_access.exceptions import DataAccessException, DoesNotExist
+from src.core import cards
+from src.core.enums import CardSuit
+from src.core.game import Game, GameSettings
+from src.core.state import GameState
+from src.core.steps import InProgressStep
+from src.core.types import RoundState
+from src.data_access.exceptions import DataAccessException, DoesNotExist, VersionConflict
 from src.data_access.game import GameDataAccess
 from src.data_access.lobby import LobbyDataAccess
 from src.data_access.user import UserDataAccess
 from src.schemas.game import GameModel
 from src.schemas.user import UserModel
-from src.services.exceptions import GameServiceException
+from src.services.exceptions import GameServiceException, InvalidMove
 from src.services.game import GameService
+from src.settings import settings
+from src.simulation.policies import RandomLegalPolicy
+from src.simulation.runner import get_next_payload
 
 
 @pytest.fixture
@@ -28,7 +36,7 @@ def game_service(dynamodb_testcase_table: Table) -> GameService:
 def test_game_service_create_lobby_and_add_player(game_service: GameService) -> None:
     user = UserModel(email="test@test.com")
     other_user = UserModel(email="other@test.com")
-    game_service.user_data_access.save(model=user)
+    game_service.user_data_access.bulk_save(models=[user, other_user])
 
     lobby = game_service.create_lobby(user=user)
     game_service.add_user_to_lobby(lobby_id=lobby.lobby_id, user=other_user)
@@ -64,6 +72,45 @@ def test_game_service_create_lobby_game_started_with_all_players(game_service: G
         assert len(user.games_ids) == 1
 
 
+def test_game_service_concurrent_joins_do_not_lose_lobby_members(
+    game_service: GameService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    users = [UserModel(email=f"test{str(num)}") for num in range(1, 4)]
+    game_service.user_data_access.bulk_save(models=users)
+    lobby = game_service.create_lobby(user=users[0], max_players=4)
+    # both joins read the lobby before any of them writes it
+    stale_lobby = game_service.lobby_data_access.get(**lobby.key)
+    game_service.add_user_to_lobby(lobby_id=lobby.lobby_id, user=users[1])
+    monkeypatch.setattr(game_service.lobby_data_access, "get", lambda pk, sk: stale_lobby)
+
+    with pytest.raises(GameServiceException, match=f"Lobby {lobby.lobby_id} has changed"):
+        game_service.add_user_to_lobby(lobby_id=lobby.lobby_id, user=users[2])
+
+    monkeypatch.undo()
+    assert game_service.lobby_data_access.get(**lobby.key).users == [users[0].email, users[1].email]
+    assert game_service.user_data_access.get(**users[2].key).lobbies_ids == []
+
+
+def test_game_service_start_game_keeps_concurrent_user_changes(game_service: GameService) -> None:
+    users = [UserModel(email=f"test{str(num)}") for num in range(1, 4)]
+    game_service.user_data_access.bulk_save(models=users)
+    lobby = game_service.create_lobby(user=users[0])
+    game_service.add_user_to_lobby(lobby_id=lobby.lobby_id, user=users[1])
+    # connections are added to the items after the joining user was read
+    for user in users:
+        connected_user = game_service.user_data_access.get(**user.key)
+        original_item = connected_user.to_item()
+        connected_user.connection_ids.append(f"connection-{user.email}")
+        game_service.user_data_access.update(model=connected_user, original_item=original_item)
+
+    game = game_service.add_user_to_lobby(lobby_id=lobby.lobby_id, user=users[2])
+
+    for user in users:
+        stored_user = game_service.user_data_access.get(**user.key)
+        assert stored_user.connection_ids == [f"connection-{user.email}"]
+        assert stored_user.games_ids == [game.game_id] and stored_user.lobbies_ids == []
+
+
 def test_game_service_remove_user_from_lobby(game_service: GameService) -> None:
     user = UserModel(email="someuserr@test.com")
     game_service.user_data_access.save(model=user)
@@ -118,3 +165,265 @@ def test_game_service_dispatch_game_action_raises_validation_error_with_invalid_
     game_service.game_data_access.save(model=game)
     with pytest.raises(ValidationError):
         game_service.dispatch_game_action(game_id=game.game_id, user=user, payload={})
+
+
+def test_game_service_dispatch_game_action_with_event_log(dynamodb_testcase_table: Table) -> None:
+    table_name = dynamodb_testcase_table.table_name
+    game_service = GameService(
+        game_data_access=GameDataAccess(table_name=table_name, event_log=True, snapshot_interval=3),
+        lobby_data_access=LobbyDataAccess(table_name=table_name),
+        user_data_access=UserDataAccess(table_name=table_name),
+    )
+    users = ["user1@test.com", "user2@test.com", "user3@test.com"]
+    policies = {user: RandomLegalPolicy(seed=index) for index, user in enumerate(users)}
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=users))
+    game_service.game_data_access.save(model=game_model)
+
+    for _ in range(10):
+        payload = get_next_payload(game=game_model.game, policies=policies)
+        game_model = game_service.dispatch_game_action(
+            user=UserModel(email=payload.user), game_id=game_model.game_id, payload=payload.dict(exclude={"user"})
+        )
+
+    snapshot = game_service.game_data_access.get(**game_model.key)
+    events = list(game_service.game_data_access.iter_items(pk=f"game#{game_model.game_id}"))
+    loaded = game_service.game_data_access.get_game(game_id=game_model.game_id)
+
+    assert len(events) == 10
+    assert snapshot.version < game_model.version == 10
+    assert loaded.version == game_model.version
+    assert loaded.game_step == game_model.game_step
+    assert loaded.game.state == game_model.game.state
+    assert loaded.game.current_step.local_state == game_model.game.current_step.local_state
+
+
+def test_game_service_dispatch_game_action_with_event_log_raises_conflict_on_stale_version(
+    dynamodb_testcase_table: Table,
+) -> None:
+    game_data_access = GameDataAccess(table_name=dynamodb_testcase_table.table_name, event_log=True)
+    users = ["user1@test.com", "user2@test.com", "user3@test.com"]
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=users))
+    game_data_access.save(model=game_model)
+    payload = get_next_payload(game=game_model.game, policies={user: RandomLegalPolicy(seed=0) for user in users})
+    game_model.game.dispatch(payload=payload)
+    game_data_access.save_moves(model=game_model, payloads=[payload], original_item=None, step_changed=False)
+
+    game_model.version = 0
+    with pytest.raises(VersionConflict):
+        game_data_access.save_moves(model=game_model, payloads=[payload], original_item=None, step_changed=False)
+
+    assert game_model.version == 0
+
+
+def test_game_service_dispatch_game_action_after_switching_from_event_log(dynamodb_testcase_table: Table) -> None:
+    table_name = dynamodb_testcase_table.table_name
+    services = [
+        GameService(
+            game_data_access=GameDataAccess(table_name=table_name, event_log=event_log, snapshot_interval=100),
+            lobby_data_access=LobbyDataAccess(table_name=table_name),
+            user_data_access=UserDataAccess(table_name=table_name),
+        )
+        for event_log in (True, False)
+    ]
+    users = ["user1@test.com", "user2@test.com", "user3@test.com"]
+    policies = {user: RandomLegalPolicy(seed=index) for index, user in enumerate(users)}
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=users))
+    services[0].game_data_access.save(model=game_model)
+
+    for game_service in (services[0], services[1], services[1]):
+        payload = get_next_payload(game=game_model.game, policies=policies)
+        game_model = game_service.dispatch_game_action(
+            user=UserModel(email=payload.user), game_id=game_model.game_id, payload=payload.dict(exclude={"user"})
+        )
+
+    stored = services[1].game_data_access.get(**game_model.key)
+    loaded = services[1].game_data_access.get_game(game_id=game_model.game_id, use_cache=False)
+
+    assert stored.version == loaded.version == game_model.version == 3
+    assert loaded.game.state == game_model.game.state
+    assert loaded.game.current_step.local_state == game_model.game.current_step.local_state
+
+
+def test_game_service_dispatch_game_action_migrates_game_to_binary_codec(
+    game_service: GameService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    users = ["user1@test.com", "user2@test.com", "user3@test.com"]
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=users))
+    game_service.game_data_access.save(model=game_model)
+    monkeypatch.setattr(settings, "game_codec", "binary")
+
+    user_cards = game_model.game.state.decks[users[0]][:3]
+    game_service.dispatch_game_action(
+        user=UserModel(email=users[0]),
+        game_id=game_model.game_id,
+        payload={"cards": [str(card) for card in user_cards]},
+    )
+
+    item = game_service.game_data_access._table.get_item(Key={"PK": "game", "SK": game_model.sk})["Item"]
+    loaded = GameModel.from_item(item=item)
+    previews = list(game_service.game_data_access.iter_previews())
+
+    assert "game" not in item and "game_data" in item
+    assert loaded.version == 1
+    assert loaded.game.current_step.local_state.cards_to_exchange == {
+        users[0]: sorted(user_cards, key=lambda card: card.ordinal)
+    }
+    assert [preview.users for preview in previews] == [users]
+
+
+def test_game_service_dispatch_game_action_uses_cached_game_until_changed_elsewhere(
+    game_service: GameService, dynamodb_testcase_table: Table, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    users = ["user1@test.com", "user2@test.com", "user3@test.com"]
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=users))
+    game_data_access = game_service.game_data_access
+    game_data_access.save(model=game_model)
+    # data access of another Lambda container
+    other_game_data_access = GameDataAccess(table_name=dynamodb_testcase_table.table_name)
+
+    def dispatch_exchange(user_id: str) -> GameModel:
+        cards_ = [str(card) for card in game_model.game.state.decks[user_id][:3]]
+        return game_service.dispatch_game_action(
+            user=UserModel(email=user_id), game_id=game_model.game_id, payload={"cards": cards_}
+        )
+
+    dispatch_exchange(users[0])
+    reads = []
+    get = game_data_access.get
+    monkeypatch.setattr(game_data_access, "get", lambda pk, sk: reads.append(sk) or get(pk=pk, sk=sk))
+    game_service.get_game_with_user(game_id=game_model.game_id, user_id=users[1])
+    dispatch_exchange(users[1])
+
+    assert reads == []
+
+    other_game = other_game_data_access.get_game(game_id=game_model.game_id, for_update=True)
+    other_game.version += 1
+    other_game_data_access.save(model=other_game)
+    game = dispatch_exchange(users[2])
+
+    assert reads == [game_model.sk]
+    assert game.version == 4
+
+
+def _get_game_with_trick_to_win() -> GameModel:
+    """user1 wins the trick with club ace and leads the next one too."""
+    users = ["user1@test.com", "user2@test.com", "user3@test.com"]
+    state = GameState(
+        users=users,
+        decks={
+            users[0]: [cards.CLUB_ACE, cards.SPADE_2, cards.SPADE_3],
+            users[1]: [cards.SPADE_4, cards.DIAMOND_2],
+            users[2]: [cards.SPADE_5, cards.DIAMOND_3],
+        },
+        current_user=users[0],
+        scores={user: 0 for user in users},
+    )
+    step = InProgressStep(
+        game_state=state,
+        local_state=RoundState(
+            cards_on_table={users[1]: cards.CLUB_2, users[2]: cards.CLUB_3}, table_suit=CardSuit.CLUB
+        ),
+    )
+    return GameModel(game_id=str(uuid4()), game=Game(settings=GameSettings(), state=state, current_step=step))
+
+
+@pytest.mark.parametrize("event_log", [False, True])
+def test_game_service_dispatch_game_actions(dynamodb_testcase_table: Table, event_log: bool) -> None:
+    table_name = dynamodb_testcase_table.table_name
+    game_service = GameService(
+        game_data_access=GameDataAccess(table_name=table_name, event_log=event_log, cache_size=0),
+        lobby_data_access=LobbyDataAccess(table_name=table_name),
+        user_data_access=UserDataAccess(table_name=table_name),
+    )
+    game_model = _get_game_with_trick_to_win()
+    game_service.game_data_access.save(model=game_model)
+
+    game = game_service.dispatch_game_actions(
+        user=UserModel(email="user1@test.com"),
+        game_id=game_model.game_id,
+        payloads=[{"card": str(cards.CLUB_ACE)}, {"card": str(cards.SPADE_2)}],
+    )
+    loaded = game_service.game_data_access.get_game(game_id=game_model.game_id)
+
+    assert game.game.state.current_user == "user2@test.com"
+    assert loaded.game.current_step.local_state.cards_on_table == {"user1@test.com": cards.SPADE_2}
+    assert loaded.game.state.decks["user1@test.com"] == [cards.SPADE_3]
+    assert loaded.version == game.version == (2 if event_log else 1)
+
+
+@pytest.mark.parametrize("event_log", [False, True])
+def test_game_service_dispatch_game_action_on_game_moved_by_other_container(
+    dynamodb_testcase_table: Table, event_log: bool
+) -> None:
+    table_name = dynamodb_testcase_table.table_name
+    # services of two Lambda containers, each with its own game cache
+    game_service, other_game_service = (
+        GameService(
+            game_data_access=GameDataAccess(table_name=table_name, event_log=event_log),
+            lobby_data_access=LobbyDataAccess(table_name=table_name),
+            user_data_access=UserDataAccess(table_name=table_name),
+        )
+        for _ in range(2)
+    )
+    game_model = _get_game_with_trick_to_win()
+    game_service.game_data_access.save(model=game_model)
+    user_1, user_2 = UserModel(email="user1@test.com"), UserModel(email="user2@test.com")
+
+    game_service.dispatch_game_action(user=user_1, game_id=game_model.game_id, payload={"card": str(cards.CLUB_ACE)})
+    other_game_service.dispatch_game_action(
+        user=user_1, game_id=game_model.game_id, payload={"card": str(cards.SPADE_2)}
+    )
+    # cached game of the first container still waits for user1
+    game = game_service.dispatch_game_action(
+        user=user_2, game_id=game_model.game_id, payload={"card": str(cards.SPADE_4)}
+    )
+    assert game.game.current_step.local_state.cards_on_table == {
+        "user1@test.com": cards.SPADE_2,
+        "user2@test.com": cards.SPADE_4,
+    }
+
+    game = other_game_service.dispatch_game_actions(
+        user=UserModel(email="user3@test.com"), game_id=game_model.game_id, payloads=[{"card": str(cards.SPADE_5)}]
+    )
+    assert game.game.state.current_user == "user3@test.com"
+    with pytest.raises(InvalidMove):
+        other_game_service.dispatch_game_actions(
+            user=user_2, game_id=game_model.game_id, payloads=[{"card": str(cards.DIAMOND_2)}]
+        )
+
+
+def test_game_service_dispatch_game_actions_stops_at_invalid_move(game_service: GameService) -> None:
+    game_model = _get_game_with_trick_to_win()
+    game_service.game_data_access.save(model=game_model)
+    user = UserModel(email="user1@test.com")
+    payloads = [{"card": str(cards.CLUB_ACE)}, {"card": str(cards.SPADE_2)}, {"card": str(cards.SPADE_3)}]
+
+    with pytest.raises(InvalidMove) as exc_info:
+        game_service.dispatch_game_actions(user=user, game_id=game_model.game_id, payloads=payloads)
+    with pytest.raises(InvalidMove) as first_move_exc_info:
+        game_service.dispatch_game_actions(user=user, game_id=game_model.game_id, payloads=[{"card": "invalid"}])
+
+    loaded = game_service.game_data_access.get(**game_model.key)
+
+    assert exc_info.value.index == 2
+    assert exc_info.value.game.game.state.decks["user1@test.com"] == [cards.SPADE_3]
+    assert first_move_exc_info.value.index == 0 and first_move_exc_info.value.game is None
+    assert loaded.version == 1
+    assert loaded.game.state.current_user == "user2@test.com"
+
+
+@pytest.mark.parametrize("payload", [{"card": str(cards.SPADE_2), "user": "user2@test.com"}, "card"])
+def test_game_service_dispatch_game_actions_rejects_malformed_move(game_service: GameService, payload: object) -> None:
+    game_model = _get_game_with_trick_to_win()
+    game_service.game_data_access.save(model=game_model)
+    user = UserModel(email="user1@test.com")
+
+    with pytest.raises(InvalidMove) as exc_info:
+        game_service.dispatch_game_actions(
+            user=user, game_id=game_model.game_id, payloads=[{"card": str(cards.CLUB_ACE)}, payload]
+        )
+    with pytest.raises(GameServiceException):
+        game_service.dispatch_game_action(user=user, game_id=game_model.game_id, payload=payload)
+
+    assert exc_info.value.index == 1
+    assert exc_info.value.game.game.state.decks["user1@test.com"] == [cards.SPADE_2, cards.SPADE_3]
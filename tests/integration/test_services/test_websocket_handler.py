@@ -1,5 +1,3 @@
-import json
-from collections import defaultdict
 from uuid import uuid4
 
 import pytest
@@ -12,25 +10,27 @@ from src.core.game import Game, GameSettings
 from src.core.state import GameState
 from src.core.steps import CardExchangeStep, FinishedStep, FirstRoundStep, InProgressStep
 from src.core.types import RoundState
+from src.data_access.connection import ConnectionDataAccess
 from src.data_access.game import GameDataAccess
 from src.data_access.lobby import LobbyDataAccess
 from src.data_access.user import UserDataAccess
+from src.migrations.register_connections import register_connections
+from src.schemas.connection import get_connection_pk
 from src.schemas.game import GameModel
 from src.schemas.lobby import LobbyModel
 from src.schemas.user import UserModel
-from src.schemas.websocket import CreateLobbyPayload, JoinLobbyPayload, LeaveLobbyPayload, MakeMovePayload
+from src.schemas.websocket import (
+    CreateLobbyPayload,
+    JoinLobbyPayload,
+    LeaveLobbyPayload,
+    ListGamesPayload,
+    ListLobbiesPayload,
+    MakeMovePayload,
+)
 from src.services.exceptions import GameServiceException
 from src.services.game import GameService
 from src.services.websocket import WebsocketHandler
-from src.utils import DateTimeJSONDecoder
-
-
-class FakeAPIGatewayClient:
-    def __init__(self) -> None:
-        self.messages_sent = defaultdict(list)
-
-    def post_to_connection(self, Data: bytes, ConnectionId: str) -> None:
-        self.messages_sent[ConnectionId].append(json.loads(Data.decode("utf-8"), cls=DateTimeJSONDecoder))
+from tests.helpers import FakeAPIGatewayClient
 
 
 @pytest.fixture
@@ -44,6 +44,7 @@ def websocket_handler(dynamodb_testcase_table: Table) -> WebsocketHandler:
         user_data_access=user_data_access,
         lobby_data_access=lobby_data_access,
         game_data_access=game_data_access,
+        connection_data_access=ConnectionDataAccess(table_name=dynamodb_testcase_table.table_name),
         game_service=game_service,
         api_gateway_client=FakeAPIGatewayClient(),
     )
@@ -214,11 +215,124 @@ def test_websocket_handler_disconnect_user(websocket_handler: WebsocketHandler,
     assert len(user.connection_ids) == 0
 
 
+def test_websocket_handler_disconnect_after_broadcast_removed_connection(
+    websocket_handler: WebsocketHandler, user: UserModel
+) -> None:
+    websocket_handler.connect_user(user_id=user.email, connection_id="gone_1")
+    websocket_handler.connect_user(user_id=user.email, connection_id="alive_1")
+    websocket_handler.send_lobby_deleted_to_users(
+        users=[websocket_handler.user_data_access.get(**user.key)], lobby_id="lobby"
+    )
+
+    websocket_handler.disconnect_user(user_id=user.email, connection_id="gone_1")
+
+    assert websocket_handler.user_data_access.get(**user.key).connection_ids == ["alive_1"]
+    assert websocket_handler.connection_data_access.get_connection_ids() == ["alive_1"]
+
+
+def test_websocket_handler_connection_registry(
+    websocket_handler: WebsocketHandler, user: UserModel, user_2: UserModel
+) -> None:
+    websocket_handler.connect_user(user_id=user.email, connection_id="connection_1")
+    websocket_handler.connect_user(user_id=user.email, connection_id="connection_2")
+    websocket_handler.connect_user(user_id=user_2.email, connection_id="connection_3")
+    websocket_handler.disconnect_user(user_id=user.email, connection_id="connection_2")
+
+    assert websocket_handler.connection_data_access.get_connection_ids(page_size=1) == [
+        "connection_1",
+        "connection_3",
+    ]
+    connection = websocket_handler.connection_data_access.get(
+        pk=get_connection_pk(connection_id="connection_3"), sk="connection#connection_3"
+    )
+    assert connection.user_id == user_2.email
+
+
+def test_register_connections_of_existing_users(
+    websocket_handler: WebsocketHandler, user: UserModel, user_2: UserModel
+) -> None:
+    user.connection_ids = [f"connection_{index}" for index in range(30)]
+    user_2.connection_ids = ["connection_30"]
+    websocket_handler.user_data_access.bulk_save(models=[user, user_2])
+    connection_data_access = websocket_handler.connection_data_access
+
+    count = register_connections(
+        user_data_access=websocket_handler.user_data_access,
+        connection_data_access=connection_data_access,
+        page_size=1,
+    )
+
+    assert count == 31
+    assert sorted(connection_data_access.get_connection_ids(page_size=2)) == sorted(
+        f"connection_{index}" for index in range(31)
+    )
+    connection = connection_data_access.get(
+        pk=get_connection_pk(connection_id="connection_30"), sk="connection#connection_30"
+    )
+    assert connection.user_id == user_2.email
+
+
+def test_websocket_handler_send_to_online_users_prunes_gone_connections(
+    websocket_handler: WebsocketHandler, user: UserModel, user_2: UserModel
+) -> None:
+    websocket_handler.connect_user(user_id=user.email, connection_id="alive_1")
+    websocket_handler.connect_user(user_id=user_2.email, connection_id="gone_1")
+
+    result = websocket_handler.send_lobby_deleted_to_online_users(lobby_id="lobby")
+
+    assert result.sent == ["alive_1"]
+    assert websocket_handler.connection_data_access.get_connection_ids() == ["alive_1"]
+    assert websocket_handler.api_gateway_client.messages_sent["alive_1"] == [
+        {"type": "lobbyDeleted", "lobbyId": "lobby"}
+    ]
+
+    websocket_handler.disconnect_user(user_id=user_2.email, connection_id="gone_1")
+
+
 def test_websocket_handler_send_to_connection(websocket_handler: WebsocketHandler) -> None:
     websocket_handler.send_to_connection(body={"detail": "message"}, connection_id="example")
     assert websocket_handler.api_gateway_client.messages_sent["example"][0] == {"detail": "message"}
 
 
+def test_websocket_handler_broadcast_removes_gone_connections(
+    websocket_handler: WebsocketHandler, user: UserModel, user_2: UserModel
+) -> None:
+    user.connection_ids = ["gone_1", "alive_1"]
+    user_2.connection_ids = ["gone_2"]
+    websocket_handler.user_data_access.bulk_save(models=[user, user_2])
+    users = websocket_handler.user_data_access.get_many(pk="user")
+
+    result = websocket_handler.send_lobby_deleted_to_users(users=users, lobby_id="lobby")
+    users = {user.email: user for user in websocket_handler.user_data_access.get_many(pk="user")}
+
+    assert result.sent == ["alive_1"]
+    assert result.gone_connection_ids == {"gone_1", "gone_2"}
+    assert users[user.email].connection_ids == ["alive_1"]
+    assert users[user_2.email].connection_ids == []
+    assert websocket_handler.api_gateway_client.messages_sent["alive_1"] == [
+        {"type": "lobbyDeleted", "lobbyId": "lobby"}
+    ]
+
+
+def test_websocket_handler_broadcast_keeps_connections_changed_concurrently(
+    websocket_handler: WebsocketHandler, user: UserModel, user_2: UserModel
+) -> None:
+    websocket_handler.connect_user(user_id=user.email, connection_id="alive_1")
+    websocket_handler.connect_user(user_id=user.email, connection_id="gone_1")
+    websocket_handler.connect_user(user_id=user_2.email, connection_id="gone_2")
+    users = websocket_handler.user_data_access.get_many(pk="user")
+    # connections change after users were read, so positions of gone ones are different when they are removed
+    websocket_handler.disconnect_user(user_id=user.email, connection_id="alive_1")
+    websocket_handler.connect_user(user_id=user.email, connection_id="alive_2")
+
+    websocket_handler.send_lobby_deleted_to_users(users=users, lobby_id="lobby")
+    stored_users = {user.email: user for user in websocket_handler.user_data_access.get_many(pk="user")}
+
+    assert stored_users[user.email].connection_ids == ["alive_2"]
+    assert stored_users[user_2.email].connection_ids == []
+    assert websocket_handler.connection_data_access.get_connection_ids() == ["alive_2"]
+
+
 def test_websocket_handler_create_lobby(websocket_handler: WebsocketHandler, user: UserModel) -> None:
     lobby = websocket_handler.create_lobby(payload=CreateLobbyPayload(max_players=3), user_id=user.email)
     user = websocket_handler.user_data_access.get(**user.key)
@@ -262,6 +376,30 @@ def test_websocket_handler_join_lobby_and_lobby_gets_full(
         assert game.game_id in user.games_ids
 
 
+def test_websocket_handler_concurrent_joins_start_only_one_game(
+    websocket_handler: WebsocketHandler,
+    lobby_with_user: LobbyModel,
+    user_2: UserModel,
+    user_3: UserModel,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    websocket_handler.join_lobby(payload=JoinLobbyPayload(lobby_id=lobby_with_user.lobby_id), user_id=user_2.email)
+    user_4 = UserModel(email="test4@test.com")
+    websocket_handler.user_data_access.save(model=user_4)
+    # both joins read the lobby before any of them starts the game
+    stale_lobby = websocket_handler.lobby_data_access.get(**lobby_with_user.key)
+    game = websocket_handler.join_lobby(
+        payload=JoinLobbyPayload(lobby_id=lobby_with_user.lobby_id), user_id=user_3.email
+    )
+    monkeypatch.setattr(websocket_handler.lobby_data_access, "get", lambda pk, sk: stale_lobby)
+
+    with pytest.raises(GameServiceException, match=f"Lobby {lobby_with_user.lobby_id} has changed"):
+        websocket_handler.join_lobby(payload=JoinLobbyPayload(lobby_id=lobby_with_user.lobby_id), user_id=user_4.email)
+
+    assert [game_.game_id for game_ in websocket_handler.game_data_access.get_many(pk="game")] == [game.game_id]
+    assert websocket_handler.user_data_access.get(**user_4.key).games_ids == []
+
+
 def test_websocket_handler_leave_lobby(
     websocket_handler: WebsocketHandler, lobby_with_user: LobbyModel, user: UserModel, user_2: UserModel
 ) -> None:
@@ -346,3 +484,103 @@ def test_websocket_handler_make_move_in_last_round(
     assert game_model.game.is_finished is True
     assert game_model.game_step == FinishedStep.__name__
     assert game_model.finished_at is not None
+
+
+def test_game_data_access_iter_many_follows_pagination(websocket_handler: WebsocketHandler) -> None:
+    users = ["test@test.com", "test2@test.com", "test3@test.com"]
+    games = [GameModel(game_id=f"{index:02}", game=Game.start_game(users=users)) for index in range(5)]
+    websocket_handler.game_data_access.bulk_save(models=games)
+    game_data_access = websocket_handler.game_data_access
+
+    assert [game.game_id for game in game_data_access.iter_many(pk="game", page_size=2)] == [
+        "00",
+        "01",
+        "02",
+        "03",
+        "04",
+    ]
+    assert [game.game_id for game in game_data_access.iter_many(pk="game", limit=3, scan_index_forward=False)] == [
+        "04",
+        "03",
+        "02",
+    ]
+    assert list(game_data_access.iter_items(pk="game", projection=["SK", "game_step"], page_size=2, limit=3)) == [
+        {"SK": f"game#{index:02}", "game_step": "CardExchangeStep"} for index in range(3)
+    ]
+
+
+def test_game_data_access_iter_previews(websocket_handler: WebsocketHandler) -> None:
+    users = ["test@test.com", "test2@test.com", "test3@test.com"]
+    game = GameModel(game_id=str(uuid4()), game=Game.start_game(users=users))
+    websocket_handler.game_data_access.save(model=game)
+
+    previews = list(websocket_handler.game_data_access.iter_previews())
+
+    assert [preview.dict() for preview in previews] == [{"game_id": game.game_id, "users": users}]
+
+
+def test_websocket_handler_list_games_only_mine(
+    websocket_handler: WebsocketHandler,
+    game_model_first_round: GameModel,
+    game_model_finished: GameModel,
+    user: UserModel,
+) -> None:
+    other_game = GameModel(game_id=str(uuid4()), game=Game.start_game(users=["a@a.com", "b@b.com", "c@c.com"]))
+    websocket_handler.game_data_access.save(model=other_game)
+    user = websocket_handler.user_data_access.get(pk="user", sk=f"user#{user.email}")
+    user.games_ids.append(str(uuid4()))  # ids of games which no longer exist are skipped
+    websocket_handler.user_data_access.save(model=user)
+
+    def get_game_ids(**payload) -> set[str]:
+        previews = websocket_handler.list_games(payload=ListGamesPayload(**payload), user_id=user.email)
+        return {preview.game_id for preview in previews}
+
+    assert get_game_ids() == {game_model_first_round.game_id, game_model_finished.game_id, other_game.game_id}
+    assert get_game_ids(onlyMine=True) == {game_model_first_round.game_id, game_model_finished.game_id}
+    assert get_game_ids(onlyMine=True, status="active") == {game_model_first_round.game_id}
+    assert get_game_ids(onlyMine=True, status="finished") == {game_model_finished.game_id}
+    assert get_game_ids(status="active") == {game_model_first_round.game_id, other_game.game_id}
+
+
+def test_websocket_handler_list_lobbies_only_mine(
+    websocket_handler: WebsocketHandler, lobby_with_user: LobbyModel, user: UserModel, user_2: UserModel
+) -> None:
+    other_lobby = websocket_handler.create_lobby(payload=CreateLobbyPayload(max_players=3), user_id=user_2.email)
+
+    lobbies = websocket_handler.list_lobbies(payload=ListLobbiesPayload(only_mine=True), user_id=user.email)
+    all_lobbies = websocket_handler.list_lobbies(payload=ListLobbiesPayload(), user_id=user.email)
+
+    assert [lobby.lobby_id for lobby in lobbies] == [lobby_with_user.lobby_id]
+    assert {lobby.lobby_id for lobby in all_lobbies} == {lobby_with_user.lobby_id, other_lobby.lobby_id}
+
+
+def _get_exchange_payload(game_model: GameModel, user_id: str) -> MakeMovePayload:
+    cards_ = [str(card) for card in game_model.game.state.decks[user_id][:3]]
+    return MakeMovePayload(game_id=game_model.game_id, game_payload={"cards": cards_})
+
+
+def test_websocket_handler_concurrent_moves_are_not_lost(
+    websocket_handler: WebsocketHandler,
+    user: UserModel,
+    user_2: UserModel,
+    user_3: UserModel,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=[user.email, user_2.email, user_3.email]))
+    websocket_handler.game_data_access.save(model=game_model)
+    game_data_access = websocket_handler.game_data_access
+    get_game = game_data_access.get
+
+    def get_game_and_move_as_user_2(pk: str, sk: str) -> GameModel:
+        # user_2 moves right after user reads the game, so user's save conflicts
+        stale_game = get_game(pk=pk, sk=sk)
+        monkeypatch.setattr(game_data_access, "get", get_game)
+        websocket_handler.make_move(payload=_get_exchange_payload(game_model, user_2.email), user_id=user_2.email)
+        return stale_game
+
+    monkeypatch.setattr(game_data_access, "get", get_game_and_move_as_user_2)
+    game = websocket_handler.make_move(payload=_get_exchange_payload(game_model, user.email), user_id=user.email)
+
+    assert set(game.game.current_step.local_state.cards_to_exchange) == {user.email, user_2.email}
+    assert game.version == 2
+    assert get_game(**game_model.key).version == 2
@@ -0,0 +1,8 @@
+import os
+
+
+# settings are required to import modules touching AWS, unit tests never reach real services
+os.environ.setdefault("AWS_ACCESS_KEY", "unit-test")
+os.environ.setdefault("AWS_SECRET_KEY", "unit-test")
+os.environ.setdefault("DYNAMODB_GAMES_TABLE_NAME", "unit-test")
+os.environ.setdefault("DYNAMODB_BACKEND", "memory")
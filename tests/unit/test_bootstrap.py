@@ -0,0 +1,29 @@
+import pytest
+
+from src import bootstrap
+from src.data_access.pool import get_table
+from src.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def reset_bootstrap() -> None:
+    bootstrap.reset()
+    yield
+    bootstrap.reset()
+
+
+def test_websocket_handler_is_built_once_per_endpoint() -> None:
+    handler = bootstrap.get_websocket_handler(endpoint_url="https://example.com/dev")
+    other_stage_handler = bootstrap.get_websocket_handler(endpoint_url="https://example.com/prod")
+
+    assert bootstrap.get_websocket_handler(endpoint_url="https://example.com/dev") is handler
+    assert other_stage_handler.api_gateway_client is not handler.api_gateway_client
+    assert other_stage_handler.api_gateway_client.meta.endpoint_url == "https://example.com/prod"
+
+
+def test_data_accesses_share_one_table() -> None:
+    handler = bootstrap.get_websocket_handler(endpoint_url="https://example.com/dev")
+
+    assert handler.user_data_access._table is handler.game_data_access._table
+    assert handler.lobby_data_access._table is get_table(table_name=settings.dynamodb_games_table_name)
+    assert bootstrap.get_api_gateway_client(endpoint_url="https://example.com/dev") is handler.api_gateway_client
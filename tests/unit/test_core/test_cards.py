@@ -1,6 +1,10 @@
+import copy
+
 import pytest
+from pydantic import ValidationError
 
 from src.core import cards
+from src.core.enums import CardSuit
 from src.core.exceptions import InvalidCardComparison
 
 
@@ -42,3 +46,40 @@ def test_cards_overloaded_lt(card_1: cards.Card, card_2: cards.Card, is_lower_th
 def test_cards_overloaded_lt_with_different_suits(card_1: cards.Card, card_2: cards.Card) -> None:
     with pytest.raises(InvalidCardComparison):
         card_1.__lt__(card_2)
+
+
+@pytest.mark.parametrize("card", cards.ALL_CARDS)
+def test_card_validate_returns_interned_card(card: cards.Card) -> None:
+    assert cards.Card.validate(card.dict()) is card
+    assert cards.Card.validate(card) is card
+
+
+def test_card_validate_raises_error_on_invalid_card() -> None:
+    with pytest.raises(ValidationError):
+        cards.Card.validate({"suit": "HEART", "value": 1})
+
+
+def test_card_validate_raises_error_on_score_mismatch() -> None:
+    with pytest.raises(ValueError, match="has score 13"):
+        cards.Card.validate({**cards.SPADE_QUEEN.dict(), "score": 0})
+
+    assert cards.Card.validate({"suit": "SPADE", "value": 12}) is cards.SPADE_QUEEN
+
+
+def test_cards_are_equal_by_suit_and_value() -> None:
+    assert cards.Card(suit=CardSuit.SPADE, value=12) == cards.SPADE_QUEEN
+    assert cards.Card(suit=CardSuit.SPADE, value=11) != cards.SPADE_QUEEN
+
+
+def test_cards_are_immutable_and_hashable() -> None:
+    with pytest.raises(TypeError):
+        cards.CLUB_2.value = 3
+
+    assert len(set(cards.ALL_CARDS + cards.ALL_CARDS)) == 52
+    assert copy.deepcopy(cards.SPADE_QUEEN) is cards.SPADE_QUEEN
+
+
+def test_card_lookup_tables() -> None:
+    assert cards.CARD_SCORES[cards.SPADE_QUEEN.ordinal] == 13
+    assert cards.CARD_SUITS[cards.HEART_2.ordinal] == CardSuit.HEART
+    assert cards.CARD_VALUES[cards.DIAMOND_ACE.ordinal] == 14
@@ -0,0 +1,77 @@
+import copy
+
+import pytest
+
+from src.core import cards
+from src.core.deck import SUIT_MASKS, Deck, count_cards, get_cards_mask, get_mask_cards, get_mask_score
+from src.core.enums import CardSuit
+
+
+def test_card_ordinals_match_all_cards_order() -> None:
+    assert [card.ordinal for card in cards.ALL_CARDS] == list(range(52))
+
+
+def test_suit_masks_cover_whole_deck() -> None:
+    assert sum(SUIT_MASKS.values()) == (1 << 52) - 1
+    assert all(count_cards(mask) == 13 for mask in SUIT_MASKS.values())
+
+
+@pytest.mark.parametrize(
+    "deck,score",
+    [
+        ([cards.SPADE_QUEEN, cards.SPADE_KING, cards.SPADE_ACE, cards.HEART_5], 31),
+        ([cards.CLUB_2, cards.DIAMOND_ACE], 0),
+        (cards.ALL_CARDS, 43),
+    ],
+)
+def test_get_mask_score(deck: list[cards.Card], score: int) -> None:
+    assert get_mask_score(get_cards_mask(deck)) == score
+
+
+def test_deck_membership() -> None:
+    deck = Deck([cards.CLUB_3, cards.HEART_QUEEN])
+
+    assert cards.CLUB_3 in deck
+    assert cards.HEART_QUEEN in deck
+    assert cards.CLUB_2 not in deck
+    assert deck.has_suit(CardSuit.HEART)
+    assert not deck.has_suit(CardSuit.SPADE)
+
+
+def test_deck_mask_follows_mutations() -> None:
+    deck = Deck([cards.CLUB_3, cards.HEART_QUEEN])
+
+    deck.remove(cards.CLUB_3)
+    deck.append(cards.SPADE_ACE)
+    assert deck.mask == get_cards_mask([cards.HEART_QUEEN, cards.SPADE_ACE])
+
+    deck.extend([cards.DIAMOND_2])
+    deck.pop(0)
+    assert deck.mask == get_cards_mask([cards.SPADE_ACE, cards.DIAMOND_2])
+
+    deck.clear()
+    assert deck.mask == 0
+
+
+def test_deck_keeps_order_and_list_equality() -> None:
+    deck = Deck([cards.HEART_QUEEN, cards.CLUB_3])
+
+    assert deck == [cards.HEART_QUEEN, cards.CLUB_3]
+    assert get_mask_cards(deck.mask) == [cards.CLUB_3, cards.HEART_QUEEN]
+
+
+def test_deck_validate_from_card_dicts() -> None:
+    deck = Deck([cards.SPADE_QUEEN, cards.DIAMOND_4])
+    validated = Deck.validate([card.dict() for card in deck])
+
+    assert validated == deck
+    assert validated.mask == deck.mask
+
+
+def test_deck_deepcopy_keeps_mask() -> None:
+    deck = Deck([cards.SPADE_QUEEN, cards.DIAMOND_4])
+    deck_copy = copy.deepcopy(deck)
+    deck_copy.remove(cards.DIAMOND_4)
+
+    assert cards.DIAMOND_4 in deck
+    assert cards.DIAMOND_4 not in deck_copy
@@ -7,7 +7,7 @@ from _pytest.logging import LogCaptureFixture
 from src.core import cards
 from src.core.consts import USER
 from src.core.enums import CardSuit
-from src.core.exceptions import InvalidPayloadBody
+from src.core.exceptions import GameError, InvalidPayloadBody
 from src.core.game import Game, GameSettings
 from src.core.state import GameState
 from src.core.steps import CardExchangeStep, FinishedStep, FirstRoundStep, InProgressStep
@@ -222,3 +222,24 @@ def test_game_starting_new_round(game_with_finished_step: Game) -> None:
     assert not game_with_finished_step.current_step.local_state.cards_to_exchange
     assert game_with_finished_step.state.current_user is None
     assert game_with_finished_step.is_finished is False
+
+
+@pytest.mark.parametrize("users", (["user_1", "user_2", "user_3"], ["user_1", "user_2", "user_3", "user_4"]))
+def test_legal_moves_match_payload_validation(users: list[USER]) -> None:
+    game = Game.start_game(users=users)
+    for user, cards_for_exchange in zip(users, _get_card_for_exchange(decks=game.state.decks)):
+        game.dispatch(payload=CardExchangePayload(user=user, cards=cards_for_exchange))
+
+    while not isinstance(game.current_step, FinishedStep):
+        step = game.current_step
+        for user in users:
+            legal_moves = step.legal_moves(user=user)
+            for card in game.state.decks[user]:
+                try:
+                    step.validate_payload(payload=RoundPayload(user=user, card=str(card)))
+                    assert card in legal_moves
+                except GameError:
+                    assert card not in legal_moves
+
+        user = game.state.current_user
+        game.dispatch(payload=RoundPayload(user=user, card=str(step.legal_moves(user=user)[-1])))
@@ -186,3 +186,21 @@ def test_should_switch_to_next_step(initial_game_state_with_three_users: GameSta
     step.dispatch_payload(payload=payload_3)
 
     assert step.should_switch_to_next_step
+
+
+def test_validate_payload_when_user_has_already_declared_cards(initial_game_state_with_three_users: GameState) -> None:
+    step = CardExchangeStep(game_state=initial_game_state_with_three_users)
+    cards_for_exchange_1, _, _ = _get_card_for_exchange(decks=initial_game_state_with_three_users.decks)
+    step.dispatch_payload(payload=CardExchangePayload(user="user_1", cards=cards_for_exchange_1))
+
+    with pytest.raises(InvalidPayloadBody):
+        step.validate_payload(payload=CardExchangePayload(user="user_1", cards=cards_for_exchange_1))
+
+
+def test_legal_moves(initial_game_state_with_three_users: GameState) -> None:
+    step = CardExchangeStep(game_state=initial_game_state_with_three_users)
+    cards_for_exchange_1, _, _ = _get_card_for_exchange(decks=initial_game_state_with_three_users.decks)
+    step.dispatch_payload(payload=CardExchangePayload(user="user_1", cards=cards_for_exchange_1))
+
+    assert step.legal_moves(user="user_1") == []
+    assert step.legal_moves(user="user_2") == initial_game_state_with_three_users.decks["user_2"]
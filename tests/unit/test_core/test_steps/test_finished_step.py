@@ -101,3 +101,8 @@ def test_should_switch_to_next_step_when_round_is_finished(game_state_with_round
 def test_should_switch_to_next_step_when_round_is_not_finished(game_state_with_round_finished: GameState) -> None:
     step = FinishedStep(game_state=game_state_with_round_finished)
     assert step.should_switch_to_next_step is False
+
+
+def test_legal_moves(game_state_with_round_finished: GameState) -> None:
+    step = FinishedStep(game_state=game_state_with_round_finished)
+    assert step.legal_moves(user="user_1") == []
@@ -157,7 +157,7 @@ def test_dispatch_payload_when_last_card_is_being_put(game_state_with_current_pl
     new_state = step.dispatch_payload(payload=RoundPayload(user="user_2", card=str(cards.HEART_7)))
 
     assert new_state != game_state_with_current_player
-    assert step.local_state.table_suit == CardSuit.HEART
+    assert step.local_state.table_suit is None
     assert not step.local_state.cards_on_table
     assert new_state.decks == {
         "user_1": [cards.HEART_4, cards.DIAMOND_6],
@@ -181,7 +181,7 @@ def test_dispatch_payload_when_everyone_has_card_of_given_suit(
     new_state = step.dispatch_payload(payload=RoundPayload(user="user_2", card=str(cards.SPADE_KING)))
 
     assert new_state != game_state_with_current_player_round_when_everyone_has_one_suit
-    assert step.local_state.table_suit == CardSuit.SPADE
+    assert step.local_state.table_suit is None
     assert not step.local_state.cards_on_table
     assert new_state.decks == {
         "user_1": [],
@@ -205,7 +205,7 @@ def test_dispatch_payload_when_other_players_suits_do_not_match(
     new_state = step.dispatch_payload(payload=RoundPayload(user="user_4", card=str(cards.HEART_10)))
 
     assert new_state != game_state_with_current_player_round_when_two_players_do_not_have_matching_suit
-    assert step.local_state.table_suit == CardSuit.DIAMOND
+    assert step.local_state.table_suit is None
     assert not step.local_state.cards_on_table
     assert new_state.decks == {
         "user_1": [],
@@ -224,3 +224,82 @@ def test_dispatch_payload_when_player_tries_to_put_heart_first_and_has_other_sui
     step = InProgressStep(game_state=game_state_with_current_player_round_when_player_have_more_than_heart_suit)
     with pytest.raises(InvalidPayloadBody):
         step.validate_payload(payload=RoundPayload(user="user_1", card=str(cards.HEART_5)))
+
+
+def test_dispatch_payload_does_not_modify_previous_state(game_state_with_current_player: GameState) -> None:
+    step = InProgressStep(game_state=game_state_with_current_player)
+
+    step.dispatch_payload(payload=RoundPayload(user="user_3", card=str(cards.HEART_QUEEN)))
+    step.dispatch_payload(payload=RoundPayload(user="user_4", card=str(cards.DIAMOND_3)))
+    step.dispatch_payload(payload=RoundPayload(user="user_1", card=str(cards.HEART_5)))
+    new_state = step.dispatch_payload(payload=RoundPayload(user="user_2", card=str(cards.HEART_7)))
+
+    assert game_state_with_current_player.decks["user_3"] == [cards.HEART_QUEEN, cards.HEART_KING]
+    assert game_state_with_current_player.scores == {"user_1": 0, "user_2": 0, "user_3": 0, "user_4": 0}
+    assert game_state_with_current_player.current_user == "user_3"
+    assert new_state.users is game_state_with_current_player.users
+
+
+def test_dispatch_payload_shares_untouched_decks(game_state_with_current_player: GameState) -> None:
+    step = InProgressStep(game_state=game_state_with_current_player)
+    new_state = step.dispatch_payload(payload=RoundPayload(user="user_3", card=str(cards.HEART_QUEEN)))
+
+    assert new_state.decks["user_3"] is not game_state_with_current_player.decks["user_3"]
+    for user in ("user_1", "user_2", "user_4"):
+        assert new_state.decks[user] is game_state_with_current_player.decks[user]
+
+
+def test_dispatch_payload_resets_table_suit_after_trick(game_state_with_current_player: GameState) -> None:
+    step = InProgressStep(game_state=game_state_with_current_player)
+    for user, card in (
+        ("user_3", cards.HEART_QUEEN),
+        ("user_4", cards.DIAMOND_3),
+        ("user_1", cards.HEART_5),
+        ("user_2", cards.HEART_7),
+    ):
+        step.dispatch_payload(payload=RoundPayload(user=user, card=str(card)))
+    # user leading next trick has hearts, which cannot be led, so suit of previous trick must not be enforced
+    step.game_state.current_user = "user_1"
+
+    step.validate_payload(payload=RoundPayload(user="user_1", card=str(cards.DIAMOND_6)))
+    assert step.legal_moves(user="user_1") == [cards.DIAMOND_6]
+
+
+def test_validate_payload_ignores_stale_table_suit_on_empty_table(game_state_with_current_player: GameState) -> None:
+    game_state_with_current_player.current_user = "user_1"
+    step = InProgressStep(game_state=game_state_with_current_player, local_state=RoundState(table_suit=CardSuit.HEART))
+
+    step.validate_payload(payload=RoundPayload(user="user_1", card=str(cards.DIAMOND_6)))
+    assert step.legal_moves(user="user_1") == [cards.DIAMOND_6]
+
+
+@pytest.mark.parametrize(
+    "user,local_state,legal_moves",
+    [
+        ("user_3", RoundState(), [cards.HEART_QUEEN, cards.HEART_KING]),  # only hearts on deck
+        ("user_1", RoundState(), []),  # not user's turn
+        (
+            "user_3",
+            RoundState(cards_on_table={"user_2": cards.CLUB_2}, table_suit=CardSuit.CLUB),
+            [cards.HEART_QUEEN, cards.HEART_KING],
+        ),  # no matching suit on deck
+    ],
+)
+def test_legal_moves(
+    user: str, local_state: RoundState, legal_moves: list[cards.Card], game_state_with_current_player: GameState
+) -> None:
+    step = InProgressStep(game_state=game_state_with_current_player, local_state=local_state)
+    assert step.legal_moves(user=user) == legal_moves
+
+
+def test_legal_moves_when_table_suit_has_to_be_matched(game_state_with_first_round: GameState) -> None:
+    step = FirstRoundStep(
+        game_state=game_state_with_first_round,
+        local_state=RoundState(cards_on_table={"user_4": cards.DIAMOND_4}, table_suit=CardSuit.DIAMOND),
+    )
+    assert step.legal_moves(user="user_1") == [cards.DIAMOND_3]
+
+
+def test_legal_moves_without_hearts_when_putting_first_card(game_state_with_first_round: GameState) -> None:
+    step = FirstRoundStep(game_state=game_state_with_first_round)
+    assert step.legal_moves(user="user_2") == [cards.CLUB_2, cards.CLUB_3, cards.CLUB_4]
@@ -0,0 +1,42 @@
+from src.data_access.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache = LRUCache(max_size=2, ttl=10, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_lru_cache_expires_entries() -> None:
+    clock = FakeClock()
+    cache = LRUCache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_pop_and_disabled_cache() -> None:
+    cache = LRUCache(max_size=2, ttl=10, clock=FakeClock())
+    cache.set("a", 1)
+    disabled_cache = LRUCache(max_size=0, ttl=10)
+    disabled_cache.set("a", 1)
+
+    assert cache.pop("a") == 1
+    assert cache.get("a") is None
+    assert disabled_cache.get("a") is None
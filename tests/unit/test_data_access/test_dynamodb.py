@@ -0,0 +1,119 @@
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.data_access import dynamodb
+from src.data_access.exceptions import DoesNotExist, UnprocessedKeys
+from src.data_access.memory import InMemoryTable, get_in_memory_table
+from src.data_access.user import UserDataAccess
+from src.schemas.user import UserModel
+
+
+class ThrottlingClient:
+    """Returns all but the first key of every request as unprocessed, for given number of calls."""
+
+    def __init__(self, table: InMemoryTable, throttled_calls: int) -> None:
+        self._client = table.meta.client
+        self.throttled_calls = throttled_calls
+        self.requested_keys: list[int] = []
+
+    def batch_get_item(self, RequestItems: dict[str, dict[str, Any]]) -> dict[str, Any]:  # NOQA: N803
+        (table_name, request), *_ = RequestItems.items()
+        self.requested_keys.append(len(request["Keys"]))
+        if self.throttled_calls == 0:
+            return self._client.batch_get_item(RequestItems=RequestItems)
+
+        self.throttled_calls -= 1
+        response = self._client.batch_get_item(RequestItems={table_name: {**request, "Keys": request["Keys"][:1]}})
+        return {**response, "UnprocessedKeys": {table_name: {**request, "Keys": request["Keys"][1:]}}}
+
+
+@pytest.fixture
+def table() -> InMemoryTable:
+    table = get_in_memory_table(table_name=f"test_table_{uuid4()}")
+    yield table
+    table.delete()
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    sleeps = []
+    monkeypatch.setattr(dynamodb.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def _get_user_data_access(table: InMemoryTable, throttled_calls: int) -> tuple[UserDataAccess, ThrottlingClient]:
+    client = ThrottlingClient(table=table, throttled_calls=throttled_calls)
+    throttled_table = type("ThrottledTable", (), {"name": table.name, "meta": type("Meta", (), {"client": client})})
+    return UserDataAccess(table_name=table.name, table=throttled_table), client
+
+
+def test_get_many_by_keys_preserves_order_and_chunks_keys(table: InMemoryTable, sleeps: list[float]) -> None:
+    emails = [f"user_{index:03}@test.com" for index in range(150)]
+    UserDataAccess(table_name=table.name, table=table).bulk_save(models=[UserModel(email=email) for email in emails])
+    user_data_access, client = _get_user_data_access(table=table, throttled_calls=0)
+
+    requested = [emails[149], "missing@test.com", *emails[:120], emails[0]]
+    users = user_data_access.get_many_by_emails(emails=requested)
+
+    assert [user.email for user in users] == [email for email in requested if email != "missing@test.com"]
+    assert client.requested_keys == [100, 22]
+    assert sleeps == []
+
+
+def test_get_many_by_keys_retries_unprocessed_keys_with_backoff(table: InMemoryTable, sleeps: list[float]) -> None:
+    emails = [f"user_{index}@test.com" for index in range(3)]
+    UserDataAccess(table_name=table.name, table=table).bulk_save(models=[UserModel(email=email) for email in emails])
+    user_data_access, client = _get_user_data_access(table=table, throttled_calls=2)
+
+    users = user_data_access.get_many_by_emails(emails=emails)
+
+    assert [user.email for user in users] == emails
+    assert client.requested_keys == [3, 2, 1]
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= dynamodb.BATCH_GET_BASE_DELAY
+    assert 0 <= sleeps[1] <= dynamodb.BATCH_GET_BASE_DELAY * 2
+
+
+def test_get_many_by_keys_gives_up_after_max_retries(table: InMemoryTable, sleeps: list[float]) -> None:
+    emails = [f"user_{index}@test.com" for index in range(dynamodb.BATCH_GET_MAX_RETRIES + 3)]
+    UserDataAccess(table_name=table.name, table=table).bulk_save(models=[UserModel(email=email) for email in emails])
+    user_data_access, _ = _get_user_data_access(table=table, throttled_calls=len(emails))
+
+    with pytest.raises(UnprocessedKeys, match="2 keys still unprocessed"):
+        user_data_access.get_many_by_emails(emails=emails)
+
+    assert len(sleeps) == dynamodb.BATCH_GET_MAX_RETRIES
+
+
+def test_update_writes_only_changed_attributes(table: InMemoryTable) -> None:
+    user_data_access = UserDataAccess(table_name=table.name, table=table)
+    user = UserModel(email="user@test.com", games_ids=["game"], connection_ids=["first"])
+    user_data_access.save(model=user)
+    # written by someone else, update must not overwrite it
+    table.update_item(
+        Key={"PK": user.pk, "SK": user.sk},
+        UpdateExpression="SET #g = :g",
+        ExpressionAttributeNames={"#g": "games_ids"},
+        ExpressionAttributeValues={":g": ["other"]},
+    )
+
+    original_item = user.to_item()
+    user.connection_ids.append("second")
+    user_data_access.update(model=user, original_item=original_item)
+
+    stored_user = user_data_access.get(pk=user.pk, sk=user.sk)
+    assert stored_user.connection_ids == ["first", "second"]
+    assert stored_user.games_ids == ["other"]
+
+
+def test_update_of_item_which_does_not_exist(table: InMemoryTable) -> None:
+    user = UserModel(email="user@test.com")
+    original_item = user.to_item()
+    user.connection_ids.append("connection")
+
+    with pytest.raises(DoesNotExist):
+        UserDataAccess(table_name=table.name, table=table).update(model=user, original_item=original_item)
+
+    assert table.scan()["Items"] == []
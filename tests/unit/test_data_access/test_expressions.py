@@ -0,0 +1,29 @@
+from src.data_access.expressions import get_update_kwargs
+
+
+def test_get_update_kwargs_without_changes() -> None:
+    item = {"PK": "user", "SK": "user#1", "ids": ["a"]}
+
+    assert get_update_kwargs(original_item=item, item=dict(item)) is None
+
+
+def test_get_update_kwargs_appends_to_lists_and_diffs_maps() -> None:
+    original_item = {"PK": "user", "SK": "user#1", "ids": ["a"], "scores": {"a@a.com": 1, "b@b.com": 2}, "old": 1}
+    item = {"PK": "user", "SK": "user#1", "ids": ["a", "b"], "scores": {"a@a.com": 1, "b@b.com": 3}}
+
+    assert get_update_kwargs(original_item=original_item, item=item) == {
+        "UpdateExpression": "SET #u1 = list_append(#u1, :u0), #u2.#u3 = :u1 REMOVE #u0",
+        "ExpressionAttributeNames": {"#u0": "old", "#u1": "ids", "#u2": "scores", "#u3": "b@b.com"},
+        "ExpressionAttributeValues": {":u0": ["b"], ":u1": 3},
+    }
+
+
+def test_get_update_kwargs_for_sets_and_replaced_lists() -> None:
+    original_item = {"added": {"a"}, "deleted": {"a", "b"}, "emptied": {"a"}, "ids": ["a", "b"]}
+    item = {"added": {"a", "b"}, "deleted": {"a"}, "emptied": set(), "ids": ["b"]}
+
+    assert get_update_kwargs(original_item=original_item, item=item) == {
+        "UpdateExpression": "SET #u3 = :u2 REMOVE #u2 ADD #u0 :u0 DELETE #u1 :u1",
+        "ExpressionAttributeNames": {"#u0": "added", "#u1": "deleted", "#u2": "emptied", "#u3": "ids"},
+        "ExpressionAttributeValues": {":u0": {"b"}, ":u1": {"b"}, ":u2": ["b"]},
+    }
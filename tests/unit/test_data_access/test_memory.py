@@ -0,0 +1,333 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from src.data_access.memory import InMemoryTable, get_in_memory_table
+
+
+@pytest.fixture
+def table() -> InMemoryTable:
+    table = get_in_memory_table(table_name=f"test_table_{uuid4()}")
+    yield table
+    table.delete()
+
+
+def _put_games(table: InMemoryTable, count: int) -> None:
+    for index in range(count):
+        table.put_item(Item={"PK": "game", "SK": f"game#{index:02}", "step": "FIRST_ROUND", "index": index})
+
+
+def test_put_and_get_item_round_trips_through_dynamodb_types(table: InMemoryTable) -> None:
+    item = {"PK": "user", "SK": "user#1", "score": 5, "ids": ["a", "b"], "nested": {"value": 1}}
+    table.put_item(Item=item)
+
+    loaded = table.get_item(Key={"PK": "user", "SK": "user#1"})["Item"]
+    loaded["ids"].append("c")
+
+    assert loaded["score"] == Decimal(5)
+    assert table.get_item(Key={"PK": "user", "SK": "user#1"})["Item"]["ids"] == ["a", "b"]
+    assert table.get_item(Key={"PK": "user", "SK": "user#2"}) == {}
+
+
+def test_put_item_rejects_floats_like_dynamodb(table: InMemoryTable) -> None:
+    with pytest.raises(TypeError):
+        table.put_item(Item={"PK": "user", "SK": "user#1", "score": 1.5})
+
+
+def test_get_item_with_invalid_key(table: InMemoryTable) -> None:
+    with pytest.raises(ClientError) as error:
+        table.get_item(Key={"PK": "user"})
+
+    assert error.value.response["Error"]["Code"] == "ValidationException"
+
+
+@pytest.mark.parametrize(
+    "condition",
+    ["attribute_not_exists(SK)", Attr("SK").not_exists()],
+)
+def test_put_item_condition_failed(table: InMemoryTable, condition) -> None:
+    table.put_item(Item={"PK": "user", "SK": "user#1"}, ConditionExpression=condition)
+
+    with pytest.raises(ClientError) as error:
+        table.put_item(Item={"PK": "user", "SK": "user#1"}, ConditionExpression=condition)
+
+    assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+
+def test_put_item_with_expression_names_and_values(table: InMemoryTable) -> None:
+    table.put_item(Item={"PK": "game", "SK": "game#1", "version": 1})
+    condition = "attribute_exists(SK) AND (#version = :version OR #version < :zero)"
+    values = {":version": 1, ":zero": 0}
+
+    table.put_item(
+        Item={"PK": "game", "SK": "game#1", "version": 2},
+        ConditionExpression=condition,
+        ExpressionAttributeNames={"#version": "version"},
+        ExpressionAttributeValues=values,
+    )
+    with pytest.raises(ClientError):
+        table.put_item(
+            Item={"PK": "game", "SK": "game#1", "version": 2},
+            ConditionExpression=condition,
+            ExpressionAttributeNames={"#version": "version"},
+            ExpressionAttributeValues=values,
+        )
+
+
+def test_delete_item_condition_failed(table: InMemoryTable) -> None:
+    with pytest.raises(ClientError) as error:
+        table.delete_item(Key={"PK": "user", "SK": "user#1"}, ConditionExpression="attribute_exists(SK)")
+
+    assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+
+def test_query_pagination_and_order(table: InMemoryTable) -> None:
+    _put_games(table=table, count=5)
+    table.put_item(Item={"PK": "lobby", "SK": "lobby#1"})
+
+    first_page = table.query(KeyConditionExpression=Key("PK").eq("game"), Limit=3, ScanIndexForward=False)
+    second_page = table.query(
+        KeyConditionExpression=Key("PK").eq("game"),
+        Limit=3,
+        ScanIndexForward=False,
+        ExclusiveStartKey=first_page["LastEvaluatedKey"],
+    )
+
+    assert [item["SK"] for item in first_page["Items"]] == ["game#04", "game#03", "game#02"]
+    assert [item["SK"] for item in second_page["Items"]] == ["game#01", "game#00"]
+    assert "LastEvaluatedKey" not in second_page
+
+
+@pytest.mark.parametrize(
+    "scan_index_forward, expected",
+    [(True, ["game#03", "game#04"]), (False, ["game#01", "game#00"])],
+)
+def test_query_pagination_after_start_key_item_was_deleted(
+    table: InMemoryTable, scan_index_forward: bool, expected: list[str]
+) -> None:
+    _put_games(table=table, count=5)
+    table.delete_item(Key={"PK": "game", "SK": "game#02"})
+
+    page = table.query(
+        KeyConditionExpression=Key("PK").eq("game"),
+        ScanIndexForward=scan_index_forward,
+        ExclusiveStartKey={"PK": "game", "SK": "game#02"},
+    )
+    scan_page = table.scan(ExclusiveStartKey={"PK": "game", "SK": "game#02"})
+
+    assert [item["SK"] for item in page["Items"]] == expected
+    assert [item["SK"] for item in scan_page["Items"]] == ["game#03", "game#04"]
+
+
+def test_query_with_range_key_condition_filter_and_projection(table: InMemoryTable) -> None:
+    _put_games(table=table, count=5)
+
+    response = table.query(
+        KeyConditionExpression=Key("PK").eq("game") & Key("SK").begins_with("game#0"),
+        FilterExpression=Attr("index").gte(3),
+        ProjectionExpression="SK, #index",
+        ExpressionAttributeNames={"#index": "index"},
+    )
+
+    assert response["Items"] == [{"SK": "game#03", "index": 3}, {"SK": "game#04", "index": 4}]
+    assert response["ScannedCount"] == 5
+
+
+def test_query_without_hash_key_condition(table: InMemoryTable) -> None:
+    with pytest.raises(ClientError) as error:
+        table.query(KeyConditionExpression=Key("SK").eq("game#1"))
+
+    assert error.value.response["Error"]["Code"] == "ValidationException"
+
+
+def test_batch_writer_and_scan(table: InMemoryTable) -> None:
+    with table.batch_writer() as batch:
+        batch.put_item(Item={"PK": "user", "SK": "user#1"})
+        batch.put_item(Item={"PK": "user", "SK": "user#2"})
+        batch.delete_item(Key={"PK": "user", "SK": "user#1"})
+
+    assert table.scan()["Items"] == [{"PK": "user", "SK": "user#2"}]
+
+
+def test_transact_write_items_is_all_or_nothing(table: InMemoryTable) -> None:
+    table.put_item(Item={"PK": "lobby", "SK": "lobby#1"})
+    client = table.meta.client
+    transact_items = [
+        {"Delete": {"TableName": table.table_name, "Key": {"PK": "lobby", "SK": "lobby#1"}}},
+        {
+            "Put": {
+                "TableName": table.table_name,
+                "Item": {"PK": "game", "SK": "game#1"},
+                "ConditionExpression": "attribute_not_exists(SK)",
+            }
+        },
+    ]
+    table.put_item(Item={"PK": "game", "SK": "game#1"})
+
+    with pytest.raises(ClientError) as error:
+        client.transact_write_items(TransactItems=transact_items)
+
+    assert error.value.response["Error"]["Code"] == "TransactionCanceledException"
+    assert [reason["Code"] for reason in error.value.response["CancellationReasons"]] == [
+        "None",
+        "ConditionalCheckFailed",
+    ]
+    assert "Item" in table.get_item(Key={"PK": "lobby", "SK": "lobby#1"})
+
+    table.delete_item(Key={"PK": "game", "SK": "game#1"})
+    client.transact_write_items(TransactItems=transact_items)
+
+    assert table.get_item(Key={"PK": "lobby", "SK": "lobby#1"}) == {}
+    assert "Item" in table.get_item(Key={"PK": "game", "SK": "game#1"})
+
+
+def test_transact_write_items_applies_update_and_condition_check(table: InMemoryTable) -> None:
+    table.put_item(Item={"PK": "user", "SK": "user#1", "games_ids": ["game#1"]})
+    table.put_item(Item={"PK": "lobby", "SK": "lobby#1", "users": ["user#1"]})
+    client = table.meta.client
+    transact_items = [
+        {
+            "Update": {
+                "TableName": table.table_name,
+                "Key": {"PK": "user", "SK": "user#1"},
+                "UpdateExpression": "SET games_ids = list_append(games_ids, :games_ids)",
+                "ExpressionAttributeValues": {":games_ids": ["game#2"]},
+            }
+        },
+        {
+            "ConditionCheck": {
+                "TableName": table.table_name,
+                "Key": {"PK": "lobby", "SK": "lobby#1"},
+                "ConditionExpression": "size(#users) = :count",
+                "ExpressionAttributeNames": {"#users": "users"},
+                "ExpressionAttributeValues": {":count": 2},
+            }
+        },
+    ]
+
+    with pytest.raises(ClientError) as error:
+        client.transact_write_items(TransactItems=transact_items)
+
+    assert error.value.response["Error"]["Code"] == "TransactionCanceledException"
+    assert table.get_item(Key={"PK": "user", "SK": "user#1"})["Item"]["games_ids"] == ["game#1"]
+
+    table.put_item(Item={"PK": "lobby", "SK": "lobby#1", "users": ["user#1", "user#2"]})
+    client.transact_write_items(TransactItems=transact_items)
+
+    assert table.get_item(Key={"PK": "user", "SK": "user#1"})["Item"]["games_ids"] == ["game#1", "game#2"]
+    assert table.get_item(Key={"PK": "lobby", "SK": "lobby#1"})["Item"]["users"] == ["user#1", "user#2"]
+
+
+def test_transact_write_items_reverts_writes_when_update_fails(table: InMemoryTable) -> None:
+    table.put_item(Item={"PK": "user", "SK": "user#1", "games_ids": ["game#1"]})
+    transact_items = [
+        {"Put": {"TableName": table.table_name, "Item": {"PK": "game", "SK": "game#1"}}},
+        {"Delete": {"TableName": table.table_name, "Key": {"PK": "user", "SK": "user#1"}}},
+        {
+            "Update": {
+                "TableName": table.table_name,
+                "Key": {"PK": "lobby", "SK": "lobby#1"},
+                "UpdateExpression": "SET SK = :sk",
+                "ExpressionAttributeValues": {":sk": "lobby#2"},
+            }
+        },
+    ]
+
+    with pytest.raises(ClientError) as error:
+        table.meta.client.transact_write_items(TransactItems=transact_items)
+
+    assert error.value.response["Error"]["Code"] == "ValidationException"
+    assert table.scan()["Items"] == [{"PK": "user", "SK": "user#1", "games_ids": ["game#1"]}]
+
+
+def test_tables_share_lock_with_client(table: InMemoryTable) -> None:
+    client = table.meta.client
+
+    assert table._lock is client._lock is client.get_table(table_name=f"test_table_{uuid4()}")._lock
+
+
+def test_transact_write_items_rejects_unknown_action(table: InMemoryTable) -> None:
+    with pytest.raises(ClientError) as error:
+        table.meta.client.transact_write_items(
+            TransactItems=[{"Upsert": {"TableName": table.table_name, "Key": {"PK": "user", "SK": "user#1"}}}]
+        )
+
+    assert error.value.response["Error"]["Code"] == "ValidationException"
+
+
+def test_batch_get_item(table: InMemoryTable) -> None:
+    _put_games(table=table, count=3)
+    keys = [{"PK": "game", "SK": "game#02"}, {"PK": "game", "SK": "game#05"}, {"PK": "game", "SK": "game#00"}]
+
+    response = table.meta.client.batch_get_item(
+        RequestItems={
+            table.table_name: {
+                "Keys": keys,
+                "ProjectionExpression": "SK, #i",
+                "ExpressionAttributeNames": {"#i": "index"},
+            }
+        }
+    )
+
+    assert response == {
+        "Responses": {table.table_name: [{"SK": "game#02", "index": 2}, {"SK": "game#00", "index": 0}]},
+        "UnprocessedKeys": {},
+    }
+    with pytest.raises(ClientError) as error:
+        table.meta.client.batch_get_item(RequestItems={table.table_name: {"Keys": keys + keys[:1]}})
+
+    assert error.value.response["Error"]["Code"] == "ValidationException"
+
+
+def test_update_item(table: InMemoryTable) -> None:
+    table.put_item(Item={"PK": "user", "SK": "user#1", "ids": ["a"], "tags": {"x", "y"}, "count": 1, "name": "a"})
+
+    table.update_item(
+        Key={"PK": "user", "SK": "user#1"},
+        UpdateExpression="SET #ids = list_append(#ids, :ids), #nested = if_not_exists(#nested, :nested) "
+        "REMOVE #name ADD #count :one DELETE #tags :tags",
+        ConditionExpression="#count = :one",
+        ExpressionAttributeNames={
+            "#ids": "ids",
+            "#nested": "nested",
+            "#name": "name",
+            "#count": "count",
+            "#tags": "tags",
+        },
+        ExpressionAttributeValues={":ids": ["b"], ":nested": {"a.b": 1}, ":one": 1, ":tags": {"x"}},
+    )
+
+    assert table.get_item(Key={"PK": "user", "SK": "user#1"})["Item"] == {
+        "PK": "user",
+        "SK": "user#1",
+        "ids": ["a", "b"],
+        "nested": {"a.b": 1},
+        "count": 2,
+        "tags": {"y"},
+    }
+    with pytest.raises(ClientError) as error:
+        table.update_item(
+            Key={"PK": "user", "SK": "user#1"},
+            UpdateExpression="SET #count = :one",
+            ConditionExpression="#count = :one",
+            ExpressionAttributeNames={"#count": "count"},
+            ExpressionAttributeValues={":one": 1},
+        )
+
+    assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+
+def test_update_item_with_invalid_document_path(table: InMemoryTable) -> None:
+    table.put_item(Item={"PK": "user", "SK": "user#1"})
+
+    with pytest.raises(ClientError) as error:
+        table.update_item(
+            Key={"PK": "user", "SK": "user#1"},
+            UpdateExpression="SET missing.nested = :one",
+            ExpressionAttributeValues={":one": 1},
+        )
+
+    assert error.value.response["Error"]["Code"] == "ValidationException"
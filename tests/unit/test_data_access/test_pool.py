@@ -0,0 +1,16 @@
+from src.data_access.pool import TablePool
+
+
+def test_table_pool_shares_resource_between_tables_with_same_credentials() -> None:
+    pool = TablePool()
+    credentials = {"region": "eu-central-1", "aws_access_key": "key", "aws_secret_key": "secret"}
+
+    games_table = pool.get_table(table_name="games", **credentials)
+    other_table = pool.get_table(table_name="other", **credentials)
+    other_region_table = pool.get_table(table_name="games", **{**credentials, "region": "eu-west-1"})
+
+    assert pool.get_table(table_name="games", **credentials) is games_table
+    assert games_table.meta.client is other_table.meta.client
+    assert other_region_table.meta.client is not games_table.meta.client
+    assert games_table.meta.client.meta.config.tcp_keepalive is True
+    assert games_table.meta.client.meta.config.max_pool_connections == 50
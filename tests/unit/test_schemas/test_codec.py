@@ -0,0 +1,73 @@
+import random
+from uuid import uuid4
+
+import pytest
+
+from src.core.deck import get_cards_mask
+from src.core.game import Game
+from src.core.steps import FinishedStep
+from src.schemas.codec import FORMAT_VERSION, decode_game, encode_game
+from src.schemas.game import GameModel
+from src.simulation.policies import RandomLegalPolicy
+from src.simulation.runner import get_next_payload
+
+
+USERS = ["user1@test.com", "user2@test.com", "user3@test.com", "user4@test.com"]
+
+
+def _get_comparable(game: Game) -> dict:
+    """Decoded decks are sorted by card ordinal, so decks and exchanged cards are compared as masks."""
+    game_dict = game.dict(exclude={"store"})
+    state, local_state = game_dict["state"], game_dict["current_step"].pop("local_state")
+    state["decks"] = {user: deck.mask for user, deck in game.state.decks.items()}
+    if "cards_to_exchange" in local_state:
+        local_state["cards_to_exchange"] = {
+            user: get_cards_mask(cards) for user, cards in game.current_step.local_state.cards_to_exchange.items()
+        }
+    game_dict["current_step"].pop("game_state")
+    return {**game_dict, "local_state": local_state, "step": game.current_step.__class__}
+
+
+def test_encode_game_round_trips_every_move() -> None:
+    random.seed(0)
+    policies = {user: RandomLegalPolicy(seed=index) for index, user in enumerate(USERS)}
+    game = Game.start_game(users=USERS)
+    steps = set()
+
+    # whole deal, including finished step and start of the next one
+    for _ in range(70):
+        data = encode_game(game)
+        decoded = decode_game(data)
+
+        assert data[0] == FORMAT_VERSION
+        assert _get_comparable(decoded) == _get_comparable(game)
+        steps.add(game.current_step.__class__)
+        game.dispatch(payload=get_next_payload(game=game, policies=policies))
+
+    assert FinishedStep in steps and len(steps) == 4
+
+
+def test_decode_game_rejects_unknown_format_version() -> None:
+    data = encode_game(Game.start_game(users=USERS))
+
+    with pytest.raises(ValueError):
+        decode_game(bytes([FORMAT_VERSION + 1]) + data[1:])
+
+
+def test_encode_game_with_user_ids_longer_than_255_bytes() -> None:
+    users = [f"{'user' * 100}{index}@test.com" for index in range(3)]
+    game = Game.start_game(users=users)
+
+    assert _get_comparable(decode_game(encode_game(game))) == _get_comparable(game)
+
+
+def test_game_model_from_item_reads_both_formats() -> None:
+    game_model = GameModel(game_id=str(uuid4()), game=Game.start_game(users=USERS[:3]))
+    map_item, binary_item = game_model.to_item(codec="map"), game_model.to_item(codec="binary")
+
+    from_map, from_binary = GameModel.from_item(item=map_item), GameModel.from_item(item=binary_item)
+
+    assert "game" not in binary_item and binary_item["users"] == USERS[:3]
+    assert _get_comparable(from_binary.game) == _get_comparable(from_map.game)
+    assert from_map.to_stored_item().keys() == map_item.keys()
+    assert from_binary.to_stored_item() == binary_item
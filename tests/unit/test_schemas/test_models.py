@@ -0,0 +1,64 @@
+import copy
+from decimal import Decimal
+from typing import Any, Type
+from uuid import uuid4
+
+import pytest
+
+from src.core.steps import STEP_MAPPING
+from src.data_access.memory import to_stored_types
+from src.schemas.base import DynamoDBBaseModel
+from src.schemas.connection import CONNECTION_PKS, ConnectionModel
+from src.schemas.game import GameModel
+from src.schemas.lobby import LobbyModel
+from src.schemas.user import UserModel
+from src.settings import settings
+from tests.helpers import get_game_at_step
+
+
+USERS = ["user1@test.com", "user2@test.com", "user3@test.com"]
+
+
+def _load(model_class: Type[DynamoDBBaseModel], item: dict[str, Any], validate: bool) -> DynamoDBBaseModel:
+    settings.dynamodb_validate_items = validate
+    try:
+        # numbers are read from the table as Decimals
+        return model_class.from_item(item=to_stored_types(copy.deepcopy(item)))
+    finally:
+        settings.dynamodb_validate_items = False
+
+
+@pytest.mark.parametrize("codec", ["map", "binary"])
+@pytest.mark.parametrize("step_name", list(STEP_MAPPING))
+def test_game_model_from_item_without_validation(step_name: str, codec: str) -> None:
+    game_model = GameModel(
+        game_id=str(uuid4()),
+        game=get_game_at_step(step_class=STEP_MAPPING[step_name], users=USERS, with_local_state=True),
+    )
+    game_model.version = 3
+    item = game_model.to_item(codec=codec)
+
+    trusted, validated = _load(GameModel, item, validate=False), _load(GameModel, item, validate=True)
+
+    assert trusted.dict() == validated.dict()
+    assert type(trusted.game.current_step) is type(validated.game.current_step) is STEP_MAPPING[step_name]
+    assert trusted.game.state.decks[USERS[0]].mask == validated.game.state.decks[USERS[0]].mask
+    assert trusted.to_item(codec=codec) == validated.to_item(codec=codec)
+    assert isinstance(trusted.version, int) and trusted.game_step == step_name
+
+
+def test_lobby_and_user_from_item_without_validation() -> None:
+    lobby_item = LobbyModel(lobby_id=str(uuid4()), users=USERS[:2], max_players=4).to_item()
+    user_item = {**UserModel(email=USERS[0], games_ids=["game"]).to_item(), "unknown": Decimal(1)}
+
+    assert _load(LobbyModel, lobby_item, validate=False) == _load(LobbyModel, lobby_item, validate=True)
+    assert _load(UserModel, user_item, validate=False) == _load(UserModel, user_item, validate=True)
+    assert isinstance(_load(LobbyModel, lobby_item, validate=False).max_players, int)
+
+
+def test_connection_model_pk_is_sharded() -> None:
+    connections = [ConnectionModel(connection_id=f"connection_{index}", user_id=USERS[0]) for index in range(200)]
+
+    assert {connection.pk for connection in connections} == set(CONNECTION_PKS)
+    assert ConnectionModel.from_item(item=connections[0].to_item()) == connections[0]
+    assert connections[0].pk == ConnectionModel(connection_id="connection_0", user_id=USERS[1]).pk
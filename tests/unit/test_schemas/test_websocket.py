@@ -0,0 +1,36 @@
+from uuid import uuid4
+
+from src.core import cards
+from src.core.enums import CardSuit
+from src.core.game import Game, GameSettings
+from src.core.state import GameState
+from src.core.steps import InProgressStep
+from src.core.types import RoundState
+from src.schemas.game import GameModel
+from src.schemas.websocket import GameDetailSchema
+
+
+def test_game_detail_schema_contains_users_legal_cards() -> None:
+    users = ["user_1", "user_2", "user_3"]
+    state = GameState(
+        users=users,
+        decks={
+            "user_1": [cards.CLUB_KING, cards.HEART_2],
+            "user_2": [cards.SPADE_4, cards.CLUB_3, cards.CLUB_5],
+            "user_3": [cards.CLUB_JACK, cards.DIAMOND_4],
+        },
+        current_user="user_2",
+        scores={user: 0 for user in users},
+    )
+    step = InProgressStep(
+        game_state=state, local_state=RoundState(cards_on_table={"user_1": cards.CLUB_2}, table_suit=CardSuit.CLUB)
+    )
+    game = GameModel(game_id=str(uuid4()), game=Game(settings=GameSettings(), state=state, current_step=step))
+
+    detail = GameDetailSchema.from_game(game=game, user_id="user_2")
+    other_user_detail = GameDetailSchema.from_game(game=game, user_id="user_3")
+
+    assert detail.state.deck == [cards.SPADE_4, cards.CLUB_3, cards.CLUB_5]
+    assert detail.legal_cards == [cards.CLUB_3, cards.CLUB_5]
+    assert other_user_detail.legal_cards == []
+    assert detail.dict(by_alias=True)["legalCards"] == [cards.CLUB_3.dict(), cards.CLUB_5.dict()]
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from src.services.broadcast import Broadcaster, EncodedMessage
+
+
+class SlowAPIGatewayClient:
+    def __init__(self, delay: float = 0.05, barrier: Optional[threading.Barrier] = None) -> None:
+        self.delay = delay
+        # if set, every request waits until given number of requests is in flight
+        self.barrier = barrier
+        self.messages_sent = {}
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post_to_connection(self, Data: bytes, ConnectionId: str) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        if self.barrier is not None:
+            self.barrier.wait()
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+
+        if ConnectionId.startswith("gone"):
+            raise ClientError({"Error": {"Code": "GoneException"}}, "PostToConnection")
+        self.messages_sent[ConnectionId] = Data
+
+
+def test_broadcast_sends_messages_concurrently() -> None:
+    client = SlowAPIGatewayClient(delay=0, barrier=threading.Barrier(40, timeout=5))
+    broadcaster = Broadcaster(api_gateway_client=client, max_concurrency=40)
+    messages = [(f"connection_{index}", EncodedMessage(body={})) for index in range(40)]
+
+    result = broadcaster.send(messages=messages)
+
+    assert client.max_in_flight == 40
+    assert sorted(result.sent) == sorted(connection_id for connection_id, _ in messages)
+    assert len(client.messages_sent) == 40
+
+
+def test_broadcast_respects_concurrency_limit() -> None:
+    client = SlowAPIGatewayClient(delay=0.01)
+    broadcaster = Broadcaster(api_gateway_client=client, max_concurrency=4)
+
+    broadcaster.broadcast(
+        message=EncodedMessage(body={}), connection_ids=[f"connection_{index}" for index in range(20)]
+    )
+
+    assert client.max_in_flight <= 4
+
+
+def test_broadcast_aggregates_failures() -> None:
+    client = SlowAPIGatewayClient(delay=0)
+    broadcaster = Broadcaster(api_gateway_client=client, max_concurrency=4)
+
+    result = broadcaster.broadcast(
+        message=EncodedMessage(body={}), connection_ids=["gone_1", "connection_1", "gone_2"]
+    )
+
+    assert result.sent == ["connection_1"]
+    assert set(result.failed) == {"gone_1", "gone_2"}
+    assert result.gone_connection_ids == {"gone_1", "gone_2"}
+    assert result.failed["gone_1"].response["Error"]["Code"] == "GoneException"
+
+
+def test_broadcast_message_is_encoded_once_for_all_recipients() -> None:
+    client = SlowAPIGatewayClient(delay=0)
+    broadcaster = Broadcaster(api_gateway_client=client, max_concurrency=4)
+    message = EncodedMessage(body={"type": "lobbyUpdated", "lobby": {"lobbyId": "id", "users": ["user"]}})
+
+    broadcaster.broadcast(message=message, connection_ids=[f"connection_{index}" for index in range(10)])
+
+    assert message.data == b'{"type":"lobbyUpdated","lobby":{"lobbyId":"id","users":["user"]}}'
+    assert all(data is message.data for data in client.messages_sent.values())
@@ -0,0 +1,33 @@
+import pytest
+
+from src.simulation.policies import GreedyLowCardPolicy, RandomLegalPolicy
+from src.simulation.runner import play_game, run_simulation
+
+
+@pytest.mark.parametrize("number_of_players", (3, 4))
+def test_play_game_until_max_score_is_reached(number_of_players: int) -> None:
+    policies = [RandomLegalPolicy(seed=index) for index in range(number_of_players - 1)] + [GreedyLowCardPolicy()]
+    result = play_game(policies=policies, max_score=30)
+
+    assert len(result.scores) == number_of_players
+    assert max(result.scores.values()) >= 30
+    assert result.rounds >= 1
+    assert result.moves > 0
+
+
+def test_run_simulation_in_current_process() -> None:
+    report = run_simulation(games=3, policy_names=["random", "greedy-low", "random"], workers=1, max_score=20)
+
+    assert report.games == 3
+    assert report.moves > 0
+    assert sum(report.wins.values()) == 3
+    assert report.score_distribution["max"] >= 20
+
+
+def test_run_simulation_is_reproducible_across_processes() -> None:
+    policy_names = ["random", "random", "random", "greedy-low"]
+    report_in_process = run_simulation(games=2, policy_names=policy_names, workers=1, max_score=20, seed=7)
+    report_in_pool = run_simulation(games=2, policy_names=policy_names, workers=2, max_score=20, seed=7)
+
+    assert report_in_process.moves == report_in_pool.moves
+    assert report_in_process.score_distribution == report_in_pool.score_distribution